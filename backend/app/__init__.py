@@ -5,19 +5,25 @@ from flask_jwt_extended import JWTManager
 import os
 from datetime import timedelta
 
-# Initialize SQLAlchemy
-db = SQLAlchemy()
+# Initialize SQLAlchemy; reads and writes are routed to separate engines
+from app.utils.database import RoutingSession
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 def create_app():
-    app = Flask(__name__)
+    # Keep the instance folder inside the package, where the database has always lived
+    app = Flask(__name__, instance_path=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance'))
     CORS(app)
+
+    # Stream uploads to disk with size and type checks as they arrive
+    from app.utils import uploads
+    uploads.init_app(app)
     
     # Ensure the instance folder exists
-    os.makedirs(os.path.join(app.root_path, 'instance'), exist_ok=True)
+    os.makedirs(app.instance_path, exist_ok=True)
     
-    # Database configuration
-    db_path = os.path.join(app.root_path, 'instance', 'app.db')
-    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    # Database configuration (Config.SQLALCHEMY_DATABASE_URI, DATABASE_URL in .env)
+    from app.utils.config import Config
+    app.config['SQLALCHEMY_DATABASE_URI'] = Config.SQLALCHEMY_DATABASE_URI
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
     # JWT configuration
@@ -28,24 +34,55 @@ def create_app():
     app.config['JWT_HEADER_TYPE'] = 'Bearer'
     
     # Initialize extensions
-    db.init_app(app)
+    from app.utils import database
+    database.init_app(app, db)
     jwt = JWTManager(app)
     
     with app.app_context():
         # Import all models
         from app.models.claims import Claim
+        from app.models.claim_documents import ClaimDocument
         from app.models.policies import Policy
         from app.models.users import User
+        from app.models.image_hashes import ImageHash
+        from app.models.user_claim_stats import UserClaimStats, UserClaimMonth
+        from app.models.claim_scores import ClaimScore
         
         # Create all tables
         db.create_all()
+
+        # Add indexes (and later schema changes) to databases that predate them
+        from app.utils.migrations import run_migrations
+        run_migrations(db.engine)
+
+        # Counter behind the ETags of cached read endpoints; bumped on commits
+        from app.services.data_version import data_version
+        data_version.init_app(app)
         
         # Import and register blueprints
         from app.routes import main_bp
         app.register_blueprint(main_bp)
+
+        # Load trained models once per worker rather than on the first request
+        from app.services.model_registry import model_registry
+        model_registry.warmup(Config.PRELOAD_MODELS)
+
+        # Background document verification workers and their result cache
+        from app.services.verification_cache import verification_cache
+        from app.services.verification_pool import verification_pool
+        verification_cache.init_app(app)
+        verification_pool.init_app(app)
+
+        # Admin-started bulk rescoring of open claims
+        from app.services.rescoring import rescore_runner
+        rescore_runner.init_app(app)
         
         # Initialize RL training scheduler
         from app.tasks.rl_training import init_scheduler
         init_scheduler()
+
+        # Slide the anomaly model onto newly submitted claims
+        from app.tasks import anomaly_updates
+        anomaly_updates.init_scheduler(app)
     
     return app 
\ No newline at end of file
@@ -18,7 +18,8 @@ def generate_token(user):
         'user_id': user.id,
         'username': user.username
     }
-    return create_access_token(identity=user.id, additional_claims=additional_claims)
+    # JWT subjects must be strings; handlers read the numeric id from user_id
+    return create_access_token(identity=str(user.id), additional_claims=additional_claims)
 
 def register_user(username, email, password, role, first_name, last_name, phone_number=None, address=None):
     if User.query.filter((User.username == username) | (User.email == email)).first():
@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+
+from app import db
+from app.models.users import User
+from app.utils.config import Config
+
+# What authenticated handlers need to know about the caller
+Identity = namedtuple('Identity', ['id', 'role', 'username', 'email'])
+
+_STALE = 'identity_stale_users'
+_MISSING = object()
+
+
+class UserStateCache:
+    """Short-lived cache of the user state handlers authorize against.
+
+    Entries expire after ``ttl`` seconds and are dropped as soon as this
+    process updates or deletes the user, so role changes and removals take
+    effect immediately here and within ``ttl`` in other workers.
+    """
+
+    def __init__(self, ttl=None, max_entries=None):
+        self.ttl = ttl if ttl is not None else Config.IDENTITY_CACHE_TTL
+        self.max_entries = max_entries or Config.IDENTITY_CACHE_MAX_ENTRIES
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id):
+        """The user's Identity, or None if there is no such user"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        row = db.session.execute(
+            select(User.id, User.role, User.username, User.email).where(User.id == user_id)
+        ).first()
+        identity = Identity(*row) if row is not None else None
+        with self._lock:
+            self._entries[user_id] = (now + self.ttl, identity)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return identity
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+user_cache = UserStateCache()
+
+
+def current_identity():
+    """Identity of the caller of a ``@jwt_required`` view, or None if the user is gone
+
+    The user id comes from the verified token's claims; role and the rest
+    come from the user cache, so a revoked role applies without waiting
+    for the token to expire and cached requests make no database query.
+    """
+    claims = get_jwt()
+    user_id = claims.get('user_id')
+    if user_id is None:
+        user_id = get_jwt_identity()
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return None
+    return user_cache.get(user_id)
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _user_changed(mapper, connection, target):
+    user_cache.invalidate(target.id)
+    # Drop it again at commit, in case another request cached the old row in between
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_STALE, set()).add(target.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _after_commit(session):
+    for user_id in session.info.pop(_STALE, ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _after_rollback(session):
+    session.info.pop(_STALE, None)
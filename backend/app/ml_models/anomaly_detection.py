@@ -1,17 +1,118 @@
 import numpy as np
 import pandas as pd
+import sklearn
+from collections import namedtuple
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
-import joblib
-import os
 from datetime import datetime, timedelta
+from .artifacts import ArtifactStore
+from .features import FeatureSchema
+from .iforest import CompiledForest, slide_forest
+
+# Artifacts live under Config.MODEL_DIR/<ARTIFACT_NAME>/<version>/
+ARTIFACT_NAME = 'anomaly_detector'
+
+# Model input columns, in order; saved with every trained version and
+# checked on load so a model is never fed features it was not trained on
+FEATURES = [
+    'days_since_policy_start',
+    'amount',
+    'claim_count_past_year',
+    'avg_claim_amount',
+    'document_count',
+    'text_score',
+    'image_score',
+    'amount_past_year',
+    'customer_tenure_days'
+]
+# Inference builds rows with this instead of the DataFrame path used for training
+SCHEMA = FeatureSchema(FEATURES)
+MODEL_PARAMS = {'n_estimators': 100, 'contamination': 0.1, 'random_state': 42}
+
+# Largest batch scored with the compiled forest; per-tree sklearn scoring
+# has a fixed ~10ms overhead but is faster on large batches
+COMPILED_SCORING_MAX_ROWS = 512
+
+# Points of the score calibration curve (training-score quantiles 0, 1%, ... 100%)
+CALIBRATION_POINTS = 101
+# Newest scaled claims kept with every version; updates recalibrate on these
+# rather than on the full history
+CALIBRATION_WINDOW = 5000
+
+# Sliding-window updates fit one new tree per max_samples new claims, up to
+# this many per update, and retire as many of the oldest trees
+MAX_TREES_PER_UPDATE = 20
+
+# Thresholds of the risk factors reported with each score
+HIGH_CLAIM_AMOUNT = 3000
+HIGH_CLAIM_FREQUENCY = 3
+NEW_POLICY_DAYS = 30
+
+# Everything scoring reads, swapped in as one reference so a request thread
+# never mixes a new forest with an old scaler or calibration mid-update
+ModelState = namedtuple('ModelState', ['model', 'scorer', 'scaler', 'calibration', 'window', 'metadata'])
+
+
+def _state_field(name):
+    return property(lambda self: getattr(self._state, name) if self._state is not None else None)
+
+
+def _in_claim_order(claims_data):
+    """Claims oldest first when they carry ids, so windows keep the newest"""
+    if all(claim.get('claim_id') is not None for claim in claims_data):
+        return sorted(claims_data, key=lambda claim: claim['claim_id'])
+    return list(claims_data)
+
+
+def _last_claim_id(claims_data):
+    claim_ids = [claim['claim_id'] for claim in claims_data if claim.get('claim_id') is not None]
+    return max(claim_ids) if claim_ids else None
 
-MODEL_PATH = 'anomaly_detection_model.joblib'
-SCALER_PATH = 'anomaly_scaler.joblib'
 
 class AnomalyDetector:
-    def __init__(self):
-        pass
+    model = _state_field('model')
+    scorer = _state_field('scorer')
+    scaler = _state_field('scaler')
+    calibration = _state_field('calibration')
+    # Versions saved before sliding-window updates have none; they score but cannot be updated
+    window = _state_field('window')
+    metadata = _state_field('metadata')
+
+    def __init__(self, model_dir=None, version=None):
+        self._state = None
+        self.store = ArtifactStore(ARTIFACT_NAME, model_dir)
+        self.load(version)
+
+    def load(self, version=None):
+        """Load the saved model (latest version by default); returns whether one was loaded"""
+        try:
+            objects, metadata = self.store.load(version)
+        except Exception as e:
+            print(f"Error loading anomaly model: {str(e)}")
+            return False
+        if metadata is None:
+            print("No trained anomaly model found; run train_anomaly_model.py")
+            return False
+        if metadata.get('features') != FEATURES:
+            print(f"Anomaly model {metadata.get('version')} was trained on other features; not loaded")
+            return False
+        if not metadata.get('calibration'):
+            print(f"Anomaly model {metadata.get('version')} has no score calibration; retrain it")
+            return False
+        self._state = ModelState(
+            model=objects['model'],
+            scorer=CompiledForest(objects['model']),
+            scaler=objects['scaler'],
+            calibration=np.asarray(metadata['calibration'], dtype=float),
+            window=objects.get('window'),
+            metadata=metadata
+        )
+        print(f"Loaded anomaly model {metadata['version']} (trained on {metadata['training_size']} claims)")
+        return True
+
+    @property
+    def version(self):
+        return self.metadata['version'] if self.metadata else None
 
     def analyze_claim(self, claim_data, verification_results):
         """
@@ -65,6 +166,29 @@ class AnomalyDetector:
                         'details': f'Potential image manipulation detected (Score: {ela_score})'
                     })
 
+            # Same document bytes already submitted with other claims
+            if doc.get('duplicate_of_claims'):
+                anomalies.append({
+                    'type': 'duplicate_document',
+                    'severity': 'high',
+                    'details': f"Identical document previously submitted with claims {doc['duplicate_of_claims']}"
+                })
+
+            # Visually near-identical images on other claims (crops, resizes,
+            # recompressions) that exact hashing does not catch
+            exact_duplicates = set(doc.get('duplicate_of_claims') or [])
+            near_duplicates = [
+                match for match in doc.get('near_duplicates') or []
+                if match.get('claim_id') not in exact_duplicates
+            ]
+            if near_duplicates:
+                closest = min(match.get('distance', 64) for match in near_duplicates)
+                anomalies.append({
+                    'type': 'near_duplicate_image',
+                    'severity': 'high' if closest <= 4 else 'medium',
+                    'details': f"Image closely matches images on claims {sorted(set(match['claim_id'] for match in near_duplicates))}"
+                })
+
             # Check text analysis results
             if vr.get('text_analysis'):
                 text_anomalies = self._analyze_text_results(vr['text_analysis'])
@@ -171,18 +295,8 @@ class AnomalyDetector:
             "risk_factors": []
         }
 
-    def initialize_model(self):
-        """Initialize model with some basic training data"""
-        # Create synthetic training data
-        normal_claims = self._generate_normal_claims(100)
-        anomalous_claims = self._generate_anomalous_claims(10)
-        training_data = normal_claims + anomalous_claims
-        
-        # Train the model
-        self.train(training_data)
-    
     def _generate_normal_claims(self, n_samples):
-        """Generate synthetic normal claims for initial training"""
+        """Generate synthetic normal claims (bootstrap training for empty databases)"""
         claims = []
         base_date = datetime.now() - timedelta(days=365)
         
@@ -205,7 +319,7 @@ class AnomalyDetector:
         return claims
     
     def _generate_anomalous_claims(self, n_samples):
-        """Generate synthetic anomalous claims for initial training"""
+        """Generate synthetic anomalous claims (bootstrap training for empty databases)"""
         claims = []
         base_date = datetime.now() - timedelta(days=365)
         
@@ -227,58 +341,152 @@ class AnomalyDetector:
         
         return claims
 
-    def train(self, claims_data):
-        """Train the anomaly detection model"""
+    def train(self, claims_data, save=True, metadata=None):
+        """Train the anomaly detection model and, by default, save it as a new version
+
+        Returns the version's metadata. ``metadata`` is stored alongside it
+        (e.g. where the training data came from).
+        """
         if not claims_data:
-            claims_data = self._generate_normal_claims(100)
+            raise ValueError("No claims to train the anomaly model on")
         
+        claims_data = _in_claim_order(claims_data)
         df = pd.DataFrame(claims_data)
         
         # Feature engineering
         features = self._extract_features(df)
         
         # Initialize and fit scaler
-        self.scaler = StandardScaler()
-        scaled_features = self.scaler.fit_transform(features)
+        scaler = StandardScaler()
+        scaled_features = scaler.fit_transform(features)
         
         # Initialize and fit model
-        self.model = IsolationForest(contamination=0.1, random_state=42)
-        self.model.fit(scaled_features)
+        model = IsolationForest(**MODEL_PARAMS)
+        model.fit(scaled_features)
+
+        # Scores are reported as the share of training claims that look less
+        # anomalous, so they do not depend on what else is being scored
+        raw_scores = -model.decision_function(scaled_features)
+        calibration = np.quantile(raw_scores, np.linspace(0, 1, CALIBRATION_POINTS))
+
+        window = scaled_features[-CALIBRATION_WINDOW:]
+        metadata = {
+            **(metadata or {}),
+            'features': FEATURES,
+            'last_claim_id': _last_claim_id(claims_data),
+            'calibration': calibration.tolist(),
+            'feature_means': dict(zip(FEATURES, scaler.mean_.tolist())),
+            'feature_scales': dict(zip(FEATURES, scaler.scale_.tolist())),
+            'params': MODEL_PARAMS,
+            'training_size': len(features),
+            'trained_at': datetime.utcnow().isoformat(),
+            'sklearn_version': sklearn.__version__
+        }
+        if save:
+            metadata = self.store.save({'model': model, 'scaler': scaler, 'window': window}, metadata)
+        self._state = ModelState(model, CompiledForest(model), scaler, calibration, window, metadata)
+        return metadata
+
+    def update(self, claims_data, save=True):
+        """Slide the model forward onto new claims and, by default, save it as a new version
+
+        Fits new trees on ``claims_data`` alone, swaps them in for the oldest
+        trees and recalibrates on the newest CALIBRATION_WINDOW claims, so
+        the cost depends on the new claims, not on the history. The scaler
+        is kept. Returns the new version's metadata, or None when there are
+        fewer new claims than one tree samples.
+        """
+        state = self._state
+        if state is None:
+            raise RuntimeError("Anomaly model has not been trained; run train_anomaly_model.py")
+        if state.window is None:
+            raise RuntimeError(f"Anomaly model {state.metadata['version']} was saved without a calibration window; retrain it")
+        max_samples = state.model._max_samples
+        n_trees = min(len(claims_data) // max_samples, MAX_TREES_PER_UPDATE, len(state.model.estimators_))
+        if n_trees == 0:
+            return None
+
+        claims_data = _in_claim_order(claims_data)
+        rows = self._scale(SCHEMA.matrix(claims_data), state.scaler)
+        recent = IsolationForest(**{
+            **MODEL_PARAMS, 'n_estimators': n_trees, 'max_samples': max_samples, 'random_state': None
+        }).fit(rows)
+        model = slide_forest(state.model, recent)
+
+        window = np.concatenate([state.window, rows])[-CALIBRATION_WINDOW:]
+        if model.contamination != 'auto':
+            # What IsolationForest.fit does with the training data
+            model.offset_ = np.percentile(model.score_samples(window), 100.0 * model.contamination)
+        calibration = np.quantile(-model.decision_function(window), np.linspace(0, 1, CALIBRATION_POINTS))
+
+        metadata = {
+            **state.metadata,
+            'parent_version': state.metadata.get('version'),
+            'last_claim_id': _last_claim_id(claims_data) or state.metadata.get('last_claim_id'),
+            'calibration': calibration.tolist(),
+            'trees_replaced': n_trees,
+            'update_size': len(claims_data),
+            'training_size': state.metadata['training_size'] + len(claims_data),
+            'updated_at': datetime.utcnow().isoformat()
+        }
+        if save:
+            metadata = self.store.save({'model': model, 'scaler': state.scaler, 'window': window}, metadata)
+        self._state = ModelState(model, CompiledForest(model), state.scaler, calibration, window, metadata)
+        return metadata
     
+    def _scale(self, rows, scaler=None):
+        # Same arithmetic as StandardScaler.transform, minus its input validation
+        scaler = scaler if scaler is not None else self.scaler
+        return (rows - scaler.mean_) / scaler.scale_
+
+    def calibrate(self, raw_scores, calibration=None):
+        """Map raw scores (negated decision_function) onto 0-1 with the training-time curve"""
+        calibration = calibration if calibration is not None else self.calibration
+        return np.interp(raw_scores, calibration, np.linspace(0, 1, len(calibration)))
+
+    def score_batch(self, claims_data):
+        """
+        Score many claims in one vectorized pass
+        claims_data: List of dictionaries containing claim features
+        Returns: one result per claim, in input order. anomaly_score is 0-1
+        (higher is more anomalous) and the same whatever else is in the batch.
+        """
+        # Read once: a concurrent update swaps in a whole new state
+        state = self._state
+        # Never train on the request path; a model has to be trained and saved first
+        if state is None:
+            raise RuntimeError("Anomaly model has not been trained; run train_anomaly_model.py")
+        if not claims_data:
+            return []
+
+        rows = SCHEMA.matrix(claims_data, fill=False)
+        # Known before missing values become 0, so undated claims are not "new policies"
+        has_dates = ~np.isnan(rows[:, SCHEMA.index['days_since_policy_start']])
+        rows[np.isnan(rows)] = 0.0
+        scorer = state.scorer if len(rows) <= COMPILED_SCORING_MAX_ROWS else state.model
+        raw_scores = -scorer.decision_function(self._scale(rows, state.scaler))
+        scores = self.calibrate(raw_scores, state.calibration)
+        risk_factors = self._risk_factors(rows, has_dates)
+
+        return [
+            {
+                'anomaly_score': float(score),
+                'raw_score': float(raw_score),
+                # predict() is -1 exactly where decision_function is negative
+                'is_anomaly': bool(raw_score > 0),
+                'risk_factors': factors
+            }
+            for score, raw_score, factors in zip(scores.tolist(), raw_scores.tolist(), risk_factors)
+        ]
+
     def detect_anomalies(self, claim_data):
         """
         Detect anomalies in new claims
         claim_data: List of dictionaries containing claim features
-        Returns: Dictionary with anomaly scores and analysis
+        Returns: the result dictionary for a single claim, else a list of them
         """
         try:
-            # Ensure model is initialized
-            if self.model is None or self.scaler is None:
-                self.initialize_model()
-
-            # Convert input data to DataFrame
-            df = pd.DataFrame(claim_data)
-            
-            # Extract and scale features
-            features = self._extract_features(df)
-            scaled_features = self.scaler.transform(features)
-            
-            # Get anomaly scores
-            anomaly_scores = self.model.decision_function(scaled_features)
-            predictions = self.model.predict(scaled_features)
-            
-            # Normalize scores to 0-1 range
-            normalized_scores = (anomaly_scores - anomaly_scores.min()) / (anomaly_scores.max() - anomaly_scores.min())
-            
-            results = []
-            for i, score in enumerate(normalized_scores):
-                result = {
-                    'anomaly_score': float(score),
-                    'is_anomaly': predictions[i] == -1,
-                    'risk_factors': self._analyze_risk_factors(claim_data[i], score)
-                }
-                results.append(result)
-            
+            results = self.score_batch(claim_data)
             return results[0] if len(results) == 1 else results
 
         except Exception as e:
@@ -291,55 +499,52 @@ class AnomalyDetector:
             }
     
     def _extract_features(self, df):
-        """Extract relevant features for anomaly detection"""
-        features = pd.DataFrame()
+        """Extract relevant features for anomaly detection (training; SCHEMA rows match it)"""
+        features = pd.DataFrame(index=df.index)
         
         # Handle datetime columns
         if 'claim_date' in df.columns and 'policy_start_date' in df.columns:
             df['claim_date'] = pd.to_datetime(df['claim_date'])
             df['policy_start_date'] = pd.to_datetime(df['policy_start_date'])
             features['days_since_policy_start'] = (df['claim_date'] - df['policy_start_date']).dt.days
+        if 'claim_date' in df.columns and 'first_policy_start' in df.columns:
+            features['customer_tenure_days'] = (
+                pd.to_datetime(df['claim_date']) - pd.to_datetime(df['first_policy_start'])
+            ).dt.days
         
         # Add other numerical features
-        numerical_columns = ['amount', 'claim_count_past_year', 'avg_claim_amount', 
-                           'document_count', 'text_score', 'image_score']
-        
-        for col in numerical_columns:
-            if col in df.columns:
+        for col in FEATURES:
+            if col in df.columns and col not in features.columns:
                 features[col] = df[col]
         
-        # Fill missing values
-        features = features.fillna(0)
+        # Every schema column, in schema order; missing ones are 0
+        features = features.reindex(columns=FEATURES).astype(float).fillna(0)
         
         return features
     
-    def _analyze_risk_factors(self, claim_data, anomaly_score):
-        """Analyze specific risk factors contributing to the anomaly score"""
-        risk_factors = []
-        
-        # Check claim amount
-        if claim_data.get('amount', 0) > 3000:
-            risk_factors.append({
+    def _risk_factors(self, rows, has_dates):
+        """Risk factors of every claim, flagged with array comparisons over the feature rows"""
+        amount = rows[:, SCHEMA.index['amount']]
+        claim_count = rows[:, SCHEMA.index['claim_count_past_year']]
+        days_since_policy = rows[:, SCHEMA.index['days_since_policy_start']]
+
+        risk_factors = [[] for _ in range(len(rows))]
+        for i in np.flatnonzero(amount > HIGH_CLAIM_AMOUNT):
+            risk_factors[i].append({
                 'factor': 'High Claim Amount',
                 'severity': 'high',
-                'details': f"Claim amount (${claim_data['amount']}) is significantly above average"
+                'details': f"Claim amount (${amount[i]:g}) is significantly above average"
             })
-        
-        # Check claim frequency
-        if claim_data.get('claim_count_past_year', 0) > 3:
-            risk_factors.append({
+        for i in np.flatnonzero(claim_count > HIGH_CLAIM_FREQUENCY):
+            risk_factors[i].append({
                 'factor': 'High Claim Frequency',
                 'severity': 'medium',
-                'details': f"Multiple claims ({claim_data['claim_count_past_year']}) in the past year"
+                'details': f"Multiple claims ({int(claim_count[i])}) in the past year"
             })
-        
-        # Check policy age
-        days_since_policy = (claim_data.get('claim_date') - claim_data.get('policy_start_date')).days
-        if days_since_policy < 30:
-            risk_factors.append({
+        for i in np.flatnonzero(has_dates & (days_since_policy < NEW_POLICY_DAYS)):
+            risk_factors[i].append({
                 'factor': 'New Policy',
                 'severity': 'high',
-                'details': f"Claim filed only {days_since_policy} days after policy start"
+                'details': f"Claim filed only {int(days_since_policy[i])} days after policy start"
             })
-        
-        return risk_factors 
\ No newline at end of file
+        return risk_factors
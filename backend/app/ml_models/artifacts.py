@@ -0,0 +1,93 @@
+import json
+import os
+import shutil
+import uuid
+from datetime import datetime
+
+import joblib
+
+from app.utils.config import Config
+from app.utils.helpers import try_file_lock
+
+METADATA_FILE = 'metadata.json'
+LATEST_FILE = 'latest'
+LOCK_FILE = '.lock'
+
+
+class ArtifactStore:
+    """Versioned, on-disk artifacts of one model.
+
+    Every save goes to a new directory ``<model_dir>/<name>/<version>/``
+    holding one joblib file per object plus ``metadata.json``; a ``latest``
+    file names the current version. Both the version directory and the
+    pointer are switched in with a rename, so readers never see a partial
+    write, and only the newest ``keep`` versions are kept.
+    """
+
+    def __init__(self, name, model_dir=None, keep=None):
+        self.name = name
+        self.root = os.path.join(model_dir or Config.MODEL_DIR, name)
+        self.keep = keep or Config.MODEL_KEEP_VERSIONS
+
+    def versions(self):
+        """Saved versions, oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            entry for entry in os.listdir(self.root)
+            if not entry.startswith('.') and os.path.isfile(os.path.join(self.root, entry, METADATA_FILE))
+        )
+
+    def latest(self):
+        try:
+            with open(os.path.join(self.root, LATEST_FILE)) as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return None
+        return version or None
+
+    def save(self, objects, metadata):
+        """Write ``objects`` ({name: object}) and ``metadata`` as a new latest version"""
+        os.makedirs(self.root, exist_ok=True)
+        # Timestamped, so versions sort in the order they were trained
+        version = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+        staging = os.path.join(self.root, f'.{version}.tmp')
+        os.makedirs(staging)
+        try:
+            for key, obj in objects.items():
+                joblib.dump(obj, os.path.join(staging, f'{key}.joblib'))
+            metadata = {**metadata, 'model': self.name, 'version': version, 'artifacts': sorted(objects)}
+            with open(os.path.join(staging, METADATA_FILE), 'w') as f:
+                json.dump(metadata, f, indent=2, default=str)
+            os.replace(staging, os.path.join(self.root, version))
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        pointer = os.path.join(self.root, f'.{LATEST_FILE}.{version}.tmp')
+        with open(pointer, 'w') as f:
+            f.write(version)
+        os.replace(pointer, os.path.join(self.root, LATEST_FILE))
+        self._prune(version)
+        return metadata
+
+    def load(self, version=None):
+        """(objects, metadata) of ``version`` (latest by default), or (None, None) if there is none"""
+        version = version or self.latest()
+        if version is None:
+            return None, None
+        path = os.path.join(self.root, version)
+        with open(os.path.join(path, METADATA_FILE)) as f:
+            metadata = json.load(f)
+        objects = {key: joblib.load(os.path.join(path, f'{key}.joblib')) for key in metadata['artifacts']}
+        return objects, metadata
+
+    def locked(self):
+        """Hold this model's update lock across processes; yields False if another holder has it"""
+        os.makedirs(self.root, exist_ok=True)
+        return try_file_lock(os.path.join(self.root, LOCK_FILE))
+
+    def _prune(self, current):
+        for version in self.versions()[:-self.keep]:
+            if version != current:
+                shutil.rmtree(os.path.join(self.root, version), ignore_errors=True)
@@ -0,0 +1,128 @@
+import io
+import mimetypes
+from PIL import Image
+import cv2
+import numpy as np
+
+
+class DecodedDocument:
+    """An uploaded document read from disk once and shared by every verification stage.
+
+    The raw bytes are read a single time; the MIME type, image header and
+    decoded pixel array are worked out lazily on first access and cached, so
+    type validation, metadata, OCR and ELA never re-open or re-decode the file.
+    """
+
+    def __init__(self, raw, path=None):
+        self.path = path
+        self.raw = raw
+        self._mime = None
+        self._header = None
+        self._header_read = False
+        self._pixels = None
+        self._pixels_decoded = False
+        self.total_pages = None if self.is_pdf else 1
+
+    @classmethod
+    def from_path(cls, path):
+        with open(path, 'rb') as f:
+            return cls(f.read(), path=path)
+
+    @property
+    def size_bytes(self):
+        return len(self.raw)
+
+    @property
+    def is_pdf(self):
+        return self.raw[:5] == b'%PDF-'
+
+    @property
+    def mime(self):
+        """MIME type sniffed from the leading bytes"""
+        if self._mime is None:
+            try:
+                # First try with python-magic-bin
+                import magic
+                self._mime = magic.from_buffer(self.raw[:2048], mime=True)
+            except (ImportError, AttributeError):
+                # Fallback to mimetypes, then to the image header
+                mime, _ = mimetypes.guess_type(self.path) if self.path else (None, None)
+                if mime is None and self.is_pdf:
+                    mime = 'application/pdf'
+                if mime is None and self.header:
+                    mime = f"image/{self.header['format'].lower()}"
+                self._mime = mime
+        return self._mime
+
+    @property
+    def header(self):
+        """Image header info (format, size, mode) without decoding pixels"""
+        if not self._header_read:
+            self._header_read = True
+            try:
+                with Image.open(io.BytesIO(self.raw)) as img:
+                    self._header = {
+                        'format': img.format,
+                        'size': img.size,
+                        'mode': img.mode,
+                        'width': img.width,
+                        'height': img.height
+                    }
+            except Exception:
+                self._header = None
+        return self._header
+
+    def iter_pages(self, max_pages=None, scale=2.0):
+        """Yield (page_number, RGB pixel array, text layer) for each PDF page
+
+        Pages are rasterized one at a time as the caller asks for them, so
+        only the pages the caller is still holding are ever in memory.
+        """
+        # Optional dependency, only needed for PDF uploads
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(self.raw)
+        try:
+            self.total_pages = page_count = len(pdf)
+            if max_pages is not None:
+                page_count = min(page_count, max_pages)
+            for index in range(page_count):
+                page = pdf[index]
+                try:
+                    textpage = page.get_textpage()
+                    text_layer = textpage.get_text_range()
+                    textpage.close()
+                    bitmap = page.render(scale=scale)
+                    pixels = bitmap.to_numpy()
+                    # pdfium renders BGR(x); copy out so the bitmap can be freed
+                    pixels = cv2.cvtColor(pixels[:, :, :3], cv2.COLOR_BGR2RGB)
+                    bitmap.close()
+                finally:
+                    page.close()
+                yield index + 1, pixels, text_layer
+        finally:
+            pdf.close()
+
+    @property
+    def pixels(self):
+        """Decoded BGR pixel array, or None if the bytes are not an image"""
+        if not self._pixels_decoded:
+            self._pixels_decoded = True
+            buffer = np.frombuffer(self.raw, dtype=np.uint8)
+            self._pixels = cv2.imdecode(buffer, cv2.IMREAD_COLOR) if buffer.size else None
+        return self._pixels
+
+    @property
+    def rgb(self):
+        """Pixel array in RGB order for consumers that expect PIL channel order"""
+        pixels = self.pixels
+        if pixels is None:
+            return None
+        return cv2.cvtColor(pixels, cv2.COLOR_BGR2RGB)
+
+
+def as_document(source):
+    """Accept either a file path or an already decoded document"""
+    if isinstance(source, DecodedDocument):
+        return source
+    return DecodedDocument.from_path(source)
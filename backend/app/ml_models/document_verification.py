@@ -1,14 +1,28 @@
-from transformers import pipeline
-import pytesseract
-from .utils import validate_file_type, extract_image_metadata, calculate_ela
+from .utils import validate_file_type, extract_image_metadata, calculate_ela, calculate_perceptual_hash
+from .decoded_document import DecodedDocument
+from .inference_queue import BatchInferenceQueue
+from .ocr_pool import ocr_pool
+from app.utils.config import Config
 import os
-from PIL import Image
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
 import numpy as np
 
+# Bump whenever a change to verification would alter its output, so cached
+# results from the previous pipeline are no longer served
+PIPELINE_VERSION = '4'
+
+# A PDF page whose embedded text layer has at least this many characters is
+# read directly instead of being OCR'd
+MIN_TEXT_LAYER_CHARS = 50
+
 class DocumentVerifier:
-    def __init__(self):
+    def __init__(self, sentiment_max_wait_ms=None):
+        """``sentiment_max_wait_ms`` overrides Config.SENTIMENT_MAX_WAIT_MS for this verifier's queue"""
         # Initialize models
         try:
+            # Imported here so loading the package does not pull in transformers
+            from transformers import pipeline
             self.nlp_model = pipeline(
                 "text-classification", 
                 model="distilbert-base-uncased-finetuned-sst-2-english"
@@ -16,6 +30,17 @@ class DocumentVerifier:
         except Exception as e:
             print(f"Warning: NLP model initialization failed: {str(e)}")
             self.nlp_model = None
+
+        # Concurrent requests share batched forward passes instead of each
+        # calling the pipeline with a batch of one
+        self.sentiment_queue = None
+        if self.nlp_model:
+            self.sentiment_queue = BatchInferenceQueue(
+                self._classify_batch,
+                max_batch_size=Config.SENTIMENT_MAX_BATCH_SIZE,
+                max_wait_ms=Config.SENTIMENT_MAX_WAIT_MS if sentiment_max_wait_ms is None else sentiment_max_wait_ms,
+                name='sentiment'
+            )
             
         self.expected_image_types = [
             'image/jpeg', 
@@ -28,28 +53,48 @@ class DocumentVerifier:
     def verify_document(self, file_path):
         """Main document verification method"""
         try:
-            # Basic file validation
-            if not os.path.exists(file_path):
-                return {'valid': False, 'reason': 'File not found'}
+            if isinstance(file_path, DecodedDocument):
+                document = file_path
+            else:
+                # Basic file validation
+                if not os.path.exists(file_path):
+                    return {'valid': False, 'reason': 'File not found'}
+
+                # Read and decode the upload once for every stage below
+                document = DecodedDocument.from_path(file_path)
                 
             # File type validation
-            if not validate_file_type(file_path, self.expected_image_types):
+            if not validate_file_type(document, self.expected_image_types):
                 return {'valid': False, 'reason': 'Invalid file type'}
             
-            # Extract metadata
-            metadata = extract_image_metadata(file_path)
-            
-            # Extract text
-            text = self.extract_text(file_path)
+            if document.is_pdf:
+                # PDFs are rasterized and OCR'd page by page
+                pdf_result = self.extract_pdf_text(document)
+                metadata = pdf_result['metadata']
+                text = pdf_result['text']
+                # ELA and perceptual hashing only mean something for camera images
+                ela_results = None
+                perceptual_hash = None
+            else:
+                # Extract metadata
+                metadata = extract_image_metadata(document)
+                
+                # Extract text; a failed OCR job is counted so the
+                # result is not cached as if the image had no text
+                text, ocr_error = self._ocr(document.rgb)
+                metadata['ocr_errors'] = 1 if ocr_error else 0
+                
+                # Calculate image forensics if it's an image
+                try:
+                    ela_results = calculate_ela(document)
+                except Exception:
+                    ela_results = None
+
+                # Fingerprint for near-duplicate search across claims
+                perceptual_hash = calculate_perceptual_hash(document)
             
             # Analyze text content
             text_analysis = self.analyze_text(text)
-            
-            # Calculate image forensics if it's an image
-            try:
-                ela_results = calculate_ela(file_path)
-            except Exception:
-                ela_results = None
 
             # Calculate document complexity score
             complexity_score = self.calculate_complexity_score(text, metadata)
@@ -58,21 +103,137 @@ class DocumentVerifier:
                 'valid': True,
                 'metadata': metadata,
                 'ela_results': ela_results,
+                'perceptual_hash': perceptual_hash,
                 'text_analysis': text_analysis,
                 'complexity_score': complexity_score,
                 'extracted_text': text[:500] + '...' if text else None
             }
         except Exception as e:
-            return {'valid': False, 'reason': str(e)}
+            # No verdict was reached; the verification pool marks the run failed
+            return {'valid': False, 'reason': str(e), 'error': True}
     
-    def extract_text(self, file_path):
+    def extract_text(self, document):
         """Extract text from document using OCR"""
+        if document.is_pdf:
+            return self.extract_pdf_text(document)['text']
+        return self.ocr_image(document.rgb)
+
+    def ocr_image(self, image):
+        """OCR a single RGB pixel array through the shared OCR pool"""
+        return self._ocr(image)[0]
+
+    def _ocr(self, image):
+        """(text, error) of one OCR job; text is "" and error set when tesseract failed or timed out"""
+        if image is None:
+            return "", None
         try:
-            return pytesseract.image_to_string(Image.open(file_path))
+            return ocr_pool.submit(image).result(), None
         except Exception as e:
-            print(f"OCR Error: {str(e)}")
-            return ""
+            print(f"OCR Error: {str(e) or type(e).__name__}")
+            return "", str(e) or type(e).__name__
+
+    def extract_pdf_text(self, document):
+        """Stream a PDF page by page and OCR the pages in parallel
+
+        Pages are rasterized lazily and at most ``PDF_OCR_WORKERS`` of them
+        are in flight at once, so memory depends on that number rather than
+        on the size of the document. Pages that carry a usable text layer
+        skip OCR. Processing stops at ``PDF_MAX_PAGES``, as soon as
+        ``PDF_TEXT_TARGET_CHARS`` characters have been collected, or when
+        the document runs past ``OCR_DOCUMENT_TIMEOUT``; pages still queued
+        at that point are cancelled.
+        """
+        max_in_flight = max(1, Config.PDF_OCR_WORKERS)
+        deadline = time.monotonic() + Config.OCR_DOCUMENT_TIMEOUT
+        pages = {}
+        first_page_size = None
+        collected_chars = 0
+        stopped_early = False
+        timed_out = False
+        in_flight = {}
+
+        def collect(futures):
+            chars = 0
+            for future in futures:
+                page_number = in_flight.pop(future)
+                try:
+                    text = future.result()
+                except Exception as e:
+                    print(f"OCR Error on page {page_number}: {str(e)}")
+                    pages[page_number] = {'text': '', 'source': 'ocr', 'error': str(e) or type(e).__name__}
+                    continue
+                pages[page_number] = {'text': text, 'source': 'ocr'}
+                chars += len(text)
+            return chars
+
+        def remaining():
+            return max(0.0, deadline - time.monotonic())
+
+        page_iter = document.iter_pages(max_pages=Config.PDF_MAX_PAGES, scale=Config.PDF_RENDER_SCALE)
+        try:
+            for page_number, pixels, text_layer in page_iter:
+                if first_page_size is None:
+                    first_page_size = (pixels.shape[1], pixels.shape[0])
+
+                if len(text_layer.strip()) >= MIN_TEXT_LAYER_CHARS:
+                    pages[page_number] = {'text': text_layer, 'source': 'text_layer'}
+                    collected_chars += len(text_layer)
+                else:
+                    in_flight[ocr_pool.submit(pixels)] = page_number
+                del pixels
+
+                # Wait for a free slot before rasterizing the next page
+                while len(in_flight) >= max_in_flight and remaining() > 0:
+                    done, _ = wait(list(in_flight), timeout=remaining(), return_when=FIRST_COMPLETED)
+                    collected_chars += collect(done)
+
+                if remaining() <= 0:
+                    timed_out = True
+                    break
+                if collected_chars >= Config.PDF_TEXT_TARGET_CHARS:
+                    stopped_early = True
+                    break
+        finally:
+            page_iter.close()
+
+        done, not_done = wait(list(in_flight), timeout=remaining())
+        collect(done)
+        if not_done:
+            timed_out = True
+            for future in not_done:
+                future.cancel()
+
+        ordered = [pages[number] for number in sorted(pages)]
+        width, height = first_page_size or (0, 0)
+        return {
+            'text': '\n'.join(page['text'] for page in ordered),
+            'metadata': {
+                'format': 'PDF',
+                'size': [width, height],
+                'mode': 'RGB',
+                'width': width,
+                'height': height,
+                'page_count': document.total_pages or 0,
+                'pages_processed': len(ordered),
+                'stopped_early': stopped_early,
+                'timed_out': timed_out,
+                'ocr_errors': sum(1 for page in ordered if 'error' in page),
+                'pages': [
+                    {
+                        'page': number,
+                        'source': pages[number]['source'],
+                        'word_count': len(pages[number]['text'].split()),
+                        **({'error': pages[number]['error']} if 'error' in pages[number] else {})
+                    }
+                    for number in sorted(pages)
+                ]
+            }
+        }
     
+    def _classify_batch(self, texts):
+        """Run the sentiment pipeline once over a batch of texts"""
+        return self.nlp_model(texts, batch_size=len(texts))
+
     def analyze_text(self, text):
         """Analyze extracted text for anomalies"""
         if not text:
@@ -95,8 +256,8 @@ class DocumentVerifier:
             unique_words = len(set(words))
             
             # Sentiment analysis if model is available
-            if self.nlp_model and text.strip():
-                sentiment = self.nlp_model(text[:512])[0]
+            if self.sentiment_queue and text.strip():
+                sentiment = self.sentiment_queue.predict(text[:512])
                 sentiment_label = sentiment['label']
                 sentiment_score = sentiment['score']
             else:
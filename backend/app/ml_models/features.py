@@ -0,0 +1,123 @@
+import math
+from datetime import date, datetime, time
+
+import numpy as np
+
+MISSING = float('nan')
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def to_datetime(value):
+    """datetime of a claim field the way pd.to_datetime reads it; None when missing"""
+    if _is_missing(value):
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time())
+    if isinstance(value, np.datetime64):
+        return None if np.isnat(value) else value.astype('datetime64[us]').item()
+    return datetime.fromisoformat(str(value))
+
+
+def _numeric(name):
+    def extract(claim, context):
+        value = claim.get(name)
+        return MISSING if _is_missing(value) else float(value)
+    return extract
+
+
+def _days_since_policy_start(claim, context):
+    claim_date = to_datetime(claim.get('claim_date'))
+    policy_start = to_datetime(claim.get('policy_start_date'))
+    if claim_date is None or policy_start is None:
+        return MISSING
+    # timedelta.days floors like Series.dt.days
+    return float((claim_date - policy_start).days)
+
+
+def _customer_tenure_days(claim, context):
+    # Days since the user's earliest policy started (user_claim_stats)
+    claim_date = to_datetime(claim.get('claim_date'))
+    first_policy_start = to_datetime(claim.get('first_policy_start'))
+    if claim_date is None or first_policy_start is None:
+        return MISSING
+    return float((claim_date - first_policy_start).days)
+
+
+def _claim_weekday(claim, context):
+    claim_date = to_datetime(claim.get('claim_date'))
+    return MISSING if claim_date is None else float(claim_date.weekday())
+
+
+def _time_since_last_claim(claim, context):
+    # Days since the user's previous claim: from previous_claim_date when the
+    # claim carries it (user_claim_stats), else from the same user's previous
+    # claim earlier in the batch, like groupby('user_id')['claim_date'].diff()
+    claim_date = to_datetime(claim.get('claim_date'))
+    user_id = claim.get('user_id')
+    previous = None
+    if not _is_missing(user_id):
+        last_claims = context.setdefault('last_claim_date', {})
+        previous = last_claims.get(user_id)
+        last_claims[user_id] = claim_date
+    stored = to_datetime(claim.get('previous_claim_date'))
+    if stored is not None:
+        previous = stored
+    elif _is_missing(user_id):
+        return MISSING
+    if claim_date is None or previous is None:
+        return MISSING
+    return float((claim_date - previous).days)
+
+
+# Features that are not just a numeric field of the claim dict
+DERIVED = {
+    'days_since_policy_start': _days_since_policy_start,
+    'customer_tenure_days': _customer_tenure_days,
+    'claim_weekday': _claim_weekday,
+    'time_since_last_claim': _time_since_last_claim,
+}
+
+
+class FeatureSchema:
+    """Claim dicts to model input rows without pandas.
+
+    The extractor for every feature is looked up once, when the schema is
+    built, so turning a claim into a row is a single pass over plain Python
+    callables writing into a preallocated float64 array. Rows match the
+    DataFrame feature extraction used at training time, missing values
+    filled with 0.
+    """
+
+    def __init__(self, features):
+        self.features = list(features)
+        self.index = {name: i for i, name in enumerate(self.features)}
+        self._extractors = [DERIVED.get(name) or _numeric(name) for name in self.features]
+
+    def __len__(self):
+        return len(self.features)
+
+    def row(self, claim, out=None, fill=True, context=None):
+        """One claim as a row; ``fill=False`` leaves missing values as NaN"""
+        if out is None:
+            out = np.empty(len(self.features), dtype=np.float64)
+        context = {} if context is None else context
+        for i, extract in enumerate(self._extractors):
+            out[i] = extract(claim, context)
+        if fill:
+            out[np.isnan(out)] = 0.0
+        return out
+
+    def matrix(self, claims, fill=True):
+        """Rows of many claims, in order, as one (n_claims, n_features) array"""
+        out = np.empty((len(claims), len(self.features)), dtype=np.float64)
+        context = {}
+        for i, claim in enumerate(claims):
+            self.row(claim, out[i], fill=False, context=context)
+        if fill:
+            out[np.isnan(out)] = 0.0
+        return out
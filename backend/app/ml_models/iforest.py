@@ -0,0 +1,104 @@
+import copy
+
+import numpy as np
+
+# Fitted IsolationForest attributes holding one entry per tree, oldest first
+PER_TREE_ATTRIBUTES = (
+    'estimators_', 'estimators_features_', '_seeds',
+    '_average_path_length_per_tree', '_decision_path_lengths'
+)
+
+
+def average_path_length(n_samples):
+    """Expected isolation depth of n samples (sklearn.ensemble._iforest._average_path_length)"""
+    n_samples = np.asarray(n_samples, dtype=float)
+    lengths = np.zeros(n_samples.shape)
+    lengths[n_samples == 2] = 1.0
+    many = n_samples > 2
+    lengths[many] = (
+        2.0 * (np.log(n_samples[many] - 1.0) + np.euler_gamma)
+        - 2.0 * (n_samples[many] - 1.0) / n_samples[many]
+    )
+    return lengths
+
+
+def slide_forest(forest, recent):
+    """Copy of a fitted IsolationForest whose oldest trees are replaced by all trees of ``recent``
+
+    Both forests must have been fitted with the same max_samples on the same
+    features. offset_ is left as it was; recompute it for the new trees.
+    """
+    if recent._max_samples != forest._max_samples or recent.n_features_in_ != forest.n_features_in_:
+        raise ValueError("Forests differ in max_samples or features")
+    n_new = len(recent.estimators_)
+    if n_new > len(forest.estimators_):
+        raise ValueError("More new trees than the forest holds")
+    slid = copy.copy(forest)
+    for name in PER_TREE_ATTRIBUTES:
+        if not hasattr(forest, name):
+            continue
+        old, new = getattr(forest, name), getattr(recent, name)
+        kept = list(old)[n_new:] + list(new)
+        setattr(slid, name, np.asarray(kept) if isinstance(old, np.ndarray) else type(old)(kept))
+    return slid
+
+
+class CompiledForest:
+    """decision_function of a fitted IsolationForest as array lookups.
+
+    sklearn scores tree by tree through joblib, which costs about 10ms per
+    call whatever the batch size. Here the nodes of every tree are packed
+    into flat arrays once, and all rows walk all trees together one level
+    per step. Scores are identical to the forest's: the same float32
+    comparisons and the same per-tree summation order.
+    """
+
+    def __init__(self, forest):
+        self.forest = forest
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        self.n_trees = len(trees)
+        width = max(tree.node_count for tree in trees)
+        # Trees see a column subset only when max_features < n_features
+        subsample = len(forest.estimators_features_[0]) != forest.n_features_in_
+
+        self._feature = np.zeros((self.n_trees, width), dtype=np.intp)
+        self._threshold = np.zeros((self.n_trees, width))
+        self._left = np.zeros((self.n_trees, width), dtype=np.intp)
+        self._right = np.zeros((self.n_trees, width), dtype=np.intp)
+        self._leaf_path = np.zeros((self.n_trees, width))
+        for t, (tree, features) in enumerate(zip(trees, forest.estimators_features_)):
+            n = tree.node_count
+            # Node ids are global positions in the flattened arrays
+            nodes = np.arange(n) + t * width
+            is_leaf = tree.children_left == -1
+            feature = np.where(is_leaf, 0, tree.feature)
+            self._feature[t, :n] = np.asarray(features)[feature] if subsample else feature
+            self._threshold[t, :n] = tree.threshold
+            # Leaves point at themselves, so rows that got there stay put
+            self._left[t, :n] = np.where(is_leaf, nodes, tree.children_left + t * width)
+            self._right[t, :n] = np.where(is_leaf, nodes, tree.children_right + t * width)
+            self._leaf_path[t, :n] = tree.compute_node_depths() + average_path_length(tree.n_node_samples) - 1.0
+
+        self._feature, self._threshold, self._left, self._right, self._leaf_path = (
+            a.ravel() for a in (self._feature, self._threshold, self._left, self._right, self._leaf_path)
+        )
+        self._roots = np.arange(self.n_trees) * width
+        self.depth = max(tree.max_depth for tree in trees)
+        self.denominator = self.n_trees * average_path_length([forest._max_samples])[0]
+        self.offset = forest.offset_
+
+    def decision_function(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if np.isnan(X).any():
+            # Trees route missing values per split; leave those rows to sklearn
+            return self.forest.decision_function(X)
+        n_rows, n_features = X.shape
+        values = X.ravel()
+        row_start = (np.arange(n_rows) * n_features)[:, None]
+        node = np.broadcast_to(self._roots, (n_rows, self.n_trees))
+        for _ in range(self.depth):
+            go_left = values[row_start + self._feature[node]] <= self._threshold[node]
+            node = np.where(go_left, self._left[node], self._right[node])
+        # cumsum adds the trees one after another, like sklearn does
+        depths = np.cumsum(self._leaf_path[node], axis=1)[:, -1]
+        return -(2.0 ** (-depths / self.denominator)) - self.offset
@@ -0,0 +1,137 @@
+import queue
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+# Every queue created in this process, for the metrics endpoint
+_queues = weakref.WeakSet()
+
+
+class BatchInferenceQueue:
+    """Gather single inference requests from many threads into batches.
+
+    Callers ``submit`` one input and get a Future back. A background thread
+    takes the first waiting input, keeps collecting until ``max_batch_size``
+    inputs are queued or ``max_wait_ms`` has passed, then runs
+    ``predict_batch`` once for the whole batch. The model is therefore only
+    ever called from one thread, and concurrent requests share forward passes.
+    """
+
+    def __init__(self, predict_batch, max_batch_size=16, max_wait_ms=10, name='inference'):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms / 1000.0)
+        self.name = name
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._started_at = time.time()
+        self._batches = 0
+        self._items = 0
+        self._errors = 0
+        self._busy_seconds = 0.0
+        self._latencies = deque(maxlen=1000)
+        self._batch_sizes = deque(maxlen=1000)
+        _queues.add(self)
+
+    def submit(self, item):
+        """Queue one input; the Future resolves to its prediction"""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def predict(self, item, timeout=None):
+        """Blocking convenience wrapper around submit"""
+        return self.submit(item).result(timeout=timeout)
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name=f'{self.name}-batcher', daemon=True
+                )
+                self._thread.start()
+
+    def _collect_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            # Drop requests whose callers already gave up
+            batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            started = time.perf_counter()
+            try:
+                predictions = list(self.predict_batch([item for item, _ in batch]))
+                if len(predictions) != len(batch):
+                    # zip would leave the extra callers waiting forever
+                    raise ValueError(
+                        f"{self.name} returned {len(predictions)} predictions for a batch of {len(batch)}"
+                    )
+                for (_, future), prediction in zip(batch, predictions):
+                    future.set_result(prediction)
+            except Exception as e:
+                with self._stats_lock:
+                    self._errors += 1
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            self._record(len(batch), time.perf_counter() - started)
+
+    def _record(self, batch_size, seconds):
+        with self._stats_lock:
+            self._batches += 1
+            self._items += batch_size
+            self._busy_seconds += seconds
+            self._latencies.append(seconds)
+            self._batch_sizes.append(batch_size)
+
+    def metrics(self):
+        """Batch latency and throughput counters for tuning batch size and wait time"""
+        with self._stats_lock:
+            latencies_ms = np.array(self._latencies) * 1000.0
+            return {
+                'name': self.name,
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+                'queue_depth': self._queue.qsize(),
+                'batches': self._batches,
+                'items': self._items,
+                'errors': self._errors,
+                'avg_batch_size': float(np.mean(self._batch_sizes)) if self._batch_sizes else 0.0,
+                'batch_latency_ms': {
+                    'mean': float(latencies_ms.mean()) if latencies_ms.size else 0.0,
+                    'p50': float(np.percentile(latencies_ms, 50)) if latencies_ms.size else 0.0,
+                    'p95': float(np.percentile(latencies_ms, 95)) if latencies_ms.size else 0.0,
+                    'max': float(latencies_ms.max()) if latencies_ms.size else 0.0
+                },
+                # Items per second while the model was busy, and over the queue's lifetime
+                'busy_throughput': self._items / self._busy_seconds if self._busy_seconds else 0.0,
+                'throughput': self._items / max(time.time() - self._started_at, 1e-9)
+            }
+
+
+def queue_metrics():
+    """Metrics for every live inference queue in this process"""
+    return [q.metrics() for q in list(_queues)]
@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytesseract
+
+from app.utils.config import Config
+
+# Each tesseract process would otherwise start one OpenMP thread per core,
+# multiplying with the pool size
+os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+
+
+class OCRTimeout(Exception):
+    pass
+
+
+class OCRPool:
+    """Process-wide, bounded pool for tesseract jobs.
+
+    At most ``max_workers`` tesseract subprocesses run at once in this
+    process no matter how many requests or pages ask for OCR; the rest wait
+    in the queue. Every job gets a timeout after which tesseract is killed,
+    and jobs that have not started yet can be cancelled. Queue depth and
+    wait/run times are tracked so bursts of uploads are visible.
+    """
+
+    def __init__(self, max_workers=None, job_timeout=None):
+        self.max_workers = max_workers or Config.OCR_WORKERS
+        self.job_timeout = job_timeout if job_timeout is not None else Config.OCR_JOB_TIMEOUT
+        self._executor = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._timeouts = 0
+        self._errors = 0
+        self._cancelled = 0
+        self._wait_times = deque(maxlen=1000)
+        self._run_times = deque(maxlen=1000)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='ocr')
+            return self._executor
+
+    def submit(self, image, timeout=None):
+        """Queue one image; the Future resolves to its text or raises OCRTimeout"""
+        timeout = self.job_timeout if timeout is None else timeout
+        with self._stats_lock:
+            self._queued += 1
+        future = self._get_executor().submit(self._run, image, timeout, time.perf_counter())
+        future.add_done_callback(self._on_done)
+        return future
+
+    def ocr(self, image, timeout=None):
+        """Blocking OCR of one image; returns "" on timeout or failure"""
+        try:
+            return self.submit(image, timeout).result()
+        except OCRTimeout:
+            print("OCR Error: tesseract timed out")
+            return ""
+        except Exception as e:
+            print(f"OCR Error: {str(e)}")
+            return ""
+
+    def _run(self, image, timeout, queued_at):
+        started = time.perf_counter()
+        with self._stats_lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_times.append(started - queued_at)
+        try:
+            return pytesseract.image_to_string(image, timeout=timeout)
+        except RuntimeError as e:
+            # pytesseract kills the subprocess and raises RuntimeError on timeout
+            if 'timeout' in str(e).lower():
+                with self._stats_lock:
+                    self._timeouts += 1
+                raise OCRTimeout(str(e))
+            raise
+        finally:
+            with self._stats_lock:
+                self._running -= 1
+                self._run_times.append(time.perf_counter() - started)
+
+    def _on_done(self, future):
+        with self._stats_lock:
+            if future.cancelled():
+                # Cancelled before it started, so it never left the queue
+                self._queued -= 1
+                self._cancelled += 1
+            elif future.exception() is not None:
+                if not isinstance(future.exception(), OCRTimeout):
+                    self._errors += 1
+            else:
+                self._completed += 1
+
+    def metrics(self):
+        with self._stats_lock:
+            wait_ms = np.array(self._wait_times) * 1000.0
+            run_ms = np.array(self._run_times) * 1000.0
+            return {
+                'pid': os.getpid(),
+                'max_workers': self.max_workers,
+                'job_timeout': self.job_timeout,
+                'queue_depth': self._queued,
+                'running': self._running,
+                'completed': self._completed,
+                'timeouts': self._timeouts,
+                'errors': self._errors,
+                'cancelled': self._cancelled,
+                'wait_ms': _summary(wait_ms),
+                'run_ms': _summary(run_ms)
+            }
+
+
+def _summary(values_ms):
+    if not values_ms.size:
+        return {'mean': 0.0, 'p95': 0.0, 'max': 0.0}
+    return {
+        'mean': float(values_ms.mean()),
+        'p95': float(np.percentile(values_ms, 95)),
+        'max': float(values_ms.max())
+    }
+
+
+ocr_pool = OCRPool()
@@ -5,9 +5,22 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
 import joblib
 import os
+from .features import FeatureSchema
 
 MODEL_PATH = 'pattern_detection_model.joblib'
 
+# Model input columns, in order
+FEATURES = [
+    'amount',
+    'days_since_policy_start',
+    'claim_weekday',
+    'time_since_last_claim',
+    'claim_count_past_year',
+    'avg_claim_amount'
+]
+# Inference builds rows with this instead of the DataFrame path used for training
+SCHEMA = FeatureSchema(FEATURES)
+
 class PatternDetector:
     def __init__(self):
         self.model = None
@@ -37,9 +50,9 @@ class PatternDetector:
         df = pd.DataFrame(claims_data)
         features = self._extract_features(df)
         
-        # Split data
+        # Split data; fitted on plain arrays, like the rows predict() builds
         X_train, X_test, y_train, y_test = train_test_split(
-            features, labels, test_size=0.2, random_state=42
+            features.to_numpy(dtype=float), labels, test_size=0.2, random_state=42
         )
         
         # Train model
@@ -61,28 +74,28 @@ class PatternDetector:
         if not self.model:
             raise ValueError("Model not trained yet")
         
-        df = pd.DataFrame(claims)
-        features = self._extract_features(df)
+        if hasattr(self.model, 'feature_names_in_'):
+            # Saved before models were fitted on arrays; it expects a DataFrame
+            features = self._extract_features(pd.DataFrame(claims))
+        else:
+            features = SCHEMA.matrix(claims)
         return self.model.predict_proba(features)[:, 1].tolist()
     
     def _extract_features(self, df):
-        """Extract relevant features for pattern detection"""
+        """Extract relevant features for pattern detection (training; SCHEMA rows match it)"""
         # Convert dates to numerical features
         df['claim_date'] = pd.to_datetime(df['claim_date'])
         df['days_since_policy_start'] = (df['claim_date'] - pd.to_datetime(df['policy_start_date'])).dt.days
         df['claim_weekday'] = df['claim_date'].dt.weekday
         
         # Create temporal features
-        df['time_since_last_claim'] = df.groupby('user_id')['claim_date'].diff().dt.days.fillna(0)
+        df['time_since_last_claim'] = df.groupby('user_id')['claim_date'].diff().dt.days
+        if 'previous_claim_date' in df.columns:
+            # The user's actual previous claim, from user_claim_stats, where known
+            since_previous = (df['claim_date'] - pd.to_datetime(df['previous_claim_date'])).dt.days
+            df['time_since_last_claim'] = since_previous.where(since_previous.notna(), df['time_since_last_claim'])
         
         # Select features
-        features = df[[
-            'amount',
-            'days_since_policy_start',
-            'claim_weekday',
-            'time_since_last_claim',
-            'claim_count_past_year',
-            'avg_claim_amount'
-        ]].fillna(0)
+        features = df[FEATURES].fillna(0)
         
         return features 
\ No newline at end of file
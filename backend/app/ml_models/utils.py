@@ -1,71 +1,62 @@
 import os
-import mimetypes
-from PIL import Image
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 import numpy as np
 from sklearn.preprocessing import StandardScaler
+from .decoded_document import as_document
 
-def validate_file_type(file_path, expected_types):
+def validate_file_type(document, expected_types):
     """Validate file type using multiple methods"""
-    try:
-        # First try with python-magic-bin
-        import magic
-        mime = magic.from_file(file_path, mime=True)
-    except (ImportError, AttributeError):
-        # Fallback to mimetypes if magic fails
-        mime, _ = mimetypes.guess_type(file_path)
-        if mime is None:
-            # If mimetypes can't determine, try to validate using PIL for images
-            try:
-                with Image.open(file_path) as img:
-                    mime = f'image/{img.format.lower()}'
-            except Exception:
-                return False
+    document = as_document(document)
+    mime = document.mime
+    if mime is None:
+        return False
     
     print(f"Detected MIME type: {mime}")  # Debug print
     return mime in expected_types
 
-def extract_image_metadata(image_path):
+def extract_image_metadata(document):
     """Extract basic metadata from images"""
-    try:
-        with Image.open(image_path) as img:
-            return {
-                'format': img.format,
-                'size': img.size,
-                'mode': img.mode,
-                'width': img.width,
-                'height': img.height
-            }
-    except Exception as e:
-        print(f"Error extracting metadata: {str(e)}")  # Debug print
-        return {
-            'format': 'unknown',
-            'size': [0, 0],
-            'mode': 'unknown',
-            'width': 0,
-            'height': 0
-        }
+    header = as_document(document).header
+    if header:
+        return dict(header)
 
-def calculate_ela(image_path, quality=90):
+    print("Error extracting metadata: not a readable image")  # Debug print
+    return {
+        'format': 'unknown',
+        'size': [0, 0],
+        'mode': 'unknown',
+        'width': 0,
+        'height': 0
+    }
+
+def calculate_ela(document, quality=90):
     """Calculate Error Level Analysis for image forensics"""
     try:
-        temp_path = 'temp.jpg'
-        original = cv2.imread(image_path)
+        original = as_document(document).pixels
         if original is None:
             return {'ela_mean': 0, 'ela_std': 0}
-            
-        cv2.imwrite(temp_path, original, [cv2.IMWRITE_JPEG_QUALITY, quality])
-        temp_image = cv2.imread(temp_path)
-        
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+
+        # Recompress in memory; no temp file, so concurrent calls are safe
+        encoded_ok, encoded = cv2.imencode('.jpg', original, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not encoded_ok:
+            return {'ela_mean': 0, 'ela_std': 0}
+        recompressed = cv2.imdecode(encoded, cv2.IMREAD_COLOR)
         
-        if original is None or temp_image is None:
+        if recompressed is None:
             return {'ela_mean': 0, 'ela_std': 0}
         
-        ela = np.abs(original.astype(np.float32) - temp_image.astype(np.float32))
-        ela_mean = float(np.mean(ela))
-        ela_std = float(np.std(ela))
+        # |a - b| on uint8 is exact and avoids two full-size float32 copies
+        ela = cv2.absdiff(original, recompressed)
+        channel_means, channel_stds = cv2.meanStdDev(ela)
+        channel_means = channel_means.ravel()
+        channel_stds = channel_stds.ravel()
+
+        # Every channel has the same pixel count, so the overall moments
+        # follow directly from the per-channel ones
+        ela_mean = float(channel_means.mean())
+        ela_var = float(np.mean(channel_stds ** 2 + channel_means ** 2)) - ela_mean ** 2
+        ela_std = float(np.sqrt(max(ela_var, 0.0)))
         
         return {
             'ela_mean': ela_mean,
@@ -75,6 +66,46 @@ def calculate_ela(image_path, quality=90):
         print(f"Error calculating ELA: {str(e)}")  # Debug print
         return {'ela_mean': 0, 'ela_std': 0}
 
+def calculate_ela_batch(documents, quality=90, max_workers=None):
+    """Run Error Level Analysis over many images in one call
+
+    OpenCV releases the GIL while encoding and diffing, so a thread pool
+    gives real parallelism. Results are returned in input order.
+    """
+    documents = list(documents)
+    if not documents:
+        return []
+    if max_workers is None:
+        max_workers = min(len(documents), os.cpu_count() or 1)
+    if max_workers <= 1:
+        return [calculate_ela(document, quality) for document in documents]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(lambda document: calculate_ela(document, quality), documents))
+
+def calculate_perceptual_hash(document):
+    """64-bit DCT perceptual hash (pHash) as a 16-character hex string
+
+    Resizing, recompression and mild crops move only a few bits, so
+    near-duplicate images end up within a small Hamming distance.
+    """
+    try:
+        pixels = as_document(document).pixels
+        if pixels is None:
+            return None
+        gray = cv2.cvtColor(pixels, cv2.COLOR_BGR2GRAY)
+        small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+        low_freq = cv2.dct(small)[:8, :8].ravel()
+        # Ignore the DC term so overall brightness does not drive the median
+        bits = low_freq > np.median(low_freq[1:])
+        value = 0
+        for bit in bits:
+            value = (value << 1) | int(bit)
+        return f'{value:016x}'
+    except Exception as e:
+        print(f"Error calculating perceptual hash: {str(e)}")  # Debug print
+        return None
+
 def preprocess_text(text):
     """Basic text preprocessing"""
     if text is None:
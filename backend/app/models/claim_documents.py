@@ -0,0 +1,146 @@
+import os
+from datetime import datetime
+from app import db
+
+# Verification entry keys that are stored as columns; the rest go to the payload
+ENTRY_COLUMNS = ('filename', 'saved_filename', 'sha256', 'username', 'uploaded_at', 'status')
+
+# Saved-file record keys and the columns they map to
+FILE_COLUMNS = {
+    'original_name': 'filename',
+    'saved_filename': 'saved_filename',
+    'saved_path': 'saved_path',
+    'sha256': 'sha256',
+    'size': 'size',
+    'username': 'username',
+    'uploaded_at': 'uploaded_at'
+}
+
+ROW_KEYS = (
+    'position', 'filename', 'saved_filename', 'saved_path', 'sha256', 'size', 'username',
+    'uploaded_at', 'status', 'valid', 'ela_score', 'verified_at', 'payload'
+)
+
+
+def _parse_timestamp(value):
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return value
+
+
+def entry_columns(fields, payload=None):
+    """Split verification entry fields into column values and an updated payload"""
+    payload = dict(payload or {})
+    values = {}
+    for key, value in fields.items():
+        if key in ENTRY_COLUMNS:
+            values[key] = value
+        elif key == 'verified_at':
+            values['verified_at'] = _parse_timestamp(value)
+        else:
+            payload[key] = value
+
+    result = payload.get('verification_result')
+    if isinstance(result, dict):
+        values['valid'] = bool(result.get('valid'))
+        values['ela_score'] = (result.get('ela_results') or {}).get('ela_mean')
+    values['payload'] = payload
+    return values
+
+
+def document_row(entry=None, file_info=None, position=0):
+    """Column values for one document from a verification entry and/or saved-file record
+
+    Every key in ``ROW_KEYS`` is present, so rows can go straight into an
+    executemany insert. Entries without a status count as completed, as
+    they always have.
+    """
+    row = dict.fromkeys(ROW_KEYS)
+    row.update(position=position, status='completed', payload={})
+    if isinstance(file_info, str):
+        file_info = {'saved_path': file_info, 'original_name': os.path.basename(file_info)}
+    for key, value in (file_info or {}).items():
+        if key in FILE_COLUMNS:
+            row[FILE_COLUMNS[key]] = value
+    if entry:
+        row.update(entry_columns(entry))
+    return row
+
+
+def summarize(documents):
+    """Claim summary columns for documents given as (status, ela_score) pairs"""
+    documents = list(documents)
+    scores = [ela_score for _, ela_score in documents if ela_score is not None]
+    return {
+        'document_count': len(documents),
+        'documents_completed': sum(1 for status, _ in documents if status == 'completed'),
+        'documents_failed': sum(1 for status, _ in documents if status == 'failed'),
+        'max_ela_score': max(scores) if scores else None
+    }
+
+
+class ClaimDocument(db.Model):
+    """One uploaded document of a claim and the outcome of verifying it
+
+    Small fields that listings and filters need are columns. The verification
+    output itself (OCR text, metadata, ELA statistics, duplicate matches) is
+    the deferred ``payload`` and is only read when a caller asks for it.
+    """
+    __tablename__ = 'claim_documents'
+
+    id = db.Column(db.Integer, primary_key=True)
+    claim_id = db.Column(db.Integer, db.ForeignKey('claims.id'), nullable=False, index=True)
+    position = db.Column(db.Integer, nullable=False, default=0)
+    filename = db.Column(db.String(255), nullable=True)  # Name as uploaded
+    saved_filename = db.Column(db.String(255), nullable=True)
+    saved_path = db.Column(db.String(512), nullable=True)
+    sha256 = db.Column(db.String(64), nullable=True, index=True)
+    size = db.Column(db.Integer, nullable=True)
+    username = db.Column(db.String(80), nullable=True)
+    uploaded_at = db.Column(db.String(32), nullable=True)  # Timestamp as used in the saved filename
+    status = db.Column(db.String(20), default='processing')  # 'processing', 'completed', 'failed'
+    valid = db.Column(db.Boolean, nullable=True)
+    ela_score = db.Column(db.Float, nullable=True)
+    verified_at = db.Column(db.DateTime, nullable=True)
+    payload = db.deferred(db.Column(db.JSON, nullable=True))
+
+    claim = db.relationship('Claim', back_populates='documents')
+
+    @classmethod
+    def from_entry(cls, entry=None, file_info=None, position=0):
+        return cls(**document_row(entry, file_info, position))
+
+    def apply(self, fields):
+        """Merge verification entry fields into the columns and payload"""
+        for key, value in entry_columns(fields, self.payload).items():
+            setattr(self, key, value)
+
+    def to_entry(self):
+        """The document as a ``verification_results`` entry"""
+        entry = {
+            'filename': self.filename,
+            'saved_filename': self.saved_filename,
+            'username': self.username,
+            'uploaded_at': self.uploaded_at,
+            'sha256': self.sha256,
+            'status': self.status
+        }
+        if self.verified_at:
+            entry['verified_at'] = self.verified_at.isoformat()
+        entry.update(self.payload or {})
+        return entry
+
+    def to_file_dict(self):
+        """The document as a ``files`` record"""
+        return {
+            'original_name': self.filename,
+            'saved_path': self.saved_path,
+            'saved_filename': self.saved_filename,
+            'sha256': self.sha256,
+            'size': self.size,
+            'username': self.username,
+            'uploaded_at': self.uploaded_at
+        }
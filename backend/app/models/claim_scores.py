@@ -0,0 +1,33 @@
+from datetime import datetime
+from app import db
+
+class ClaimScore(db.Model):
+    """Latest model scores of a claim, written by bulk rescoring runs
+
+    Kept apart from the claims table so rescoring never bumps a claim's
+    version or conflicts with reviewers editing it.
+    """
+    __tablename__ = 'claim_scores'
+
+    claim_id = db.Column(db.Integer, db.ForeignKey('claims.id', ondelete='CASCADE'), primary_key=True)
+    anomaly_score = db.Column(db.Float, nullable=True)
+    is_anomaly = db.Column(db.Boolean, nullable=True)
+    fraud_probability = db.Column(db.Float, nullable=True)
+    rl_decision = db.Column(db.String(20), nullable=True)
+    rl_confidence = db.Column(db.Float, nullable=True)
+    anomaly_model_version = db.Column(db.String(64), nullable=True)
+    run_id = db.Column(db.String(32), nullable=True, index=True)
+    scored_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'claim_id': self.claim_id,
+            'anomaly_score': self.anomaly_score,
+            'is_anomaly': self.is_anomaly,
+            'fraud_probability': self.fraud_probability,
+            'rl_decision': self.rl_decision,
+            'rl_confidence': self.rl_confidence,
+            'anomaly_model_version': self.anomaly_model_version,
+            'run_id': self.run_id,
+            'scored_at': self.scored_at.isoformat() if self.scored_at else None
+        }
@@ -1,19 +1,47 @@
 from datetime import datetime
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
 from app import db
+from app.models.claim_documents import ClaimDocument, summarize
+from app.models.claim_scores import ClaimScore
 
 class Claim(db.Model):
     __tablename__ = 'claims'
+    __table_args__ = (
+        # Listing: newest first, optionally filtered by status or type, keyset on (submitted_at, id)
+        db.Index('ix_claims_submitted_at_id', 'submitted_at', 'id'),
+        db.Index('ix_claims_status_submitted_at_id', 'status', 'submitted_at', 'id'),
+        db.Index('ix_claims_claim_type_submitted_at_id', 'claim_type', 'submitted_at', 'id'),
+        # A user's claim history (AI features, profile pages)
+        db.Index('ix_claims_user_id_submitted_at', 'user_id', 'submitted_at'),
+        # Foreign keys walked by the fraud graph and reviewer views
+        db.Index('ix_claims_policy_id', 'policy_id'),
+        db.Index('ix_claims_reviewed_by', 'reviewed_by'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     claim_type = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=True)
+    # Claimed amount; NULL on claims filed before it existed (ensure_columns
+    # adds it to older databases). Exports pass it through; the amount
+    # features and user_claim_stats totals count NULL as 0
+    amount = db.Column(db.Float, nullable=True)
     submitted_at = db.Column(db.DateTime, default=datetime.utcnow)
     status = db.Column(db.String(50), default='pending')
-    
-    # Store the verification results and files as JSON
-    verification_results = db.Column(db.JSON, nullable=True)
-    files = db.Column(db.JSON, nullable=True)  # Will store array of file paths
-    
+
+    # Summary of the claim's documents, kept in step with claim_documents
+    # so listings and filters never have to read the documents themselves
+    document_count = db.Column(db.Integer, default=0, server_default='0')
+    documents_completed = db.Column(db.Integer, default=0, server_default='0')
+    documents_failed = db.Column(db.Integer, default=0, server_default='0')
+    max_ela_score = db.Column(db.Float, nullable=True)
+    risk_score = db.Column(db.Float, nullable=True)
+
+    # Optimistic concurrency for reviewers: status updates compare and bump
+    # it explicitly, so machine writes (document summaries, risk scores)
+    # never make a reviewer's copy stale
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+
     # Foreign keys
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     policy_id = db.Column(db.Integer, db.ForeignKey('policies.id'), nullable=True)
@@ -28,20 +56,100 @@ class Claim(db.Model):
     claimant = db.relationship('User', foreign_keys=[user_id], back_populates='submitted_claims')
     reviewer = db.relationship('User', foreign_keys=[reviewed_by], back_populates='reviewed_claims')
     policy = db.relationship('Policy', back_populates='claims')
+    documents = db.relationship(
+        'ClaimDocument', back_populates='claim',
+        order_by=ClaimDocument.position, cascade='all, delete-orphan'
+    )
+    # Latest bulk rescoring result; written by the rescoring job only
+    score = db.relationship(ClaimScore, uselist=False, viewonly=True)
+
+    def _documents_with_payload(self):
+        documents = self.documents
+        unloaded = [d.id for d in documents if d.id is not None and 'payload' in inspect(d).unloaded]
+        if unloaded:
+            # One query for all deferred payloads instead of one per document
+            ClaimDocument.query.options(load_only(ClaimDocument.payload)).filter(
+                ClaimDocument.id.in_(unloaded)
+            ).all()
+        return documents
 
-    def to_dict(self):
+    @property
+    def verification_results(self):
+        """Per-document verification entries, including their payloads"""
+        return [document.to_entry() for document in self._documents_with_payload()]
+
+    @property
+    def files(self):
+        """Saved-file records of the claim's documents"""
+        return [document.to_file_dict() for document in self.documents]
+
+    def refresh_summary(self):
+        """Recompute the document summary columns from the claim's documents"""
+        summary = summarize((document.status, document.ela_score) for document in self.documents)
+        for key, value in summary.items():
+            setattr(self, key, value)
+
+    def verification_progress(self):
+        """Per-file verification progress for claims still being processed"""
+        total = self.document_count or 0
+        completed = self.documents_completed or 0
+        failed = self.documents_failed or 0
         return {
-            'id': self.id,
-            'claim_type': self.claim_type,
-            'description': self.description,
-            'submitted_at': self.submitted_at.isoformat() if self.submitted_at else None,
-            'status': self.status,
-            'verification_results': self.verification_results or [],
-            'files': self.files or [],
-            'review_notes': self.review_notes,
-            'reviewed_at': self.reviewed_at.isoformat() if self.reviewed_at else None,
-            'reviewed_by': self.reviewed_by,
-            'user_id': self.user_id,
-            'policy_id': self.policy_id,
-            'username': self.claimant.username if self.claimant else None
-        } 
\ No newline at end of file
+            'total': total,
+            'completed': completed,
+            'failed': failed,
+            'processing': total - completed - failed
+        }
+
+    # Serializable fields, in to_dict order, with the columns each one reads
+    # so listings can load only what a fields= projection asks for;
+    # DOCUMENT_FIELDS additionally read the claim_documents rows
+    FIELD_COLUMNS = {
+        'id': ['id'],
+        'claim_type': ['claim_type'],
+        'description': ['description'],
+        'amount': ['amount'],
+        'submitted_at': ['submitted_at'],
+        'status': ['status'],
+        'verification_results': [],
+        'files': [],
+        'document_count': ['document_count'],
+        'max_ela_score': ['max_ela_score'],
+        'risk_score': ['risk_score'],
+        'review_notes': ['review_notes'],
+        'reviewed_at': ['reviewed_at'],
+        'reviewed_by': ['reviewed_by'],
+        'user_id': ['user_id'],
+        'policy_id': ['policy_id'],
+        'version': ['version'],
+        'username': ['user_id'],
+        'verification_progress': ['document_count', 'documents_completed', 'documents_failed'],
+        'model_scores': []
+    }
+    DOCUMENT_FIELDS = {'verification_results', 'files'}
+
+    def to_dict(self, fields=None):
+        """Serialize the claim; ``fields`` limits output (and attribute access) to those keys"""
+        serializers = {
+            'id': lambda: self.id,
+            'claim_type': lambda: self.claim_type,
+            'description': lambda: self.description,
+            'amount': lambda: self.amount,
+            'submitted_at': lambda: self.submitted_at.isoformat() if self.submitted_at else None,
+            'status': lambda: self.status,
+            'verification_results': lambda: self.verification_results,
+            'files': lambda: self.files,
+            'document_count': lambda: self.document_count or 0,
+            'max_ela_score': lambda: self.max_ela_score,
+            'risk_score': lambda: self.risk_score,
+            'review_notes': lambda: self.review_notes,
+            'reviewed_at': lambda: self.reviewed_at.isoformat() if self.reviewed_at else None,
+            'reviewed_by': lambda: self.reviewed_by,
+            'user_id': lambda: self.user_id,
+            'policy_id': lambda: self.policy_id,
+            'version': lambda: self.version,
+            'username': lambda: self.claimant.username if self.claimant else None,
+            'verification_progress': self.verification_progress,
+            'model_scores': lambda: self.score.to_dict() if self.score else None
+        }
+        return {name: serializers[name]() for name in (fields or serializers)}
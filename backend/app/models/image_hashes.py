@@ -0,0 +1,29 @@
+from datetime import datetime
+from app import db
+
+class ImageHash(db.Model):
+    """Perceptual hash of one claim image, split into four 16-bit chunks
+
+    Each chunk is indexed on its own, so near-duplicate lookups can use
+    multi-index hashing instead of scanning every stored hash.
+    """
+    __tablename__ = 'image_hashes'
+
+    id = db.Column(db.Integer, primary_key=True)
+    claim_id = db.Column(db.Integer, db.ForeignKey('claims.id'), nullable=False, index=True)
+    filename = db.Column(db.String(255), nullable=True)
+    phash = db.Column(db.String(16), nullable=False)
+    chunk0 = db.Column(db.Integer, nullable=False, index=True)
+    chunk1 = db.Column(db.Integer, nullable=False, index=True)
+    chunk2 = db.Column(db.Integer, nullable=False, index=True)
+    chunk3 = db.Column(db.Integer, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'claim_id': self.claim_id,
+            'filename': self.filename,
+            'phash': self.phash,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
@@ -3,6 +3,10 @@ from .. import db
 
 class Policy(BaseModel):
     __tablename__ = 'policies'
+    __table_args__ = (
+        db.Index('ix_policies_user_id', 'user_id'),
+        db.Index('ix_policies_status', 'status'),
+    )
     
     policy_number = db.Column(db.String(50), unique=True, nullable=False)
     policy_type = db.Column(db.String(50), nullable=False)  # 'auto', 'health', 'life', etc.
@@ -0,0 +1,208 @@
+from datetime import datetime
+from sqlalchemy import case, delete, event, inspect, select
+from app import db
+from app.utils.database import upsert
+from app.models.claims import Claim
+from app.models.policies import Policy
+
+# Claim columns the aggregates are computed from
+TRACKED_COLUMNS = ('user_id', 'amount', 'submitted_at', 'policy_id')
+
+
+def month_key(moment):
+    """yyyymm of a datetime, the bucket of the rolling-window counts"""
+    return moment.year * 100 + moment.month
+
+
+def months_back(month, n):
+    """The yyyymm ``n`` months before ``month``"""
+    index = (month // 100) * 12 + (month % 100 - 1) - n
+    return (index // 12) * 100 + index % 12 + 1
+
+
+class UserClaimStats(db.Model):
+    """Running claim aggregates of one user, so model features are one row read
+
+    Updated in the inserting transaction whenever a claim is added, and
+    rebuilt for the user when a claim is deleted or its user, amount, time
+    or policy changes.
+    """
+    __tablename__ = 'user_claim_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    claim_count = db.Column(db.Integer, nullable=False, default=0)
+    total_amount = db.Column(db.Float, nullable=False, default=0.0)
+    first_claim_at = db.Column(db.DateTime, nullable=True)
+    last_claim_at = db.Column(db.DateTime, nullable=True)
+    last_claim_id = db.Column(db.Integer, nullable=True)
+    # Claim before the last one, so the newest claim's gap needs no history scan
+    previous_claim_at = db.Column(db.DateTime, nullable=True)
+    # Earliest start of the policies the user has claimed on (customer tenure)
+    first_policy_start = db.Column(db.Date, nullable=True)
+
+    @property
+    def avg_claim_amount(self):
+        return self.total_amount / self.claim_count if self.claim_count else 0
+
+    def to_dict(self):
+        return {
+            'user_id': self.user_id,
+            'claim_count': self.claim_count,
+            'total_amount': self.total_amount,
+            'avg_claim_amount': self.avg_claim_amount,
+            'first_claim_at': self.first_claim_at.isoformat() if self.first_claim_at else None,
+            'last_claim_at': self.last_claim_at.isoformat() if self.last_claim_at else None,
+            'first_policy_start': self.first_policy_start.isoformat() if self.first_policy_start else None
+        }
+
+
+class UserClaimMonth(db.Model):
+    """A user's claim count and amount in one calendar month (rolling-window buckets)"""
+    __tablename__ = 'user_claim_months'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    month = db.Column(db.Integer, primary_key=True)  # yyyymm
+    claim_count = db.Column(db.Integer, nullable=False, default=0)
+    total_amount = db.Column(db.Float, nullable=False, default=0.0)
+
+
+def _earlier(new, old):
+    # The earlier of two nullable columns; a NULL never wins over a value
+    return case((old.is_(None), new), (new < old, new), else_=old)
+
+
+def add_claim(connection, claim_id, user_id, amount, submitted_at, policy_start=None):
+    """Fold one new claim into its user's aggregates with two atomic upserts"""
+    stats = UserClaimStats.__table__.c
+    amount = amount or 0.0
+
+    def merge(new):
+        # Right-hand sides all see the row as it was before this update
+        newest = new.last_claim_at >= stats.last_claim_at
+        return {
+            'claim_count': stats.claim_count + 1,
+            'total_amount': stats.total_amount + new.total_amount,
+            'first_claim_at': _earlier(new.first_claim_at, stats.first_claim_at),
+            'last_claim_at': case((newest, new.last_claim_at), else_=stats.last_claim_at),
+            'last_claim_id': case((newest, new.last_claim_id), else_=stats.last_claim_id),
+            'previous_claim_at': case(
+                (newest, stats.last_claim_at),
+                (stats.previous_claim_at.is_(None), new.last_claim_at),
+                (new.last_claim_at > stats.previous_claim_at, new.last_claim_at),
+                else_=stats.previous_claim_at
+            ),
+            'first_policy_start': _earlier(new.first_policy_start, stats.first_policy_start)
+        }
+
+    upsert(connection, UserClaimStats.__table__, {
+        'user_id': user_id, 'claim_count': 1, 'total_amount': amount,
+        'first_claim_at': submitted_at, 'last_claim_at': submitted_at, 'last_claim_id': claim_id,
+        'previous_claim_at': None, 'first_policy_start': policy_start
+    }, ['user_id'], merge)
+
+    months = UserClaimMonth.__table__.c
+    upsert(connection, UserClaimMonth.__table__, {
+        'user_id': user_id, 'month': month_key(submitted_at), 'claim_count': 1, 'total_amount': amount
+    }, ['user_id', 'month'], lambda new: {
+        'claim_count': months.claim_count + 1,
+        'total_amount': months.total_amount + new.total_amount
+    })
+
+
+def rebuild_user_stats(connection, user_ids=None, batch_size=5000):
+    """Recompute aggregates from the claims table for ``user_ids`` (every user by default)
+
+    Returns the number of users with claims. Claims are read in one ordered
+    pass and rows are written in executemany batches.
+    """
+    stats_table, months_table = UserClaimStats.__table__, UserClaimMonth.__table__
+    for table in (stats_table, months_table):
+        statement = delete(table)
+        if user_ids is not None:
+            statement = statement.where(table.c.user_id.in_(user_ids))
+        connection.execute(statement)
+
+    query = select(
+        Claim.user_id, Claim.id, Claim.amount, Claim.submitted_at, Policy.start_date
+    ).outerjoin(Policy, Claim.policy_id == Policy.id).where(
+        Claim.user_id.isnot(None), Claim.submitted_at.isnot(None)
+    ).order_by(Claim.user_id, Claim.submitted_at, Claim.id)
+    if user_ids is not None:
+        query = query.where(Claim.user_id.in_(user_ids))
+
+    stats_rows, month_rows = [], []
+    users = 0
+    current = None
+    months = {}
+
+    def flush(force=False):
+        if stats_rows and (force or len(stats_rows) >= batch_size):
+            connection.execute(stats_table.insert(), stats_rows)
+            connection.execute(months_table.insert(), month_rows)
+            stats_rows.clear()
+            month_rows.clear()
+
+    def finish():
+        stats_rows.append(current)
+        month_rows.extend(
+            {'user_id': current['user_id'], 'month': month, 'claim_count': count, 'total_amount': total}
+            for month, (count, total) in months.items()
+        )
+        flush()
+
+    for user_id, claim_id, amount, submitted_at, policy_start in connection.execute(query):
+        if current is None or current['user_id'] != user_id:
+            if current is not None:
+                finish()
+            users += 1
+            current = {
+                'user_id': user_id, 'claim_count': 0, 'total_amount': 0.0,
+                'first_claim_at': submitted_at, 'last_claim_at': None, 'last_claim_id': None,
+                'previous_claim_at': None, 'first_policy_start': None
+            }
+            months = {}
+        current['claim_count'] += 1
+        current['total_amount'] += amount or 0.0
+        current['previous_claim_at'] = current['last_claim_at']
+        current['last_claim_at'], current['last_claim_id'] = submitted_at, claim_id
+        if policy_start is not None and (current['first_policy_start'] is None or policy_start < current['first_policy_start']):
+            current['first_policy_start'] = policy_start
+        count, total = months.get(month_key(submitted_at), (0, 0.0))
+        months[month_key(submitted_at)] = (count + 1, total + (amount or 0.0))
+    if current is not None:
+        finish()
+    flush(force=True)
+    return users
+
+
+@event.listens_for(Claim, 'after_insert')
+def _claim_inserted(mapper, connection, target):
+    if target.user_id is None:
+        return
+    submitted_at = target.submitted_at or datetime.utcnow()
+    policy_start = None
+    if target.policy_id is not None:
+        policy_start = connection.execute(
+            select(Policy.start_date).where(Policy.id == target.policy_id)
+        ).scalar()
+    if connection.dialect.name in ('sqlite', 'postgresql'):
+        add_claim(connection, target.id, target.user_id, target.amount, submitted_at, policy_start)
+    else:
+        rebuild_user_stats(connection, [target.user_id])
+
+
+@event.listens_for(Claim, 'after_update')
+def _claim_updated(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[name].history.has_changes() for name in TRACKED_COLUMNS):
+        return
+    # The old owner too, when a claim moves to another user
+    user_ids = {target.user_id, *state.attrs.user_id.history.deleted} - {None}
+    if user_ids:
+        rebuild_user_stats(connection, list(user_ids))
+
+
+@event.listens_for(Claim, 'after_delete')
+def _claim_deleted(mapper, connection, target):
+    if target.user_id is not None:
+        rebuild_user_stats(connection, [target.user_id])
@@ -1,29 +1,41 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from app.models.claims import Claim
-from app.ml_models.document_verification import DocumentVerifier
-from app.ml_models.anomaly_detection import AnomalyDetector
+from app.models.claim_documents import ClaimDocument
+from app.models.users import User
 from app import db
 import os
 from datetime import datetime, timedelta
 import traceback
+import base64
+import json
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import joinedload, load_only, selectinload
 import numpy as np
 from .services.graph_analysis import InsuranceFraudGraph
-from app.services.rl_fraud_service import RLFraudService
+from app.services.model_registry import model_registry
+from app.services.ai_service import AIService
+from app.services.verification_pool import verification_pool
+from app.utils.helpers import save_upload_stream
+from app.utils.uploads import IngestStream
+from app.utils.config import Config
+from werkzeug.exceptions import HTTPException
+from werkzeug.utils import secure_filename
+from app.ml_models.inference_queue import queue_metrics
+from app.ml_models.ocr_pool import ocr_pool
+from app.services.data_version import data_version
+from app.services.rescoring import rescore_runner
+from app.services.claims_export import EXPORT_FORMATS, ExportError, check_format, export_statement, iter_export
+from app.utils.http_cache import conditional_cache, response_cache
 from flask_jwt_extended import jwt_required
+from app.auth.identity import current_identity, user_cache
 
 main_bp = Blueprint('main', __name__)
 
-UPLOAD_FOLDER = 'uploads'
+UPLOAD_FOLDER = Config.UPLOAD_FOLDER
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-# Initialize the document verifier
-document_verifier = DocumentVerifier()
-
-# Initialize the anomaly detector
-anomaly_detector = AnomalyDetector()
-
-# Initialize RL service
-rl_service = RLFraudService()
+# Models are loaded lazily through the process-wide registry (or up front
+# via /warmup), so importing the routes stays cheap
 
 @main_bp.route("/ping")
 def ping():
@@ -31,11 +43,98 @@ def ping():
         "Response": "Pong!"
     })
 
+@main_bp.route('/warmup', methods=['POST'])
+@jwt_required()
+def warmup_models():
+    identity = current_identity()
+    if identity is None or identity.role != 'admin':
+        return jsonify({
+            "status": "error",
+            "message": "Admin access required"
+        }), 403
+
+    try:
+        data = request.get_json(silent=True) or {}
+        models = model_registry.warmup(data.get('models'))
+        return jsonify({
+            "status": "success",
+            "data": {
+                "models": models
+            }
+        })
+    except Exception as e:
+        print(f"Error in warmup: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+@main_bp.route('/api/rescore-claims', methods=['POST'])
+@jwt_required()
+def rescore_claims():
+    """Start rescoring the open claims in the background (admin only)"""
+    identity = current_identity()
+    if identity is None or identity.role != 'admin':
+        return jsonify({
+            "status": "error",
+            "message": "Admin access required"
+        }), 403
+
+    data = request.get_json(silent=True) or {}
+    statuses = data.get('statuses')
+    if statuses is not None and (not isinstance(statuses, list) or not all(isinstance(s, str) for s in statuses)):
+        return jsonify({
+            "status": "error",
+            "message": "statuses must be a list of claim statuses"
+        }), 400
+
+    started = rescore_runner.start(
+        statuses=statuses,
+        workers=data.get('workers'),
+        restart=bool(data.get('restart', False))
+    )
+    if not started:
+        return jsonify({
+            "status": "error",
+            "message": "A rescoring run is already in progress"
+        }), 409
+    return jsonify({
+        "status": "success",
+        "message": "Rescoring started",
+        "data": rescore_runner.status()
+    }), 202
+
+@main_bp.route('/api/rescore-claims', methods=['GET'])
+@jwt_required()
+def rescore_status():
+    """Progress of the current or last rescoring run"""
+    identity = current_identity()
+    if identity is None or identity.role != 'admin':
+        return jsonify({
+            "status": "error",
+            "message": "Admin access required"
+        }), 403
+
+    return jsonify({
+        "status": "success",
+        "data": rescore_runner.status()
+    })
+
+@main_bp.route('/api/models', methods=['GET'])
+def get_model_status():
+    return jsonify({
+        'success': True,
+        'models': model_registry.stats()
+    })
+
 @main_bp.route('/submit-claim', methods=['POST'])
 def submit_claim():
+    documents = []
+    saved = False
     try:
         claim_type = request.form.get('claimType')
         description = request.form.get('description')
+        amount = request.form.get('amount', type=float)
         files = request.files.getlist('files')
         username = request.form.get('username', 'demouser123')
 
@@ -45,109 +144,190 @@ def submit_claim():
                 "message": "No files uploaded"
             }), 400
 
-        verification_results = []
-        saved_files = []
-
         for file in files:
             if file:
                 # Create a unique filename with username and timestamp
                 timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
                 original_filename = file.filename
                 file_extension = os.path.splitext(original_filename)[1]
-                unique_filename = f"{username}_{timestamp}_{original_filename}"
+                unique_filename = secure_filename(f"{username}_{timestamp}_{original_filename}")
                 
                 # Ensure upload folder exists
                 if not os.path.exists(UPLOAD_FOLDER):
                     os.makedirs(UPLOAD_FOLDER)
                 
                 filepath = os.path.join(UPLOAD_FOLDER, unique_filename)
-                file.save(filepath)
-                saved_files.append({
-                    'original_name': original_filename,
-                    'saved_path': filepath,
-                    'username': username,
-                    'uploaded_at': timestamp
-                })
+                if isinstance(file.stream, IngestStream):
+                    # Already hashed, checked and written to the upload
+                    # folder while the request was parsed; just name it
+                    content_hash, size = file.stream.sha256, file.stream.size
+                    file.stream.commit(filepath)
+                else:
+                    content_hash, size = save_upload_stream(file, filepath)
+                # Verification runs in the worker pool; the document is
+                # filled in as soon as this file has been processed
+                documents.append(ClaimDocument(
+                    position=len(documents),
+                    filename=original_filename,
+                    saved_filename=unique_filename,
+                    saved_path=filepath,
+                    sha256=content_hash,
+                    size=size,
+                    username=username,
+                    uploaded_at=timestamp,
+                    status='processing'
+                ))
 
-                try:
-                    result = document_verifier.verify_document(filepath)
-                    verification_results.append({
-                        'filename': original_filename,
-                        'saved_filename': unique_filename,
-                        'username': username,
-                        'uploaded_at': timestamp,
-                        'verification_result': result
-                    })
-                except Exception as e:
-                    verification_results.append({
-                        'filename': original_filename,
-                        'saved_filename': unique_filename,
-                        'username': username,
-                        'uploaded_at': timestamp,
-                        'verification_result': {
-                            'valid': False,
-                            'reason': str(e)
-                        }
-                    })
+        if not documents:
+            # Every file input was empty; nothing would ever move the
+            # claim out of 'processing'
+            return jsonify({
+                "status": "error",
+                "message": "No files uploaded"
+            }), 400
 
         # Create new claim record
         new_claim = Claim(
             claim_type=claim_type,
             description=description,
-            files=saved_files,
-            verification_results=verification_results,
-            status='pending'
+            amount=amount,
+            documents=documents,
+            status='processing'
         )
+        new_claim.refresh_summary()
 
         # Save to database
         db.session.add(new_claim)
         db.session.commit()
+        saved = True
+
+        verification_pool.submit_claim_files(new_claim.id, new_claim.files)
 
         return jsonify({
             "status": "success",
-            "message": "Claim submitted successfully",
+            "message": "Claim submitted, documents are being verified",
             "data": new_claim.to_dict()
-        })
+        }), 202
 
+    except HTTPException:
+        # Uploads rejected mid-stream (size/type) keep their 4xx status
+        raise
     except Exception as e:
         print("Error in submit_claim:")
         print(traceback.format_exc())
+        if not saved:
+            # No claim refers to the files written so far
+            db.session.rollback()
+            for document in documents:
+                if os.path.exists(document.saved_path):
+                    os.remove(document.saved_path)
         return jsonify({
             "status": "error",
             "message": f"Server error: {str(e)}",
             "traceback": traceback.format_exc()
         }), 500
 
+def encode_cursor(claim):
+    """Opaque keyset cursor for the position just after ``claim``"""
+    payload = json.dumps([claim.submitted_at.isoformat() if claim.submitted_at else None, claim.id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(cursor):
+    submitted_at, claim_id = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    return (datetime.fromisoformat(submitted_at) if submitted_at else None), int(claim_id)
+
+def filter_claims_query(query, args):
+    """Apply the /claims filter parameters to a claims query"""
+    status = args.get('status')
+    claim_type = args.get('claim_type')
+    if status:
+        query = query.filter(Claim.status == status)
+    if claim_type:
+        query = query.filter(Claim.claim_type == claim_type)
+    return query
+
 @main_bp.route('/claims', methods=['GET'])
+@conditional_cache
 def get_claims():
     try:
         # Get optional filter parameters
         status = request.args.get('status')
         claim_type = request.args.get('claim_type')
+        cursor = request.args.get('cursor')
+        limit = min(request.args.get('limit', Config.CLAIMS_PAGE_SIZE, type=int), Config.CLAIMS_MAX_PAGE_SIZE)
+        fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()] or None
 
         print(f"Fetching claims with filters - status: {status}, claim_type: {claim_type}")  # Debug print
 
-        # Start with base query
-        query = Claim.query
+        if limit < 1:
+            return jsonify({
+                "status": "error",
+                "message": "limit must be positive"
+            }), 400
+
+        unknown_fields = [f for f in fields or [] if f not in Claim.FIELD_COLUMNS]
+        if unknown_fields:
+            return jsonify({
+                "status": "error",
+                "message": f"Unknown fields: {', '.join(unknown_fields)}"
+            }), 400
+
+        # Start with base query and apply filters if provided
+        query = filter_claims_query(Claim.query, request.args)
+
+        # Only load the columns the projection needs; id and submitted_at
+        # are always needed for the cursor
+        if fields:
+            columns = {'id', 'submitted_at'}
+            for field in fields:
+                columns.update(Claim.FIELD_COLUMNS[field])
+            query = query.options(load_only(*[getattr(Claim, column) for column in columns]))
+
+        # Fetch claimant usernames in the same query instead of one per row
+        if not fields or 'username' in fields:
+            query = query.options(joinedload(Claim.claimant).load_only(User.username))
+
+        # Latest rescoring results, joined in rather than one query per row
+        if not fields or 'model_scores' in fields:
+            query = query.options(joinedload(Claim.score))
+
+        # Document rows (and their payloads) only when the projection includes them,
+        # in one query per page
+        if not fields or Claim.DOCUMENT_FIELDS.intersection(fields):
+            documents = selectinload(Claim.documents)
+            if not fields or 'verification_results' in fields:
+                documents = documents.undefer(ClaimDocument.payload)
+            query = query.options(documents)
 
-        # Apply filters if provided
-        if status:
-            query = query.filter_by(status=status)
-        if claim_type:
-            query = query.filter_by(claim_type=claim_type)
+        # Keyset pagination on (submitted_at, id), newest first
+        if cursor:
+            try:
+                cursor_submitted_at, cursor_id = decode_cursor(cursor)
+            except (ValueError, TypeError):
+                return jsonify({
+                    "status": "error",
+                    "message": "Invalid cursor"
+                }), 400
+            query = query.filter(or_(
+                Claim.submitted_at < cursor_submitted_at,
+                and_(Claim.submitted_at == cursor_submitted_at, Claim.id < cursor_id)
+            ))
 
-        # Execute query and get all claims
-        claims = query.order_by(Claim.submitted_at.desc()).all()
+        # Fetch one extra row to know whether another page exists
+        claims = query.order_by(Claim.submitted_at.desc(), Claim.id.desc()).limit(limit + 1).all()
+        has_more = len(claims) > limit
+        claims = claims[:limit]
         print(f"Found {len(claims)} claims")  # Debug print
 
         # Convert claims to dict
-        claims_data = [claim.to_dict() for claim in claims]
+        claims_data = [claim.to_dict(fields) for claim in claims]
         print("Successfully converted claims to dict")  # Debug print
 
         return jsonify({
             "status": "success",
             "data": {
-                "claims": claims_data
+                "claims": claims_data,
+                "next_cursor": encode_cursor(claims[-1]) if has_more else None
             }
         })
 
@@ -160,6 +340,58 @@ def get_claims():
             "traceback": traceback.format_exc()
         }), 500
 
+@main_bp.route('/claims/export', methods=['GET'])
+def export_claims():
+    """Stream every claim matching the /claims filters as NDJSON, CSV or Parquet"""
+    export_format = request.args.get('format', 'ndjson')
+    chunk_size = request.args.get('chunk_size', Config.EXPORT_CHUNK_SIZE, type=int)
+
+    if chunk_size < 1:
+        return jsonify({
+            "status": "error",
+            "message": "chunk_size must be positive"
+        }), 400
+    try:
+        check_format(export_format)
+    except ExportError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+
+    statement = filter_claims_query(export_statement(), request.args)
+    filename = f"claims_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+    return Response(
+        stream_with_context(iter_export(statement, export_format, min(chunk_size, Config.CLAIMS_MAX_PAGE_SIZE))),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+@main_bp.route('/claims/<int:claim_id>/progress', methods=['GET'])
+def get_claim_progress(claim_id):
+    claim = Claim.query.get(claim_id)
+    if not claim:
+        return jsonify({
+            "status": "error",
+            "message": "Claim not found"
+        }), 404
+
+    return jsonify({
+        "status": "success",
+        "data": {
+            "claim_id": claim.id,
+            "claim_status": claim.status,
+            "progress": claim.verification_progress(),
+            "files": [
+                {
+                    'filename': document.filename,
+                    'status': document.status
+                }
+                for document in claim.documents
+            ]
+        }
+    })
+
 @main_bp.route('/update-claim-status', methods=['POST'])
 def update_claim_status():
     try:
@@ -181,11 +413,41 @@ def update_claim_status():
                 "message": "Claim not found"
             }), 404
 
-        claim.status = new_status
-        claim.review_notes = review_notes
-        claim.reviewed_at = datetime.utcnow()
-        # You can add employee_id here when you have authentication
-        # claim.reviewed_by = current_user.id
+        # Optional optimistic concurrency check against the version the reviewer saw
+        expected_version = data.get('version')
+        if expected_version is not None:
+            try:
+                expected_version = int(expected_version)
+            except (TypeError, ValueError):
+                return jsonify({
+                    "status": "error",
+                    "message": "version must be an integer"
+                }), 400
+
+        # Compared and bumped in the UPDATE itself, so a concurrent review
+        # between the read above and this write is still caught
+        statement = update(Claim).where(Claim.id == claim.id)
+        if expected_version is not None:
+            statement = statement.where(Claim.version == expected_version)
+        statement = statement.values(
+            status=new_status,
+            review_notes=review_notes,
+            reviewed_at=datetime.utcnow(),
+            # You can add reviewed_by here when you have authentication
+            version=Claim.version + 1
+        ).returning(Claim.version)
+        new_version = db.session.execute(
+            statement, execution_options={'synchronize_session': False}
+        ).scalar()
+
+        if new_version is None:
+            db.session.rollback()
+            db.session.refresh(claim)
+            return jsonify({
+                "status": "error",
+                "message": "Claim was modified by someone else",
+                "data": {"current_version": claim.version, "current_status": claim.status}
+            }), 409
 
         db.session.commit()
 
@@ -202,9 +464,187 @@ def update_claim_status():
             "message": str(e)
         }), 500
 
+@main_bp.route('/claims/bulk-status', methods=['POST'])
+@jwt_required()
+def bulk_update_claim_status():
+    """Apply many status/notes changes in one transaction
+
+    Body: {"updates": [{"claimId", "status", "notes", "version"}, ...]}.
+    Each update is a conditional UPDATE on the claim's version, so a claim
+    changed since the reviewer loaded it is reported as a conflict instead
+    of being overwritten; updates without a version always apply. Everything
+    that does apply is committed together. Reviewers (employees) and admins only.
+    """
+    identity = current_identity()
+    if identity is None or identity.role not in ('admin', 'employee'):
+        return jsonify({
+            "status": "error",
+            "message": "Employee access required"
+        }), 403
+
+    try:
+        data = request.json or {}
+        updates = data.get('updates')
+
+        if not isinstance(updates, list) or not updates:
+            return jsonify({
+                "status": "error",
+                "message": "updates must be a non-empty list"
+            }), 400
+        if len(updates) > Config.BULK_STATUS_MAX_UPDATES:
+            return jsonify({
+                "status": "error",
+                "message": f"At most {Config.BULK_STATUS_MAX_UPDATES} updates per request"
+            }), 400
+
+        invalid = []
+        for index, item in enumerate(updates):
+            if not isinstance(item, dict) or not item.get('claimId') or not item.get('status'):
+                invalid.append({"index": index, "message": "Claim ID and status are required"})
+                continue
+            try:
+                int(item['claimId'])
+                if item.get('version') is not None:
+                    int(item['version'])
+            except (TypeError, ValueError):
+                invalid.append({"index": index, "message": "Claim ID and version must be integers"})
+        if invalid:
+            return jsonify({
+                "status": "error",
+                "message": "Invalid updates",
+                "data": {"invalid": invalid}
+            }), 400
+
+        reviewed_at = datetime.utcnow()
+        updated = []
+        missed = {}
+        for item in updates:
+            claim_id = int(item['claimId'])
+            statement = update(Claim).where(Claim.id == claim_id)
+            if item.get('version') is not None:
+                statement = statement.where(Claim.version == int(item['version']))
+            statement = statement.values(
+                status=item['status'],
+                review_notes=item.get('notes', ''),
+                reviewed_at=reviewed_at,
+                reviewed_by=identity.id,
+                version=Claim.version + 1
+            ).returning(Claim.version)
+            new_version = db.session.execute(
+                statement, execution_options={'synchronize_session': False}
+            ).scalar()
+            if new_version is None:
+                missed[claim_id] = item
+            else:
+                updated.append({"claimId": claim_id, "status": item['status'], "version": new_version})
+
+        # Tell conflicts (changed since read) apart from claims that do not exist
+        current = {}
+        if missed:
+            current = {
+                row.id: row for row in db.session.execute(
+                    select(Claim.id, Claim.version, Claim.status).where(Claim.id.in_(list(missed)))
+                )
+            }
+        conflicts = [
+            {
+                "claimId": claim_id,
+                "expected_version": int(item['version']),
+                "current_version": current[claim_id].version,
+                "current_status": current[claim_id].status
+            }
+            for claim_id, item in missed.items() if claim_id in current
+        ]
+        not_found = [claim_id for claim_id in missed if claim_id not in current]
+
+        db.session.commit()
+
+        return jsonify({
+            "status": "success",
+            "message": f"Updated {len(updated)} of {len(updates)} claims",
+            "data": {
+                "updated": updated,
+                "conflicts": conflicts,
+                "not_found": not_found
+            }
+        })
+
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error in bulk claim status update: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+@main_bp.route('/api/anomaly-scores', methods=['POST'])
+@jwt_required()
+def score_claim_anomalies():
+    """Anomaly scores of many claims in one vectorized model call
+
+    Body: {"claim_ids": [...]}. Scores are 0-1 on the calibration fixed when
+    the model was trained, so a claim scores the same in any batch.
+    """
+    identity = current_identity()
+    if identity is None or identity.role not in ('admin', 'employee'):
+        return jsonify({
+            "status": "error",
+            "message": "Employee access required"
+        }), 403
+
+    try:
+        data = request.get_json(silent=True) or {}
+        claim_ids = data.get('claim_ids')
+
+        if not isinstance(claim_ids, list) or not claim_ids:
+            return jsonify({
+                "status": "error",
+                "message": "claim_ids must be a non-empty list"
+            }), 400
+        if len(claim_ids) > Config.ANOMALY_BATCH_MAX_CLAIMS:
+            return jsonify({
+                "status": "error",
+                "message": f"At most {Config.ANOMALY_BATCH_MAX_CLAIMS} claims per request"
+            }), 400
+        try:
+            claim_ids = list(dict.fromkeys(int(claim_id) for claim_id in claim_ids))
+        except (TypeError, ValueError):
+            return jsonify({
+                "status": "error",
+                "message": "Claim IDs must be integers"
+            }), 400
+
+        anomaly_detector = model_registry.get('anomaly_detector')
+        if anomaly_detector.model is None:
+            return jsonify({
+                "status": "error",
+                "message": "Anomaly model has not been trained"
+            }), 503
+
+        features = AIService().claim_features(claim_ids)
+        results = anomaly_detector.score_batch(features)
+        scores = {row['claim_id']: result for row, result in zip(features, results)}
+
+        return jsonify({
+            "status": "success",
+            "data": {
+                "model_version": anomaly_detector.version,
+                "scores": [{"claimId": claim_id, **scores[claim_id]} for claim_id in claim_ids if claim_id in scores],
+                "not_found": [claim_id for claim_id in claim_ids if claim_id not in scores]
+            }
+        })
+
+    except Exception as e:
+        print(f"Error scoring claim anomalies: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
 @main_bp.route('/check-claim-anomalies', methods=['POST'])
 def check_claim_anomalies():
     try:
+        anomaly_detector = model_registry.get('anomaly_detector')
         data = request.json
         claim_id = data.get('claimId')
 
@@ -224,16 +664,20 @@ def check_claim_anomalies():
         # Prepare claim data
         claim_data = {
             'submitted_at': claim.submitted_at,
-            'amount': 1000,  # You should replace with actual claim amount
-            'document_count': len(claim.verification_results) if claim.verification_results else 0
+            'amount': claim.amount if claim.amount is not None else 1000,
+            'document_count': claim.document_count or 0
         }
 
         # Analyze claim
         analysis_results = anomaly_detector.analyze_claim(
             claim_data,
-            claim.verification_results or []
+            claim.verification_results
         )
 
+        # Keep the latest score on the claim so listings can show and sort by it
+        claim.risk_score = float(analysis_results["risk_score"])
+        db.session.commit()
+
         return jsonify({
             "status": "success",
             "data": {
@@ -350,6 +794,7 @@ def analyze_documents(verification_results):
     return document_anomalies
 
 @main_bp.route('/graph-analysis', methods=['GET'])
+@conditional_cache
 def get_graph_analysis():
     try:
         fraud_graph = InsuranceFraudGraph()
@@ -376,12 +821,14 @@ def get_graph_analysis():
 @jwt_required()
 def analyze_claim(claim_id):
     try:
+        anomaly_detector = model_registry.get('anomaly_detector')
+        rl_service = model_registry.get('rl_service')
         claim = Claim.query.get_or_404(claim_id)
         
         # Prepare claim data with normalized features
         claim_data = {
             **claim.to_dict(),
-            'amount_normalized': min(claim.amount / 10000, 1.0) if hasattr(claim, 'amount') else 0.5,
+            'amount_normalized': min(claim.amount / 10000, 1.0) if claim.amount is not None else 0.5,
             'policy_age_normalized': 0.5,  # Calculate based on policy start date
             'claim_frequency_normalized': 0.5,  # Calculate based on user's claim history
             'time_since_last_normalized': 0.5,  # Calculate based on last claim date
@@ -396,7 +843,7 @@ def analyze_claim(claim_id):
         # Get both traditional and RL analysis
         traditional_analysis = anomaly_detector.analyze_claim(
             claim_data,
-            claim.verification_results or []
+            claim.verification_results
         )
         rl_analysis = rl_service.analyze_claim(claim_data)
         
@@ -423,6 +870,7 @@ def analyze_claim(claim_id):
 @jwt_required()
 def submit_feedback(claim_id):
     try:
+        rl_service = model_registry.get('rl_service')
         data = request.get_json()
         was_correct = data.get('was_correct', False)
         
@@ -442,6 +890,7 @@ def submit_feedback(claim_id):
 @main_bp.route('/api/rl-metrics', methods=['GET'])
 def get_rl_metrics():
     try:
+        rl_service = model_registry.get('rl_service')
         # Get buffer size if available (different implementations may store it differently)
         buffer_size = 0
         if hasattr(rl_service.agent, 'replay_buffer'):
@@ -466,9 +915,34 @@ def get_rl_metrics():
             'error': str(e)
         }), 500
 
+@main_bp.route('/api/inference-metrics', methods=['GET'])
+def get_inference_metrics():
+    return jsonify({
+        'success': True,
+        'queues': queue_metrics()
+    })
+
+@main_bp.route('/api/ocr-metrics', methods=['GET'])
+def get_ocr_metrics():
+    return jsonify({
+        'success': True,
+        'ocr': ocr_pool.metrics(),
+        'verification_pool': verification_pool.metrics()
+    })
+
+@main_bp.route('/api/response-cache-metrics', methods=['GET'])
+def get_response_cache_metrics():
+    return jsonify({
+        'success': True,
+        'data_version': data_version.current(),
+        'response_cache': response_cache.metrics(),
+        'identity_cache': user_cache.metrics()
+    })
+
 @main_bp.route('/api/rl-train', methods=['POST'])
 def train_rl_model():
     try:
+        rl_service = model_registry.get('rl_service')
         rl_service.agent.train(total_timesteps=5000)
         rl_service.agent.model.save("rl_fraud_model")
         return jsonify({
@@ -484,6 +958,8 @@ def train_rl_model():
 @main_bp.route('/api/rl-simulate', methods=['POST'])
 def simulate_rl_model():
     try:
+        anomaly_detector = model_registry.get('anomaly_detector')
+        rl_service = model_registry.get('rl_service')
         # Get some recent claims for simulation
         claims = Claim.query.order_by(Claim.submitted_at.desc()).limit(10).all()
         
@@ -491,7 +967,7 @@ def simulate_rl_model():
         for claim in claims:
             claim_data = {
                 **claim.to_dict(),
-                'amount_normalized': min(claim.amount / 10000, 1.0) if hasattr(claim, 'amount') else 0.5,
+                'amount_normalized': min(claim.amount / 10000, 1.0) if claim.amount is not None else 0.5,
                 'policy_age_normalized': 0.5,
                 'claim_frequency_normalized': 0.5,
                 'time_since_last_normalized': 0.5,
@@ -506,7 +982,7 @@ def simulate_rl_model():
             # Get both traditional and RL analysis
             traditional_analysis = anomaly_detector.analyze_claim(
                 claim_data,
-                claim.verification_results or []
+                claim.verification_results
             )
             rl_analysis = rl_service.analyze_claim(claim_data)
             
@@ -535,6 +1011,7 @@ def simulate_rl_model():
 def calculate_adaptation_score():
     """Calculate how well the model is adapting to new patterns"""
     try:
+        rl_service = model_registry.get('rl_service')
         # This is a simplified version - you might want to implement a more sophisticated scoring system
         buffer_size = len(rl_service.agent.model.replay_buffer)
         loss = rl_service.agent.model.logger.name_to_value.get('train/loss', 0.0)
@@ -548,6 +1025,8 @@ def calculate_adaptation_score():
 @main_bp.route('/api/rl-simulation', methods=['GET'])
 def get_rl_simulation():
     try:
+        anomaly_detector = model_registry.get('anomaly_detector')
+        rl_service = model_registry.get('rl_service')
         # Get some recent claims for simulation
         claims = Claim.query.order_by(Claim.submitted_at.desc()).limit(10).all()
         
@@ -558,7 +1037,7 @@ def get_rl_simulation():
             
             # Prepare normalized features with proper type conversion
             claim_data = {
-                'amount_normalized': float(min(claim.amount / 10000, 1.0)) if hasattr(claim, 'amount') else 0.5,
+                'amount_normalized': float(min(claim.amount / 10000, 1.0)) if claim.amount is not None else 0.5,
                 'policy_age_normalized': 0.5,
                 'claim_frequency_normalized': 0.5,
                 'time_since_last_normalized': 0.5,
@@ -573,7 +1052,7 @@ def get_rl_simulation():
             # Get both traditional and RL analysis
             traditional_analysis = anomaly_detector.analyze_claim(
                 claim_data,
-                claim.verification_results or []
+                claim.verification_results
             )
             
             # Convert any numpy arrays in the observation to lists
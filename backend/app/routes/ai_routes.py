@@ -1,8 +1,8 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
+from app.auth.identity import current_identity
 from app.services.ai_service import AIService
 from app.models.claims import Claim
-from app.models.users import User
 from .. import db
 
 ai_bp = Blueprint('ai', __name__)
@@ -12,8 +12,8 @@ ai_service = AIService()
 @jwt_required()
 def train_models():
     """Endpoint to train ML models"""
-    current_user = User.query.get(get_jwt_identity())
-    if current_user.role != 'admin':
+    current_user = current_identity()
+    if current_user is None or current_user.role != 'admin':
         return jsonify({'message': 'Admin access required'}), 403
     
     try:
@@ -30,8 +30,8 @@ def analyze_claim(claim_id):
     if not claim:
         return jsonify({'message': 'Claim not found'}), 404
     
-    current_user = User.query.get(get_jwt_identity())
-    if current_user.role not in ['admin', 'employee'] and current_user.id != claim.user_id:
+    current_user = current_identity()
+    if current_user is None or (current_user.role not in ['admin', 'employee'] and current_user.id != claim.user_id):
         return jsonify({'message': 'Unauthorized access'}), 403
     
     try:
@@ -52,15 +52,24 @@ def verify_document():
         return jsonify({'message': 'No selected file'}), 400
     
     try:
-        # Save temporary file
-        import tempfile
-        with tempfile.NamedTemporaryFile(delete=False) as tmp:
-            file.save(tmp.name)
-            verification = ai_service.verify_document(tmp.name)
-        
-        # Clean up
         import os
-        os.unlink(tmp.name)
+        stream_path = getattr(file.stream, 'path', None)
+        if stream_path:
+            # Already on disk from streaming ingestion; no temp copy needed
+            file.stream.flush()
+            try:
+                verification = ai_service.verify_document(stream_path)
+            finally:
+                file.stream.discard()
+        else:
+            # Save temporary file
+            import tempfile
+            with tempfile.NamedTemporaryFile(delete=False) as tmp:
+                file.save(tmp.name)
+                verification = ai_service.verify_document(tmp.name)
+            
+            # Clean up
+            os.unlink(tmp.name)
         
         return jsonify(verification), 200
     except Exception as e:
@@ -1,8 +1,8 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.auth.identity import current_identity
 from app.models.claims import Claim
 from app.models.policies import Policy
-from app.models.users import User
 from .. import db
 from datetime import datetime
 
@@ -11,13 +11,12 @@ claims_bp = Blueprint('claims', __name__)
 @claims_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_claims():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = current_identity()
     
     if not user:
         return jsonify({'message': 'User not found'}), 404
     
-    claims = Claim.query.filter_by(user_id=user_id).all()
+    claims = Claim.query.filter_by(user_id=user.id).all()
     return jsonify([{
         'id': claim.id,
         'claim_number': claim.claim_number,
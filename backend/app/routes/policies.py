@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.auth.identity import current_identity
 from app.models.policies import Policy
-from app.models.users import User
 from .. import db
 from datetime import datetime
 
@@ -10,13 +10,12 @@ policies_bp = Blueprint('policies', __name__)
 @policies_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_policies():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = current_identity()
     
     if not user:
         return jsonify({'message': 'User not found'}), 404
     
-    policies = Policy.query.filter_by(user_id=user_id).all()
+    policies = Policy.query.filter_by(user_id=user.id).all()
     return jsonify([{
         'id': policy.id,
         'policy_number': policy.policy_number,
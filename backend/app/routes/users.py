@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models.users import User
+from flask_jwt_extended import jwt_required
 from app.auth.auth import authenticate, generate_token, register_user
+from app.auth.identity import current_identity
 from .. import db
 
 users_bp = Blueprint('users', __name__)
@@ -59,8 +59,7 @@ def register():
 @users_bp.route('/profile', methods=['GET'])
 @jwt_required()
 def get_profile():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = current_identity()
     
     if not user:
         return jsonify({'message': 'User not found'}), 404
@@ -1,16 +1,63 @@
-from app.ml_models import DocumentVerifier, AnomalyDetector, PatternDetector
+from functools import lru_cache
+from app.services.model_registry import model_registry
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.orm import aliased
+from app import db
+from app.models.user_claim_stats import UserClaimMonth, UserClaimStats, month_key, months_back
 import pandas as pd
 
+@lru_cache(maxsize=None)
+def _feature_statements():
+    """Base queries of AIService.claim_features; built once, as building them costs more than running them"""
+    from app.models.claims import Claim
+    from app.models.policies import Policy
+
+    stats = UserClaimStats
+    earlier = aliased(Claim)
+    # The stats row holds the gap before the user's newest claim; older
+    # claims look up their predecessor with one index seek
+    previous_claim_at = case(
+        (stats.last_claim_id == Claim.id, stats.previous_claim_at),
+        else_=select(func.max(earlier.submitted_at)).where(
+            earlier.user_id == Claim.user_id,
+            # (submitted_at, id) order, as the aggregates use
+            or_(earlier.submitted_at < Claim.submitted_at,
+                and_(earlier.submitted_at == Claim.submitted_at, earlier.id < Claim.id))
+        ).scalar_subquery()
+    )
+    statement = select(
+        Claim.id, Claim.amount, Claim.submitted_at, Claim.user_id, Claim.document_count, Policy.start_date,
+        stats.claim_count, stats.total_amount, stats.first_policy_start, previous_claim_at.label('previous_claim_at')
+    ).outerjoin(Policy, Claim.policy_id == Policy.id).outerjoin(
+        stats, stats.user_id == Claim.user_id
+    ).order_by(Claim.id)
+    months_statement = select(
+        UserClaimMonth.user_id, UserClaimMonth.month, UserClaimMonth.claim_count, UserClaimMonth.total_amount
+    )
+    return statement, months_statement
+
+
 class AIService:
     def __init__(self):
-        self.document_verifier = DocumentVerifier()
-        self.anomaly_detector = AnomalyDetector()
-        self.pattern_detector = PatternDetector()
         # Lazy import models
         from app.models.claims import Claim
         from app.models.policies import Policy
         self.Claim = Claim
         self.Policy = Policy
+
+    # Models come from the shared registry, so this service never holds
+    # its own copies and nothing is loaded until first use
+    @property
+    def document_verifier(self):
+        return model_registry.get('document_verifier')
+
+    @property
+    def anomaly_detector(self):
+        return model_registry.get('anomaly_detector')
+
+    @property
+    def pattern_detector(self):
+        return model_registry.get('pattern_detector')
     
     def verify_document(self, file_path):
         """Verify uploaded document for potential fraud"""
@@ -18,42 +65,97 @@ class AIService:
     
     def analyze_claim(self, claim_id):
         """Analyze a claim for potential fraud"""
-        claim = self.Claim.query.get(claim_id)
-        if not claim:
+        # Model inputs, with the user's history read from its aggregates
+        rows = self.claim_features(claim_ids=[claim_id])
+        if not rows:
             return None
-        
-        # Get related data
-        policy = self.Policy.query.get(claim.policy_id)
-        user_claims = self.Claim.query.filter_by(user_id=claim.user_id).all()
-        
-        # Prepare data for models
-        claim_data = self._prepare_claim_data(claim, policy, user_claims)
+        claim_data = rows[0]
         
         # Get anomaly score
-        anomaly_score = self.anomaly_detector.detect_anomalies([claim_data])[0]
+        anomaly = self.anomaly_detector.score_batch([claim_data])[0]
         
         # Get fraud probability
         fraud_probability = self.pattern_detector.predict([claim_data])[0]
         
         return {
-            'claim_id': claim.id,
-            'anomaly_score': anomaly_score,
+            'claim_id': claim_data['claim_id'],
+            'anomaly_score': anomaly['anomaly_score'],
+            'risk_factors': anomaly['risk_factors'],
             'fraud_probability': fraud_probability,
-            'is_high_risk': fraud_probability > 0.7 or anomaly_score < -0.5
+            'is_high_risk': fraud_probability > 0.7 or anomaly['is_anomaly']
         }
     
+    def claim_features(self, claim_ids=None, limit=None, after_id=None):
+        """Model inputs for the given claims (all, or the newest ``limit``, by default), in two queries
+
+        Rows are oldest first, the order the models' per-user batch features
+        (time since the previous claim) are computed in when training.
+        ``after_id`` keeps only claims with a higher id, i.e. submitted later.
+        Per-user figures come from the user_claim_stats aggregates rather
+        than from the user's claim history.
+        """
+        Claim = self.Claim
+        statement, months_statement = _feature_statements()
+        if claim_ids is not None:
+            statement = statement.where(Claim.id.in_(claim_ids))
+            months_statement = months_statement.where(
+                UserClaimMonth.user_id.in_(select(Claim.user_id).where(Claim.id.in_(claim_ids)))
+            )
+        if after_id is not None:
+            statement = statement.where(Claim.id > after_id)
+            months_statement = months_statement.where(
+                UserClaimMonth.user_id.in_(select(Claim.user_id).where(Claim.id > after_id))
+            )
+        if limit:
+            # The newest ``limit``, returned oldest first below
+            statement = statement.order_by(None).order_by(Claim.id.desc()).limit(limit)
+        user_months = {}
+        for user_id, month, count, total in db.session.execute(months_statement):
+            user_months.setdefault(user_id, {})[month] = (count, total)
+
+        claim_data = []
+        past_year = {}
+        for (claim_id, amount, submitted_at, user_id, document_count, policy_start,
+             count, total_amount, first_policy_start, previous_claim_at) in db.session.execute(statement):
+            count = count or 0
+            month = month_key(submitted_at) if submitted_at else None
+            if (user_id, month) not in past_year:
+                past_year[user_id, month] = self._past_year(user_months.get(user_id), month)
+            claims_past_year, amount_past_year = past_year[user_id, month]
+            claim_data.append({
+                'claim_id': claim_id,
+                'amount': amount or 0,
+                'claim_date': submitted_at.isoformat() if submitted_at else None,
+                'policy_start_date': policy_start.isoformat() if policy_start else None,
+                'user_id': user_id,
+                # Rolling 12 calendar months, from the monthly buckets
+                'claim_count_past_year': claims_past_year,
+                'avg_claim_amount': total_amount / count if count else 0,
+                'document_count': document_count or 0,
+                'previous_claim_date': previous_claim_at.isoformat() if previous_claim_at else None,
+                'first_policy_start': first_policy_start.isoformat() if first_policy_start else None,
+                'amount_past_year': amount_past_year
+            })
+        if limit:
+            claim_data.reverse()
+        return claim_data
+
+    @staticmethod
+    def _past_year(months, month):
+        """Claims and amount in the 12 calendar months up to and including ``month`` (yyyymm)"""
+        if not months or month is None:
+            return 0, 0
+        first = months_back(month, 11)
+        # Month order, so the float sum does not depend on the query's row order
+        window = [months[key] for key in sorted(months) if first <= key <= month]
+        return sum(count for count, _ in window), sum(total for _, total in window)
+
     def train_models(self):
         """Train ML models using historical data"""
-        claims = self.Claim.query.all()
-        claim_data = []
+        claim_data = self.claim_features()
         
-        for claim in claims:
-            policy = self.Policy.query.get(claim.policy_id)
-            user_claims = self.Claim.query.filter_by(user_id=claim.user_id).all()
-            claim_data.append(self._prepare_claim_data(claim, policy, user_claims))
-        
-        # Train anomaly detector (unsupervised)
-        self.anomaly_detector.train(claim_data)
+        # Train anomaly detector (unsupervised) and save it as a new version
+        anomaly_metadata = self.anomaly_detector.train(claim_data, metadata={'source': 'claims'})
         
         # For pattern detector, we need labeled data (simulated here)
         # In production, you would use actual historical fraud labels
@@ -61,26 +163,27 @@ class AIService:
         report = self.pattern_detector.train(claim_data, labels)
         
         return {
-            'anomaly_detector': 'training_complete',
+            'anomaly_detector': {
+                'version': anomaly_metadata.get('version'),
+                'training_size': anomaly_metadata['training_size']
+            },
             'pattern_detector': report
         }
     
-    def _prepare_claim_data(self, claim, policy, user_claims):
-        """Prepare claim data for ML models"""
-        # Calculate user claim statistics
-        user_claim_count = len(user_claims)
-        avg_claim_amount = sum(c.amount for c in user_claims) / user_claim_count if user_claim_count > 0 else 0
-        
-        return {
-            'claim_id': claim.id,
-            'amount': claim.amount,
-            'claim_date': claim.claim_date.isoformat(),
-            'policy_start_date': policy.start_date.isoformat(),
-            'user_id': claim.user_id,
-            'claim_count_past_year': user_claim_count,
-            'avg_claim_amount': avg_claim_amount
-        }
-    
+    def update_anomaly_model(self):
+        """Slide the anomaly model onto the claims submitted since the ones it has seen
+
+        Returns the new version's metadata, or None if there are not yet
+        enough new claims for a tree.
+        """
+        detector = self.anomaly_detector
+        if detector.model is None:
+            raise RuntimeError("Anomaly model has not been trained; run train_anomaly_model.py")
+        last_claim_id = detector.metadata.get('last_claim_id')
+        if last_claim_id is None:
+            raise RuntimeError(f"Anomaly model {detector.version} does not record the claims it saw; retrain it")
+        return detector.update(self.claim_features(after_id=last_claim_id))
+
     def _simulate_labels(self, claim_data):
         """Simulate fraud labels for training (replace with real data in production)"""
         import random
@@ -0,0 +1,170 @@
+import csv
+import io
+import json
+from datetime import datetime
+from itertools import groupby
+
+from sqlalchemy import select
+
+from app import db
+from app.models.claims import Claim
+from app.models.claim_documents import ClaimDocument
+from app.models.users import User
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet'
+}
+
+# Exported claim columns, in output order; 'documents' follows them
+CLAIM_COLUMNS = [
+    Claim.id, Claim.claim_type, Claim.status, Claim.submitted_at, Claim.description, Claim.amount,
+    Claim.user_id, Claim.policy_id, Claim.reviewed_by, Claim.reviewed_at, Claim.review_notes,
+    Claim.document_count, Claim.documents_completed, Claim.documents_failed,
+    Claim.max_ela_score, Claim.risk_score, Claim.version
+]
+DOCUMENT_COLUMNS = [
+    ClaimDocument.filename, ClaimDocument.status, ClaimDocument.valid,
+    ClaimDocument.ela_score, ClaimDocument.sha256
+]
+FIELDNAMES = [column.key for column in CLAIM_COLUMNS] + ['username', 'documents']
+
+
+class ExportError(Exception):
+    pass
+
+
+def export_statement():
+    """Base SELECT of the export; apply the /claims filters to it before streaming"""
+    return select(*CLAIM_COLUMNS, User.username).outerjoin(User, Claim.user_id == User.id)
+
+
+def iter_claim_chunks(statement, chunk_size=1000):
+    """Yield lists of export rows, ``chunk_size`` claims at a time
+
+    Claims are read through a streaming cursor in id order and each chunk's
+    document summaries are fetched with one extra query, so only one chunk
+    is ever held in memory.
+    """
+    result = db.session.execute(
+        statement.order_by(Claim.id),
+        execution_options={'yield_per': chunk_size}
+    )
+    for partition in result.partitions():
+        rows = [dict(row._mapping) for row in partition]
+        documents = db.session.execute(
+            select(ClaimDocument.claim_id, *DOCUMENT_COLUMNS)
+            .where(ClaimDocument.claim_id.in_([row['id'] for row in rows]))
+            .order_by(ClaimDocument.claim_id, ClaimDocument.position)
+        )
+        by_claim = {
+            claim_id: [
+                {column.key: getattr(document, column.key) for column in DOCUMENT_COLUMNS}
+                for document in claim_documents
+            ]
+            for claim_id, claim_documents in groupby(documents, key=lambda document: document.claim_id)
+        }
+        for row in rows:
+            row['documents'] = by_claim.get(row['id'], [])
+        yield rows
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _ndjson(chunks):
+    for rows in chunks:
+        yield ''.join(json.dumps(row, default=_json_default) + '\n' for row in rows).encode()
+
+
+def _csv(chunks):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=FIELDNAMES)
+    writer.writeheader()
+    for rows in chunks:
+        for row in rows:
+            writer.writerow({
+                **{key: value.isoformat() if isinstance(value, datetime) else value for key, value in row.items()},
+                # Nested summaries travel as a JSON column
+                'documents': json.dumps(row['documents'])
+            })
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _parquet_schema(pa):
+    return pa.schema([
+        ('id', pa.int64()), ('claim_type', pa.string()), ('status', pa.string()),
+        ('submitted_at', pa.timestamp('us')), ('description', pa.string()), ('amount', pa.float64()),
+        ('user_id', pa.int64()), ('policy_id', pa.int64()), ('reviewed_by', pa.int64()),
+        ('reviewed_at', pa.timestamp('us')), ('review_notes', pa.string()),
+        ('document_count', pa.int64()), ('documents_completed', pa.int64()),
+        ('documents_failed', pa.int64()), ('max_ela_score', pa.float64()),
+        ('risk_score', pa.float64()), ('version', pa.int64()), ('username', pa.string()),
+        ('documents', pa.list_(pa.struct([
+            ('filename', pa.string()), ('status', pa.string()), ('valid', pa.bool_()),
+            ('ela_score', pa.float64()), ('sha256', pa.string())
+        ])))
+    ])
+
+
+def _parquet(chunks):
+    # Optional dependency, only needed for Parquet exports
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema(pa)
+    sink = _DrainableSink()
+    # One row group per chunk; each is flushed to the client as soon as it is written
+    with pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema, compression='zstd') as writer:
+        for rows in chunks:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def check_format(fmt):
+    """Raise ExportError unless ``fmt`` can be produced here"""
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f"Unknown export format: {fmt} (expected one of {', '.join(EXPORT_FORMATS)})")
+    if fmt == 'parquet':
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            raise ExportError("Parquet export requires pyarrow")
+
+
+def iter_export(statement, fmt='ndjson', chunk_size=1000):
+    """Encoded export of ``statement`` as a stream of byte chunks"""
+    check_format(fmt)
+    chunks = iter_claim_chunks(statement, chunk_size)
+    return {'ndjson': _ndjson, 'csv': _csv, 'parquet': _parquet}[fmt](chunks)
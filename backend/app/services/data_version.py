@@ -0,0 +1,112 @@
+import os
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: bumps are only serialized within this process
+    fcntl = None
+
+# Tables whose changes show up in cached read endpoints
+TRACKED_TABLES = {'claims', 'claim_documents', 'claim_scores', 'policies', 'users'}
+
+# The counter is stored zero-padded so it can be rewritten in place
+WIDTH = 20
+
+_FLAG = 'data_version_changed'
+
+
+def _tracked(obj):
+    return getattr(obj, '__tablename__', None) in TRACKED_TABLES
+
+
+def _after_flush(session, flush_context):
+    if any(_tracked(obj) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info[_FLAG] = True
+
+
+def _do_orm_execute(orm_execute_state):
+    # Bulk UPDATE/DELETE/INSERT statements bypass the flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.local_table.name in TRACKED_TABLES:
+            orm_execute_state.session.info[_FLAG] = True
+
+
+def _after_commit(session):
+    if session.info.pop(_FLAG, False):
+        data_version.bump()
+
+
+def _after_rollback(session):
+    session.info.pop(_FLAG, None)
+
+
+class DataVersion:
+    """Counter of committed changes to claims, policies and users.
+
+    It lives in a small file in the instance folder so every worker process
+    sees the same value, and reading it never touches the database. Session
+    events bump it after each commit that wrote to a tracked table.
+    """
+
+    def __init__(self, app=None):
+        self.path = None
+        self._fd = None
+        self._lock = threading.Lock()
+        self._seek_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.path = os.path.join(app.instance_path, 'data_version')
+        with self._lock:
+            if self._fd is None:
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        for name, listener in (('after_flush', _after_flush), ('do_orm_execute', _do_orm_execute),
+                               ('after_commit', _after_commit), ('after_rollback', _after_rollback)):
+            if not event.contains(Session, name, listener):
+                event.listen(Session, name, listener)
+        # A restart may come with migrations or a new serialization
+        self.bump()
+        app.extensions['data_version'] = self
+
+    def current(self):
+        if self._fd is None:
+            return 0
+        if hasattr(os, 'pread'):
+            raw = os.pread(self._fd, WIDTH, 0)
+        else:
+            with self._seek_lock:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                raw = os.read(self._fd, WIDTH)
+        return int(raw) if raw.strip() else 0
+
+    def _write(self, value):
+        data = str(value).zfill(WIDTH).encode()
+        if hasattr(os, 'pwrite'):
+            os.pwrite(self._fd, data, 0)
+        else:
+            with self._seek_lock:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                os.write(self._fd, data)
+
+    def bump(self):
+        if self._fd is None:
+            return 0
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                value = self.current() + 1
+                self._write(value)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+        return value
+
+
+data_version = DataVersion()
@@ -33,7 +33,7 @@ class InsuranceFraudGraph:
             
         for claim in claims:
             self.graph.add_node(claim.id, type='claim', 
-                              amount=claim.amount if hasattr(claim, 'amount') else 0, 
+                              amount=claim.amount or 0, 
                               status=claim.status)
             if claim.policy_id:
                 self.policy_claim_map[claim.policy_id].append(claim.id)
@@ -0,0 +1,111 @@
+import os
+import threading
+import time
+from datetime import datetime
+
+
+def _rss_bytes():
+    """Resident set size of this process, in bytes"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # Not Linux; peak RSS is the closest portable figure
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class ModelRegistry:
+    """Process-wide, lazily loaded ML models.
+
+    Each model is built by its factory once, the first time it is asked for
+    (or when warmed up explicitly), and then shared by every caller in the
+    process. Load time and the resident-memory growth seen while loading are
+    recorded per model.
+    """
+
+    def __init__(self):
+        self._factories = {}
+        self._models = {}
+        self._stats = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, factory):
+        with self._lock:
+            self._factories[name] = factory
+            self._locks[name] = threading.Lock()
+
+    def get(self, name):
+        """Return the named model, loading it on first use"""
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        if name not in self._factories:
+            raise KeyError(f"Unknown model: {name}")
+
+        with self._locks[name]:
+            model = self._models.get(name)
+            if model is None:
+                rss_before = _rss_bytes()
+                started = time.perf_counter()
+                model = self._factories[name]()
+                self._stats[name] = {
+                    'load_seconds': round(time.perf_counter() - started, 3),
+                    'memory_mb': round(max(_rss_bytes() - rss_before, 0) / 2 ** 20, 1),
+                    'loaded_at': datetime.utcnow().isoformat()
+                }
+                self._models[name] = model
+                print(f"Loaded model '{name}' in {self._stats[name]['load_seconds']}s")
+        return model
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def warmup(self, names=None):
+        """Load the given models (all registered ones when ``names`` is None) and return their stats"""
+        errors = {}
+        # An empty list (PRELOAD_MODELS=) loads nothing
+        for name in names if names is not None else list(self._factories):
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"Error warming up model '{name}': {str(e)}")
+                errors[name] = str(e)
+        stats = self.stats()
+        for name, error in errors.items():
+            stats[name] = {**stats.get(name, {}), 'error': error}
+        return stats
+
+    def stats(self):
+        return {
+            name: {'loaded': name in self._models, **self._stats.get(name, {})}
+            for name in self._factories
+        }
+
+
+def _document_verifier():
+    from app.ml_models.document_verification import DocumentVerifier
+    return DocumentVerifier()
+
+
+def _anomaly_detector():
+    from app.ml_models.anomaly_detection import AnomalyDetector
+    return AnomalyDetector()
+
+
+def _pattern_detector():
+    from app.ml_models.pattern_detection import PatternDetector
+    return PatternDetector()
+
+
+def _rl_service():
+    from app.services.rl_fraud_service import RLFraudService
+    return RLFraudService()
+
+
+model_registry = ModelRegistry()
+model_registry.register('document_verifier', _document_verifier)
+model_registry.register('anomaly_detector', _anomaly_detector)
+model_registry.register('pattern_detector', _pattern_detector)
+model_registry.register('rl_service', _rl_service)
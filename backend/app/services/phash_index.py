@@ -0,0 +1,82 @@
+from itertools import combinations
+
+from sqlalchemy import or_
+
+from app import db
+from app.models.image_hashes import ImageHash
+from app.utils.config import Config
+
+CHUNK_BITS = 16
+CHUNK_COUNT = 4
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+
+def split_hash(phash):
+    """Split a 64-bit hex hash into its four 16-bit chunks"""
+    value = int(phash, 16)
+    return [(value >> (CHUNK_BITS * i)) & CHUNK_MASK for i in range(CHUNK_COUNT)]
+
+
+def _chunk_variants(chunk, radius):
+    """Every 16-bit value within ``radius`` bit flips of ``chunk``"""
+    variants = [chunk]
+    for flips in range(1, radius + 1):
+        for bits in combinations(range(CHUNK_BITS), flips):
+            variant = chunk
+            for bit in bits:
+                variant ^= 1 << bit
+            variants.append(variant)
+    return variants
+
+
+class PerceptualHashIndex:
+    """Hamming-radius search over stored perceptual hashes (multi-index hashing)
+
+    By the pigeonhole principle, two 64-bit hashes within distance ``r`` have
+    at least one of their four 16-bit chunks within distance ``r // 4``. The
+    lookup fetches rows whose chunks match those few variants through the
+    per-chunk indexes, then checks the exact distance on that small
+    candidate set.
+    """
+
+    def add(self, claim_id, filename, phash):
+        chunks = split_hash(phash)
+        db.session.add(ImageHash(
+            claim_id=claim_id,
+            filename=filename,
+            phash=phash,
+            chunk0=chunks[0],
+            chunk1=chunks[1],
+            chunk2=chunks[2],
+            chunk3=chunks[3]
+        ))
+
+    def query(self, phash, radius=None, exclude_claim_id=None, limit=20):
+        """Stored images within ``radius`` bits of ``phash``, closest first"""
+        radius = Config.PHASH_MATCH_RADIUS if radius is None else radius
+        value = int(phash, 16)
+        chunks = split_hash(phash)
+        chunk_radius = radius // CHUNK_COUNT
+        columns = [ImageHash.chunk0, ImageHash.chunk1, ImageHash.chunk2, ImageHash.chunk3]
+
+        query = db.session.query(ImageHash.claim_id, ImageHash.filename, ImageHash.phash).filter(or_(*[
+            column.in_(_chunk_variants(chunk, chunk_radius))
+            for column, chunk in zip(columns, chunks)
+        ]))
+        if exclude_claim_id is not None:
+            query = query.filter(ImageHash.claim_id != exclude_claim_id)
+
+        matches = []
+        for claim_id, filename, candidate in query:
+            distance = bin(int(candidate, 16) ^ value).count('1')
+            if distance <= radius:
+                matches.append({
+                    'claim_id': claim_id,
+                    'filename': filename,
+                    'distance': distance
+                })
+        matches.sort(key=lambda match: match['distance'])
+        return matches[:limit]
+
+
+phash_index = PerceptualHashIndex()
@@ -0,0 +1,307 @@
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from sqlalchemy import or_, select
+
+from app import db
+from app.services.data_version import data_version
+from app.utils.config import Config
+from app.utils.database import upsert
+from app.utils.helpers import try_file_lock
+
+# Claims in these statuses are decided; every other claim is open and rescored
+CLOSED_STATUSES = ('approved', 'rejected')
+
+# Saved RL policy; without it RLFraudService would train one in every worker
+RL_MODEL_FILE = 'rl_fraud_model.zip'
+
+SCORE_COLUMNS = (
+    'anomaly_score', 'is_anomaly', 'fraud_probability', 'rl_decision', 'rl_confidence',
+    'anomaly_model_version', 'run_id', 'scored_at'
+)
+
+# Models of this worker process, loaded once by _init_worker
+_models = {}
+
+
+class RescoreError(Exception):
+    """A rescoring run that cannot start or resume"""
+
+
+def _init_worker(model_dir, anomaly_version, use_rl):
+    """Load the scoring models once per worker process"""
+    from app.ml_models.anomaly_detection import AnomalyDetector
+    from app.ml_models.pattern_detection import PatternDetector
+
+    # Every worker scores with the version the run was started with
+    detector = AnomalyDetector(model_dir=model_dir, version=anomaly_version)
+    if detector.model is None:
+        raise RescoreError(f"Anomaly model {anomaly_version} could not be loaded")
+    _models['anomaly'] = detector
+    pattern = PatternDetector()
+    _models['pattern'] = pattern if hasattr(pattern.model, 'estimators_') else None
+    _models['rl'] = None
+    if use_rl:
+        from app.services.model_registry import model_registry
+        try:
+            _models['rl'] = model_registry.get('rl_service')
+        except Exception as e:
+            # A failing initializer would break the whole pool; score without RL
+            print(f"Error loading RL policy in rescoring worker: {str(e)}")
+
+
+def rl_inputs(claim):
+    """RL observation fields of a claim, as /api/rl-simulate builds them"""
+    amount = claim.get('amount')
+    return {'amount_normalized': min(amount / 10000, 1.0) if amount is not None else 0.5}
+
+
+def _score_chunk(claims):
+    """Scores of a chunk of claim feature dicts, inside a worker process"""
+    anomalies = _models['anomaly'].score_batch(claims)
+    pattern = _models['pattern']
+    fraud = pattern.predict(claims) if pattern is not None else [None] * len(claims)
+    rl = _models['rl']
+    decisions = rl.analyze_batch([rl_inputs(claim) for claim in claims]) if rl is not None else [{}] * len(claims)
+    return [
+        {
+            'claim_id': claim['claim_id'],
+            'anomaly_score': anomaly['anomaly_score'],
+            'is_anomaly': anomaly['is_anomaly'],
+            'fraud_probability': probability,
+            'rl_decision': decision.get('decision'),
+            'rl_confidence': decision.get('confidence')
+        }
+        for claim, anomaly, probability, decision in zip(claims, anomalies, fraud, decisions)
+    ]
+
+
+def read_checkpoint(path=None):
+    """State of the last run recorded at ``path``, or None"""
+    try:
+        with open(path or Config.RESCORE_CHECKPOINT) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_checkpoint(path, state):
+    # Written beside it and renamed in, so a crash never leaves half a file
+    staging = f'{path}.tmp'
+    with open(staging, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(staging, path)
+
+
+def claim_id_chunks(after_id, chunk_size, statuses=None):
+    """Ids of the claims to rescore after ``after_id``, in id order, ``chunk_size`` at a time"""
+    from app.models.claims import Claim
+
+    while True:
+        statement = select(Claim.id).where(Claim.id > after_id).order_by(Claim.id).limit(chunk_size)
+        if statuses:
+            statement = statement.where(Claim.status.in_(statuses))
+        else:
+            statement = statement.where(or_(Claim.status.notin_(CLOSED_STATUSES), Claim.status.is_(None)))
+        ids = db.session.execute(statement).scalars().all()
+        # No transaction stays open between chunks (see rescore_claims)
+        db.session.close()
+        if not ids:
+            return
+        yield ids
+        after_id = ids[-1]
+
+
+def _write_scores(rows, run_id, anomaly_version):
+    from app.models.claim_scores import ClaimScore
+
+    scored_at = datetime.utcnow()
+    for row in rows:
+        row.update(anomaly_model_version=anomaly_version, run_id=run_id, scored_at=scored_at)
+    with db.engine.begin() as connection:
+        upsert(connection, ClaimScore.__table__, rows, ['claim_id'],
+               lambda new: {column: new[column] for column in SCORE_COLUMNS})
+    # Written outside the session, so its commit hooks never see it
+    data_version.bump()
+
+
+def _start_state(statuses, use_rl):
+    from app.ml_models.anomaly_detection import AnomalyDetector
+
+    detector = AnomalyDetector()
+    if detector.model is None:
+        raise RescoreError("No trained anomaly model to score with; run train_anomaly_model.py")
+    now = datetime.utcnow().isoformat()
+    return {
+        'run_id': uuid.uuid4().hex,
+        'statuses': statuses,
+        'anomaly_version': detector.version,
+        'rl': use_rl,
+        'last_claim_id': 0,
+        'scored': 0,
+        'started_at': now,
+        'updated_at': now,
+        'finished_at': None
+    }
+
+
+def rescore_claims(checkpoint_path=None, statuses=None, chunk_size=None, workers=None, write_batch=None,
+                   restart=False, use_rl=True, log=print):
+    """Score every open claim (or those in ``statuses``) and store the results in claim_scores
+
+    Claims are read in id-ordered chunks and scored by a pool of worker
+    processes with the anomaly, pattern and RL models. Results are written
+    in batches of ``write_batch``. After each write the checkpoint records
+    the last claim id stored, so a run that is interrupted resumes after
+    it. ``restart`` discards an unfinished run. Returns the final state.
+    """
+    from app.services.ai_service import AIService
+
+    path = checkpoint_path or Config.RESCORE_CHECKPOINT
+    chunk_size = chunk_size or Config.RESCORE_CHUNK_SIZE
+    workers = workers or Config.RESCORE_WORKERS
+    write_batch = write_batch or Config.RESCORE_WRITE_BATCH
+    statuses = sorted(statuses) if statuses else None
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    with try_file_lock(f'{path}.lock') as acquired:
+        if not acquired:
+            raise RescoreError("Another rescoring run is using this checkpoint")
+
+        state = None if restart else read_checkpoint(path)
+        if state is not None and state.get('finished_at'):
+            state = None
+        if state is not None and state.get('statuses') != statuses:
+            raise RescoreError(f"Unfinished run {state['run_id']} covers statuses {state.get('statuses') or 'open'}; "
+                               f"resume it with those or restart")
+        if state is None:
+            if use_rl and not os.path.exists(RL_MODEL_FILE):
+                log(f"No saved RL policy ({RL_MODEL_FILE}); scoring without RL decisions")
+                use_rl = False
+            state = _start_state(statuses, use_rl)
+            _write_checkpoint(path, state)
+            log(f"Rescoring run {state['run_id']} with anomaly model {state['anomaly_version']}")
+        else:
+            from app.ml_models.anomaly_detection import ARTIFACT_NAME
+            from app.ml_models.artifacts import ArtifactStore
+
+            # Old versions are pruned as the model is updated
+            if state['anomaly_version'] not in ArtifactStore(ARTIFACT_NAME).versions():
+                raise RescoreError(f"Anomaly model {state['anomaly_version']} of run {state['run_id']} "
+                                   f"is no longer saved; start over with --restart")
+            log(f"Resuming run {state['run_id']} after claim {state['last_claim_id']} ({state['scored']} scored)")
+
+        service = AIService()
+        started = time.perf_counter()
+        scored_before = state['scored']
+        pending = []
+        in_flight = deque()
+
+        def flush(last_claim_id):
+            _write_scores(pending, state['run_id'], state['anomaly_version'])
+            state['scored'] += len(pending)
+            state['last_claim_id'] = last_claim_id
+            state['updated_at'] = datetime.utcnow().isoformat()
+            _write_checkpoint(path, state)
+            pending.clear()
+            rate = (state['scored'] - scored_before) / max(time.perf_counter() - started, 1e-9)
+            log(f"Scored {state['scored']} claims (through claim {last_claim_id}, {rate:.0f}/s)")
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(Config.MODEL_DIR, state['anomaly_version'], state['rl'])
+        ) as executor:
+            chunks = claim_id_chunks(state['last_claim_id'], chunk_size, statuses)
+            exhausted = False
+            last_done = state['last_claim_id']
+            while True:
+                # Keep every worker busy with one chunk queued behind it
+                while not exhausted and len(in_flight) < workers * 2:
+                    ids = next(chunks, None)
+                    if ids is None:
+                        exhausted = True
+                        break
+                    claims = service.claim_features(claim_ids=ids)
+                    # End the read transaction so the run never pins one
+                    # WAL snapshot (which would stop checkpoints) throughout
+                    db.session.close()
+                    in_flight.append((ids[-1], executor.submit(_score_chunk, claims)))
+                if not in_flight:
+                    break
+                # Collected in submission order, so the checkpoint only
+                # ever covers claims whose scores are all written
+                last_id, future = in_flight.popleft()
+                try:
+                    pending.extend(future.result())
+                except BrokenProcessPool:
+                    # A worker failed to start (e.g. its model was pruned
+                    # meanwhile); what was written stays checkpointed
+                    raise RescoreError("Rescoring workers failed to start; see the worker output")
+                last_done = last_id
+                if len(pending) >= write_batch:
+                    flush(last_done)
+            if pending:
+                flush(last_done)
+
+        state['finished_at'] = datetime.utcnow().isoformat()
+        _write_checkpoint(path, state)
+        log(f"Rescoring run {state['run_id']} finished: {state['scored']} claims")
+        return state
+
+
+class RescoreRunner:
+    """Runs rescore_claims in a background thread for the admin endpoint, one run at a time"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self.last_error = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.extensions['rescore_runner'] = self
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, **options):
+        """Start a run in the background; returns False if one is already running here"""
+        with self._lock:
+            if self.running:
+                return False
+            self.last_error = None
+            self._thread = threading.Thread(target=self._run, kwargs=options, daemon=True)
+            self._thread.start()
+            return True
+
+    def _run(self, **options):
+        with self.app.app_context():
+            try:
+                rescore_claims(**options)
+            except Exception as e:
+                print(f"Error in rescoring run: {str(e)}")
+                self.last_error = str(e)
+
+    def status(self):
+        return {
+            'running': self.running,
+            'error': self.last_error,
+            'checkpoint': read_checkpoint()
+        }
+
+
+rescore_runner = RescoreRunner()
@@ -50,6 +50,20 @@ class RLFraudService:
             }
         }
 
+    def analyze_batch(self, claims):
+        """Decision and confidence for many claims with one policy call"""
+        if not claims:
+            return []
+        observations = np.stack([self._claim_to_observation(claim) for claim in claims])
+        actions, _states = self.agent.predict(observations)
+        return [
+            {
+                'decision': self._action_to_decision(int(action)),
+                'confidence': float(self._calculate_confidence(int(action)))
+            }
+            for action in np.asarray(actions).reshape(-1)
+        ]
+
     def _process_observation(self, claim_data):
         """Alias for _claim_to_observation for backward compatibility"""
         return self._claim_to_observation(claim_data)
@@ -0,0 +1,103 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class VerificationCache:
+    """Persistent, content-addressed cache of document verification results.
+
+    Results are keyed by the SHA-256 of the uploaded bytes plus the
+    verification pipeline version, so a re-uploaded receipt or photo is
+    answered from the cache instead of paying for OCR, sentiment and ELA
+    again. The store is a small SQLite file with least-recently-used
+    eviction once it grows past ``max_bytes``. Everything in it is
+    disposable: deleting the file only costs re-verification.
+    """
+
+    def __init__(self, app=None, path=None, max_bytes=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from app.utils.config import Config
+        if self.path is None:
+            self.path = app.config.get(
+                'VERIFICATION_CACHE_PATH',
+                os.path.join(app.root_path, 'instance', 'verification_cache.db')
+            )
+        if self.max_bytes is None:
+            self.max_bytes = app.config.get('VERIFICATION_CACHE_MAX_BYTES', Config.VERIFICATION_CACHE_MAX_BYTES)
+        app.extensions['verification_cache'] = self
+
+    def _connection(self):
+        # sqlite3 connections cannot be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS verification_cache (
+                    content_hash TEXT NOT NULL,
+                    pipeline_version TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    last_accessed REAL NOT NULL,
+                    PRIMARY KEY (content_hash, pipeline_version)
+                )
+            ''')
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS ix_verification_cache_last_accessed '
+                'ON verification_cache (last_accessed)'
+            )
+            self._local.conn = conn
+        return conn
+
+    def get(self, content_hash, pipeline_version):
+        """Return the cached result for this content, or None"""
+        conn = self._connection()
+        row = conn.execute(
+            'SELECT result FROM verification_cache WHERE content_hash = ? AND pipeline_version = ?',
+            (content_hash, pipeline_version)
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            'UPDATE verification_cache SET last_accessed = ? WHERE content_hash = ? AND pipeline_version = ?',
+            (time.time(), content_hash, pipeline_version)
+        )
+        return json.loads(row[0])
+
+    def put(self, content_hash, pipeline_version, result):
+        """Store a result and evict the least recently used entries if over budget"""
+        payload = json.dumps(result, default=str)
+        conn = self._connection()
+        conn.execute(
+            'INSERT OR REPLACE INTO verification_cache '
+            '(content_hash, pipeline_version, result, size_bytes, last_accessed) VALUES (?, ?, ?, ?, ?)',
+            (content_hash, pipeline_version, payload, len(payload), time.time())
+        )
+        self._evict(conn)
+
+    def _evict(self, conn):
+        total = conn.execute('SELECT COALESCE(SUM(size_bytes), 0) FROM verification_cache').fetchone()[0]
+        while total > self.max_bytes:
+            rows = conn.execute(
+                'SELECT rowid, size_bytes FROM verification_cache ORDER BY last_accessed LIMIT 100'
+            ).fetchall()
+            if not rows:
+                break
+            evicted = []
+            for rowid, size_bytes in rows:
+                if total <= self.max_bytes:
+                    break
+                evicted.append((rowid,))
+                total -= size_bytes
+            conn.executemany('DELETE FROM verification_cache WHERE rowid = ?', evicted)
+
+verification_cache = VerificationCache()
@@ -0,0 +1,263 @@
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import select, update
+
+from app import db
+
+
+def _init_worker():
+    """Load the document verifier once per worker process"""
+    from app.ml_models.document_verification import DocumentVerifier
+    from app.services.model_registry import model_registry
+    # A worker verifies one file at a time, so its sentiment queue never
+    # gets a second request to batch; waiting for one only adds latency
+    model_registry.register('document_verifier', lambda: DocumentVerifier(sentiment_max_wait_ms=0))
+    model_registry.get('document_verifier')
+
+
+def _verify_file(filepath):
+    """Run full document verification inside a worker process
+
+    Returns the result together with a snapshot of the worker's OCR and
+    inference metrics, which are otherwise invisible to the web process.
+    """
+    from app.ml_models.inference_queue import queue_metrics
+    from app.ml_models.ocr_pool import ocr_pool
+    from app.services.model_registry import model_registry
+    try:
+        result = model_registry.get('document_verifier').verify_document(filepath)
+    except Exception as e:
+        result = {'valid': False, 'reason': str(e), 'error': True}
+    return result, {
+        'pid': os.getpid(),
+        'ocr': ocr_pool.metrics(),
+        'inference': queue_metrics()
+    }
+
+
+def _run_failed(result):
+    """Whether verification itself broke (worker error or timeout), as opposed to finding the document invalid"""
+    metadata = result.get('metadata') or {}
+    return bool(result.get('error')) or bool(metadata.get('timed_out'))
+
+
+def _cacheable(result):
+    """Whether a result is final rather than a transient failure worth retrying"""
+    metadata = result.get('metadata') or {}
+    return bool(result.get('valid')) and not metadata.get('timed_out') and not metadata.get('ocr_errors')
+
+
+class VerificationPool:
+    """Bounded pool of worker processes that verify uploaded claim documents.
+
+    Submission saves the files and returns straight away; each file is then
+    verified in a worker process and its result written back to the claim's
+    document row, so progress is visible per file.
+    """
+
+    def __init__(self, app=None, max_workers=None):
+        self.app = None
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._results_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._queued = 0
+        self._turnaround = deque(maxlen=1000)
+        self._worker_metrics = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from app.utils.config import Config
+        self.app = app
+        if self.max_workers is None:
+            self.max_workers = app.config.get('VERIFICATION_WORKERS', Config.VERIFICATION_WORKERS)
+        app.extensions['verification_pool'] = self
+
+    def _get_executor(self):
+        # Workers are spawned lazily so scripts that only build the app
+        # (create_db, seeding) never start model-loading processes
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker
+                )
+                atexit.register(self.shutdown)
+            return self._executor
+
+    def shutdown(self, wait=False):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+
+    def submit_claim_files(self, claim_id, saved_files):
+        """Queue every saved file of a claim for verification
+
+        Files whose content is already in the verification cache are
+        answered immediately; only cache misses go to the worker processes.
+        """
+        from app.ml_models.document_verification import PIPELINE_VERSION
+        from app.services.verification_cache import verification_cache
+
+        updates = {}
+        pending = []
+        for saved_file in saved_files:
+            content_hash = saved_file.get('sha256')
+            if not content_hash:
+                pending.append(saved_file)
+                continue
+
+            fields = {}
+            # The same bytes already attached to another claim is a fraud signal
+            previous_claims = self._claims_with_document(content_hash, claim_id)
+            if previous_claims:
+                fields['duplicate_of_claims'] = previous_claims
+
+            cached = verification_cache.get(content_hash, PIPELINE_VERSION)
+            if cached is not None:
+                fields.update(self._result_fields(cached))
+                fields['cache_hit'] = True
+            else:
+                pending.append(saved_file)
+
+            if fields:
+                updates[saved_file['saved_filename']] = fields
+
+        if updates:
+            self.update_entries(claim_id, updates)
+
+        if not pending:
+            return
+        executor = self._get_executor()
+        # Each file is its own job, so a claim's files verify in parallel
+        for saved_file in pending:
+            with self._stats_lock:
+                self._queued += 1
+            future = executor.submit(_verify_file, saved_file['saved_path'])
+            future.add_done_callback(
+                lambda f, saved_file=saved_file, queued_at=time.perf_counter(): self._on_done(
+                    claim_id, saved_file, f, queued_at
+                )
+            )
+
+    def metrics(self):
+        """Queue depth and turnaround of this pool, plus the latest metrics reported by each worker"""
+        with self._stats_lock:
+            turnaround_ms = np.array(self._turnaround) * 1000.0
+            return {
+                'max_workers': self.max_workers,
+                'queue_depth': self._queued,
+                'turnaround_ms': {
+                    'mean': float(turnaround_ms.mean()) if turnaround_ms.size else 0.0,
+                    'p95': float(np.percentile(turnaround_ms, 95)) if turnaround_ms.size else 0.0,
+                    'max': float(turnaround_ms.max()) if turnaround_ms.size else 0.0
+                },
+                'workers': list(self._worker_metrics.values())
+            }
+
+    def _on_done(self, claim_id, saved_file, future, queued_at):
+        with self._stats_lock:
+            self._queued -= 1
+            self._turnaround.append(time.perf_counter() - queued_at)
+        try:
+            result, worker_metrics = future.result()
+            with self._stats_lock:
+                self._worker_metrics[worker_metrics['pid']] = worker_metrics
+        except Exception as e:
+            # Broken pool or worker crash; record it against the file
+            result = {'valid': False, 'reason': f'Verification failed: {str(e)}', 'error': True}
+        try:
+            # Failures, OCR timeouts and failed pages are left uncached so
+            # the next upload of the same bytes verifies it again
+            if _cacheable(result) and saved_file.get('sha256'):
+                from app.ml_models.document_verification import PIPELINE_VERSION
+                from app.services.verification_cache import verification_cache
+                verification_cache.put(saved_file['sha256'], PIPELINE_VERSION, result)
+            with self.app.app_context():
+                self.record_result(claim_id, saved_file['saved_filename'], result)
+        except Exception:
+            print(f"Error recording verification result for claim {claim_id}:")
+            print(traceback.format_exc())
+
+    def _result_fields(self, result):
+        return {
+            'verification_result': result,
+            # The verdict is carried by result['valid']; 'failed' means no verdict
+            'status': 'failed' if _run_failed(result) else 'completed',
+            'verified_at': datetime.utcnow().isoformat()
+        }
+
+    def record_result(self, claim_id, saved_filename, result):
+        """Write one file's verification result back to its claim"""
+        self.update_entries(claim_id, {saved_filename: self._result_fields(result)})
+
+    def _claims_with_document(self, content_hash, claim_id):
+        """Other claims that already carry a document with these exact bytes, oldest first"""
+        from app.models.claim_documents import ClaimDocument
+
+        # Read from claim_documents in the main database, so the evictable
+        # verification cache never loses a sighting
+        return db.session.execute(
+            select(ClaimDocument.claim_id)
+            .where(ClaimDocument.sha256 == content_hash, ClaimDocument.claim_id != claim_id)
+            .group_by(ClaimDocument.claim_id)
+            .order_by(ClaimDocument.claim_id)
+        ).scalars().all()
+
+    def _match_near_duplicates(self, claim_id, document):
+        """Look the document's perceptual hash up against earlier claims, then index it"""
+        from app.services.phash_index import phash_index
+
+        phash = ((document.payload or {}).get('verification_result') or {}).get('perceptual_hash')
+        if not phash:
+            return
+        matches = phash_index.query(phash, exclude_claim_id=claim_id)
+        if matches:
+            document.apply({'near_duplicates': matches})
+        phash_index.add(claim_id, document.filename, phash)
+
+    def update_entries(self, claim_id, updates):
+        """Merge fields into a claim's documents, keyed by saved filename
+
+        Only the documents and the claim's summary columns are written; the
+        claim's version belongs to reviewers and is left alone.
+        """
+        from app.models.claims import Claim
+
+        with self._results_lock:
+            claim = Claim.query.get(claim_id)
+            if not claim:
+                return
+
+            for document in claim.documents:
+                fields = updates.get(document.saved_filename)
+                if fields:
+                    document.apply(fields)
+                    self._match_near_duplicates(claim_id, document)
+            claim.refresh_summary()
+
+            if claim.documents_completed + claim.documents_failed == claim.document_count:
+                # Only moves on a claim no reviewer has decided meanwhile
+                db.session.execute(
+                    update(Claim)
+                    .where(Claim.id == claim_id, Claim.status == 'processing')
+                    .values(status='pending'),
+                    execution_options={'synchronize_session': False}
+                )
+
+            db.session.commit()
+
+verification_pool = VerificationPool()
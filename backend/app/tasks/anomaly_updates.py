@@ -0,0 +1,38 @@
+from apscheduler.schedulers.background import BackgroundScheduler
+from app.services.model_registry import model_registry
+from app.utils.config import Config
+
+def _load_latest(detector):
+    # Versions saved by other workers, or by train_anomaly_model.py
+    latest = detector.store.latest()
+    if latest and latest != detector.version:
+        detector.load(latest)
+
+def update_anomaly_model(app):
+    with app.app_context():
+        try:
+            from app.services.ai_service import AIService
+            detector = model_registry.get('anomaly_detector')
+            _load_latest(detector)
+            if detector.model is None:
+                return
+            # One worker updates per round; the others load its version next round
+            with detector.store.locked() as acquired:
+                if not acquired:
+                    return
+                _load_latest(detector)
+                metadata = AIService().update_anomaly_model()
+            if metadata:
+                print(f"Anomaly model updated to {metadata['version']}: replaced "
+                      f"{metadata['trees_replaced']} trees using {metadata['update_size']} new claims")
+        except Exception as e:
+            print(f"Error updating anomaly model: {str(e)}")
+
+def init_scheduler(app):
+    if Config.ANOMALY_UPDATE_MINUTES <= 0:
+        return
+    scheduler = BackgroundScheduler()
+    scheduler.add_job(update_anomaly_model, 'interval', minutes=Config.ANOMALY_UPDATE_MINUTES,
+                      args=[app], max_instances=1, coalesce=True)
+    scheduler.start()
+    print("Anomaly model update scheduler started")
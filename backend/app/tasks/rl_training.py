@@ -1,9 +1,9 @@
 from apscheduler.schedulers.background import BackgroundScheduler
-from app.services.rl_fraud_service import RLFraudService
+from app.services.model_registry import model_registry
 
 def train_rl_model():
     try:
-        rl_service = RLFraudService()
+        rl_service = model_registry.get('rl_service')
         rl_service.agent.train(total_timesteps=5000)
         rl_service.agent.model.save("rl_fraud_model")
         print("RL model training completed successfully")
@@ -6,9 +6,54 @@ load_dotenv()
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-here')
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'your-jwt-secret-key-here')
-    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///insurance.db')
+    # Relative SQLite paths resolve against the app's instance folder (app/instance)
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///app.db')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')  # durable in WAL mode up to the last checkpoint
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))  # 256MB
+    SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', 64 * 1024))  # 64MB per connection
+    SQLITE_WRITE_POOL_SIZE = int(os.getenv('SQLITE_WRITE_POOL_SIZE', 4))
+    SQLITE_READ_POOL_SIZE = int(os.getenv('SQLITE_READ_POOL_SIZE', 16))
+    SQLITE_POOL_TIMEOUT = float(os.getenv('SQLITE_POOL_TIMEOUT', 30))  # seconds to wait for a pooled connection
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     JWT_ACCESS_TOKEN_EXPIRES = 3600  # 1 hour
     UPLOAD_FOLDER = 'uploads'
     ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg'}
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB 
\ No newline at end of file
+    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
+    MAX_UPLOAD_FILE_SIZE = int(os.getenv('MAX_UPLOAD_FILE_SIZE', MAX_CONTENT_LENGTH))
+    ALLOWED_UPLOAD_TYPES = {'image/jpeg', 'image/png', 'image/tiff', 'application/pdf'}
+    VERIFICATION_WORKERS = int(os.getenv('VERIFICATION_WORKERS', max(1, (os.cpu_count() or 2) // 2))) 
+    VERIFICATION_CACHE_MAX_BYTES = int(os.getenv('VERIFICATION_CACHE_MAX_BYTES', 512 * 1024 * 1024))  # 512MB
+    SENTIMENT_MAX_BATCH_SIZE = int(os.getenv('SENTIMENT_MAX_BATCH_SIZE', 16))
+    SENTIMENT_MAX_WAIT_MS = float(os.getenv('SENTIMENT_MAX_WAIT_MS', 10))
+    PDF_MAX_PAGES = int(os.getenv('PDF_MAX_PAGES', 20))
+    PDF_TEXT_TARGET_CHARS = int(os.getenv('PDF_TEXT_TARGET_CHARS', 20000))
+    PDF_OCR_WORKERS = int(os.getenv('PDF_OCR_WORKERS', min(4, os.cpu_count() or 1)))
+    PDF_RENDER_SCALE = float(os.getenv('PDF_RENDER_SCALE', 2.0))  # 144 DPI
+    # tesseract subprocesses per process; with one process per verification
+    # worker this keeps the node at roughly one OCR job per core
+    OCR_WORKERS = int(os.getenv('OCR_WORKERS', max(1, (os.cpu_count() or 1) // max(1, VERIFICATION_WORKERS))))
+    OCR_JOB_TIMEOUT = float(os.getenv('OCR_JOB_TIMEOUT', 30))  # seconds per image/page
+    OCR_DOCUMENT_TIMEOUT = float(os.getenv('OCR_DOCUMENT_TIMEOUT', 120))  # seconds per document
+    PHASH_MATCH_RADIUS = int(os.getenv('PHASH_MATCH_RADIUS', 6))  # max differing bits of 64
+    CLAIMS_PAGE_SIZE = int(os.getenv('CLAIMS_PAGE_SIZE', 100))
+    CLAIMS_MAX_PAGE_SIZE = int(os.getenv('CLAIMS_MAX_PAGE_SIZE', 1000))
+    EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 1000))  # claims per streamed chunk
+    BULK_STATUS_MAX_UPDATES = int(os.getenv('BULK_STATUS_MAX_UPDATES', 1000))
+    ANOMALY_BATCH_MAX_CLAIMS = int(os.getenv('ANOMALY_BATCH_MAX_CLAIMS', 10000))
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024))  # 64MB
+    RESPONSE_COMPRESS_MIN_BYTES = int(os.getenv('RESPONSE_COMPRESS_MIN_BYTES', 1024))
+    IDENTITY_CACHE_TTL = float(os.getenv('IDENTITY_CACHE_TTL', 60))  # seconds a user's role/state is trusted
+    IDENTITY_CACHE_MAX_ENTRIES = int(os.getenv('IDENTITY_CACHE_MAX_ENTRIES', 10000))
+    # Versioned model artifacts, one subdirectory per model (app/instance/models by default)
+    MODEL_DIR = os.getenv('MODEL_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance', 'models'))
+    MODEL_KEEP_VERSIONS = int(os.getenv('MODEL_KEEP_VERSIONS', 5))
+    # Minutes between sliding-window updates of the anomaly model (0 disables them)
+    ANOMALY_UPDATE_MINUTES = float(os.getenv('ANOMALY_UPDATE_MINUTES', 15))
+    # Bulk rescoring of open claims (rescore_claims.py, /api/rescore-claims)
+    RESCORE_CHECKPOINT = os.getenv('RESCORE_CHECKPOINT', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance', 'rescore_checkpoint.json'))
+    RESCORE_WORKERS = int(os.getenv('RESCORE_WORKERS', max(1, (os.cpu_count() or 2) - 1)))
+    RESCORE_CHUNK_SIZE = int(os.getenv('RESCORE_CHUNK_SIZE', 1000))  # claims per worker task
+    RESCORE_WRITE_BATCH = int(os.getenv('RESCORE_WRITE_BATCH', 5000))  # scores per write and checkpoint
+    # Registry models every worker loads at startup instead of on first request
+    PRELOAD_MODELS = [name for name in os.getenv('PRELOAD_MODELS', 'anomaly_detector').split(',') if name]
@@ -0,0 +1,128 @@
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+
+from app.utils.config import Config
+
+# Bind key of the read-only engine
+READ_BIND = 'read'
+
+
+class RoutingSession(Session):
+    """Session that sends plain reads to the read engine and everything else to the writer.
+
+    Once the session has written in the current transaction, later reads
+    stay on the writer as well so they see their own uncommitted changes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and READ_BIND in self._db.engines and not self._writing(clause):
+            return self._db.engines[READ_BIND]
+        self.info['wrote'] = True
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _writing(self, clause):
+        if self._flushing or self.info.get('wrote'):
+            return True
+        # Only SELECTs may go to the reader; text() and DML go to the writer
+        return clause is not None and not getattr(clause, 'is_select', False)
+
+
+@event.listens_for(RoutingSession, 'after_transaction_end')
+def _reset_routing(session, transaction):
+    if transaction.parent is None:
+        session.info.pop('wrote', None)
+
+
+def upsert(connection, table, rows, index_elements, update):
+    """INSERT ``rows`` (a dict or list of dicts), updating rows that conflict on ``index_elements``
+
+    ``update`` maps the proposed row (``excluded``) to the SET clause; its
+    expressions see the existing row as it was. SQLite and PostgreSQL only.
+    """
+    dialect = {'sqlite': sqlite, 'postgresql': postgresql}[connection.dialect.name]
+    statement = dialect.insert(table)
+    # Rows go as parameters (executemany for a list), not inline VALUES
+    return connection.execute(statement.on_conflict_do_update(
+        index_elements=index_elements, set_=update(statement.excluded)
+    ), rows)
+
+
+def _sqlite_pragmas(config, read_only):
+    pragmas = [
+        f"PRAGMA busy_timeout = {int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA synchronous = {config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA mmap_size = {int(config['SQLITE_MMAP_SIZE'])}",
+        # Negative cache_size is in KiB rather than pages
+        f"PRAGMA cache_size = -{int(config['SQLITE_CACHE_SIZE_KB'])}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only = ON")
+    else:
+        # WAL is a property of the database file; readers then never block the writer
+        pragmas.insert(0, "PRAGMA journal_mode = WAL")
+    return pragmas
+
+
+def _configure_sqlite_engine(engine, config, read_only):
+    pragmas = _sqlite_pragmas(config, read_only)
+    # The writer takes the write lock when its transaction starts, so two
+    # writers queue on busy_timeout instead of failing on lock upgrade
+    begin = "BEGIN" if read_only else "BEGIN IMMEDIATE"
+
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        # Let SQLAlchemy, not pysqlite, decide when transactions begin
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    @event.listens_for(engine, 'begin')
+    def on_begin(conn):
+        conn.exec_driver_sql(begin)
+
+
+def init_app(app, db):
+    """Configure the database engines and initialize ``db`` for the app
+
+    For file-based SQLite the default bind is the write engine and a second,
+    query-only engine on the same file is added under ``READ_BIND``; both are
+    pooled and get WAL, busy timeout, synchronous, mmap and cache pragmas on
+    every new connection. Other databases are used as configured.
+    """
+    app.config.setdefault('SQLALCHEMY_DATABASE_URI', Config.SQLALCHEMY_DATABASE_URI)
+    app.config.setdefault('SQLALCHEMY_TRACK_MODIFICATIONS', False)
+    for key in ('SQLITE_BUSY_TIMEOUT_MS', 'SQLITE_SYNCHRONOUS', 'SQLITE_MMAP_SIZE', 'SQLITE_CACHE_SIZE_KB',
+                'SQLITE_WRITE_POOL_SIZE', 'SQLITE_READ_POOL_SIZE', 'SQLITE_POOL_TIMEOUT'):
+        app.config.setdefault(key, getattr(Config, key))
+
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    sqlite_file = url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+    if sqlite_file:
+        app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {
+            'pool_size': app.config['SQLITE_WRITE_POOL_SIZE'],
+            'max_overflow': 0,
+            'pool_timeout': app.config['SQLITE_POOL_TIMEOUT']
+        })
+        binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+        binds.setdefault(READ_BIND, {
+            'url': app.config['SQLALCHEMY_DATABASE_URI'],
+            'pool_size': app.config['SQLITE_READ_POOL_SIZE'],
+            'max_overflow': app.config['SQLITE_READ_POOL_SIZE'],
+            'pool_timeout': app.config['SQLITE_POOL_TIMEOUT']
+        })
+
+    db.init_app(app)
+
+    if sqlite_file:
+        with app.app_context():
+            _configure_sqlite_engine(db.engines[None], app.config, read_only=False)
+            _configure_sqlite_engine(db.engines[READ_BIND], app.config, read_only=True)
+            # Switch the file to WAL now, before any reader can hold it in
+            # rollback-journal mode
+            with db.engines[None].connect():
+                pass
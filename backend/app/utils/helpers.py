@@ -1,6 +1,16 @@
+from contextlib import contextmanager
 from werkzeug.utils import secure_filename
+import hashlib
 import os
 
+try:
+    import fcntl
+except ImportError:
+    # Windows: try_file_lock always succeeds
+    fcntl = None
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
 def allowed_file(filename, allowed_extensions):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in allowed_extensions
@@ -11,5 +21,44 @@ def save_uploaded_file(file, upload_folder):
     
     filename = secure_filename(file.filename)
     file_path = os.path.join(upload_folder, filename)
-    file.save(file_path)
-    return file_path 
\ No newline at end of file
+    commit = getattr(file.stream, 'commit', None)
+    if commit is not None:
+        # Streamed into the upload folder during parsing; rename, don't copy
+        commit(file_path)
+    else:
+        file.save(file_path)
+    return file_path 
+
+def save_upload_stream(file, file_path, chunk_size=UPLOAD_CHUNK_SIZE):
+    """Write an upload to disk in chunks, hashing it on the way through
+
+    Returns the SHA-256 hex digest and size of what was written.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(file_path, 'wb') as out:
+        while True:
+            chunk = file.stream.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+            out.write(chunk)
+    return digest.hexdigest(), size
+
+
+@contextmanager
+def try_file_lock(path):
+    """Hold an exclusive lock on ``path`` across processes; yields False if another holder has it"""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+        yield True
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(fd)
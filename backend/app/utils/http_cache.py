@@ -0,0 +1,152 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, make_response, request
+
+from app.services.data_version import data_version
+from app.utils.config import Config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class CompressedResponseCache:
+    """LRU of response bodies per URL and data version, kept precompressed.
+
+    Each entry holds the identity body and, created the first time a client
+    asks for them, its gzip and brotli encodings, so repeated polls are
+    served straight from memory. Total size is bounded in bytes.
+    """
+
+    def __init__(self, max_bytes=None, min_compress_bytes=None):
+        self.max_bytes = max_bytes or Config.RESPONSE_CACHE_MAX_BYTES
+        self.min_compress_bytes = (
+            min_compress_bytes if min_compress_bytes is not None else Config.RESPONSE_COMPRESS_MIN_BYTES
+        )
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry['version'] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, version, body, mimetype):
+        entry = {'version': version, 'mimetype': mimetype, 'bodies': {'identity': body}}
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = entry
+            self._size += len(body)
+            self._evict()
+        return entry
+
+    def encoded(self, key, entry, encoding):
+        """The entry's body in ``encoding``, compressing it once on first use"""
+        body = entry['bodies'].get(encoding)
+        if body is not None:
+            return body
+        identity = entry['bodies']['identity']
+        if encoding == 'br':
+            body = brotli.compress(identity, quality=5)
+        else:
+            body = gzip.compress(identity, compresslevel=6)
+        with self._lock:
+            if self._entries.get(key) is entry and encoding not in entry['bodies']:
+                entry['bodies'][encoding] = body
+                self._size += len(body)
+                self._evict()
+        return body
+
+    def choose_encoding(self, entry, accept_encodings):
+        if len(entry['bodies']['identity']) < self.min_compress_bytes:
+            return 'identity'
+        if brotli is not None and 'br' in accept_encodings:
+            return 'br'
+        if 'gzip' in accept_encodings:
+            return 'gzip'
+        return 'identity'
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= sum(len(body) for body in entry['bodies'].values())
+
+    def _evict(self):
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            self._discard(next(iter(self._entries)))
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'size_bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+response_cache = CompressedResponseCache()
+
+
+def _cache_key():
+    # Same URL with parameters in any order is the same resource
+    args = sorted(request.args.items(multi=True))
+    return request.path + '?' + '&'.join(f'{name}={value}' for name, value in args)
+
+
+def conditional_cache(view):
+    """ETag, If-None-Match and precompressed caching for read-only JSON views
+
+    The ETag is derived from the URL and the current data version only, so a
+    matching If-None-Match is answered with 304 before the view runs and
+    without touching the database. Otherwise successful responses are cached
+    per data version and served in the best encoding the client accepts.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        version = data_version.current()
+        key = _cache_key()
+        etag = hashlib.sha1(f'{version}:{key}'.encode()).hexdigest()[:24]
+
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+
+        entry = response_cache.get(key, version)
+        if entry is None:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            entry = response_cache.put(key, version, response.get_data(), response.mimetype)
+
+        accept_encodings = {
+            value.split(';')[0].strip().lower()
+            for value in request.headers.get('Accept-Encoding', '').split(',')
+        }
+        encoding = response_cache.choose_encoding(entry, accept_encodings)
+        response = Response(response_cache.encoded(key, entry, encoding), mimetype=entry['mimetype'])
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        # Clients may keep the body but must revalidate it on every use
+        response.headers['Cache-Control'] = 'no-cache'
+        response.set_etag(etag, weak=True)
+        return response
+
+    return wrapper
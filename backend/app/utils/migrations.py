@@ -0,0 +1,183 @@
+import json
+
+from sqlalchemy import inspect, select, text
+
+from app import db
+
+
+def ensure_columns(engine):
+    """Add model columns missing from existing tables; returns the names added
+
+    SQLite can only append columns that are nullable or have a server
+    default, which every column added after a table's creation must be.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+            if column.server_default is not None:
+                ddl += f" DEFAULT {column.server_default.arg}"
+            with engine.begin() as conn:
+                conn.execute(text(ddl))
+            added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def ensure_indexes(engine):
+    """Create any model index missing from the database; returns the names created
+
+    ``db.create_all`` only creates indexes together with new tables, so
+    databases created before an index was added never get it otherwise.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=engine, checkfirst=True)
+                created.append(index.name)
+    return created
+
+
+def legacy_documents(results, files):
+    """Document rows for a claim's legacy ``verification_results`` and ``files`` JSON
+
+    Entries are paired with their saved-file record by saved filename, or
+    else by position; files without an entry become documents of their own.
+    Returns the rows and the risk score some old summaries carried.
+    """
+    from app.models.claim_documents import document_row
+
+    entries = [entry for entry in results if isinstance(entry, dict)] if isinstance(results, list) else []
+    files = files if isinstance(files, list) else []
+    index_by_saved = {
+        file_info['saved_filename']: i for i, file_info in enumerate(files)
+        if isinstance(file_info, dict) and file_info.get('saved_filename')
+    }
+
+    rows = []
+    used = set()
+    for position, entry in enumerate(entries):
+        i = index_by_saved.get(entry.get('saved_filename'), position)
+        file_info = files[i] if i < len(files) and i not in used else None
+        if file_info is not None:
+            used.add(i)
+        rows.append(document_row(entry, file_info, len(rows)))
+
+    # Pre-document summaries such as {"verified": ..., "risk_score": ...}
+    summary = results if isinstance(results, dict) else {}
+    file_entry = {'verification_result': {'valid': bool(summary['verified'])}} if 'verified' in summary else None
+    for i, file_info in enumerate(files):
+        if i not in used:
+            rows.append(document_row(file_entry, file_info, len(rows)))
+    return rows, summary.get('risk_score')
+
+
+def backfill_claim_documents(engine, batch_size=500):
+    """Move the legacy per-claim JSON blobs into claim_documents; returns the claims moved
+
+    Each claim gets its documents and summary columns, and its legacy
+    columns are cleared in the same transaction, so the backfill can be
+    interrupted and rerun safely.
+    """
+    from app.models.claim_documents import ClaimDocument, summarize
+
+    columns = {column['name'] for column in inspect(engine).get_columns('claims')}
+    if not {'verification_results', 'files'} <= columns:
+        return 0
+
+    migrated = 0
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            claims = conn.execute(text(
+                "SELECT id, verification_results, files FROM claims "
+                "WHERE id > :last_id AND (verification_results IS NOT NULL OR files IS NOT NULL) "
+                "ORDER BY id LIMIT :limit"
+            ), {'last_id': last_id, 'limit': batch_size}).fetchall()
+            if not claims:
+                break
+
+            documents = []
+            summaries = []
+            for claim_id, raw_results, raw_files in claims:
+                rows, risk_score = legacy_documents(
+                    json.loads(raw_results) if raw_results else None,
+                    json.loads(raw_files) if raw_files else None
+                )
+                documents.extend({**row, 'claim_id': claim_id} for row in rows)
+                summaries.append({
+                    'id': claim_id,
+                    'risk_score': risk_score,
+                    **summarize((row['status'], row['ela_score']) for row in rows)
+                })
+
+            if documents:
+                conn.execute(ClaimDocument.__table__.insert(), documents)
+            conn.execute(text(
+                "UPDATE claims SET document_count = :document_count, "
+                "documents_completed = :documents_completed, documents_failed = :documents_failed, "
+                "max_ela_score = :max_ela_score, risk_score = COALESCE(:risk_score, risk_score), "
+                "verification_results = NULL, files = NULL WHERE id = :id"
+            ), summaries)
+            migrated += len(claims)
+            last_id = claims[-1][0]
+    return migrated
+
+
+def backfill_user_claim_stats(engine):
+    """Build user_claim_stats from the claims table if it is empty; returns the users filled in
+
+    Claims inserted through the ORM keep the aggregates current; this
+    covers databases that predate them and bulk loads that bypass the ORM.
+    """
+    from app.models.user_claim_stats import UserClaimStats, rebuild_user_stats
+
+    with engine.begin() as conn:
+        if conn.execute(select(UserClaimStats.user_id).limit(1)).first() is not None:
+            return 0
+        if conn.execute(text("SELECT 1 FROM claims WHERE user_id IS NOT NULL LIMIT 1")).first() is None:
+            return 0
+        return rebuild_user_stats(conn)
+
+
+def run_migrations(engine=None):
+    """Idempotently bring an existing database up to the current schema"""
+    engine = engine or db.engine
+    added = ensure_columns(engine)
+    if added:
+        print(f"Added columns: {', '.join(added)}")
+
+    created = ensure_indexes(engine)
+    if created:
+        print(f"Created indexes: {', '.join(created)}")
+
+    backfilled = backfill_claim_documents(engine)
+    if backfilled:
+        print(f"Moved documents of {backfilled} claims into claim_documents")
+
+    users = backfill_user_claim_stats(engine)
+    if users:
+        print(f"Built claim aggregates of {users} users in user_claim_stats")
+
+    if created or backfilled or users:
+        # Refresh planner statistics so the new indexes are actually chosen
+        with engine.begin() as conn:
+            conn.execute(text('ANALYZE'))
+    return {
+        'columns_added': added,
+        'indexes_created': created,
+        'claims_backfilled': backfilled,
+        'user_stats_built': users
+    }
@@ -0,0 +1,179 @@
+import hashlib
+import os
+import uuid
+
+from flask import Request, current_app, jsonify, request
+from werkzeug.exceptions import HTTPException, RequestEntityTooLarge
+
+from app.utils.config import Config
+
+# Enough leading bytes for magic to identify every type we accept
+SNIFF_BYTES = 2048
+
+# Fallback signatures when python-magic is not installed
+SIGNATURES = [
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'II*\x00', 'image/tiff'),
+    (b'MM\x00*', 'image/tiff'),
+    (b'%PDF-', 'application/pdf'),
+]
+
+
+class UploadRejected(HTTPException):
+    """An upload refused while it was still streaming in"""
+
+    def __init__(self, description, code):
+        self.code = code
+        super().__init__(description)
+
+
+def sniff_mime(head):
+    """MIME type of a file from its leading bytes"""
+    try:
+        import magic
+        return magic.from_buffer(head, mime=True)
+    except (ImportError, AttributeError):
+        for signature, mime in SIGNATURES:
+            if head.startswith(signature):
+                return mime
+        return None
+
+
+class IngestStream:
+    """Writable target for one multipart file part.
+
+    Werkzeug's form parser writes the part into this object chunk by chunk.
+    Each chunk is hashed, counted against the size limit and written straight
+    into the upload folder; the type is sniffed from the first bytes. An
+    oversized or disallowed file raises ``UploadRejected`` in the middle of
+    parsing and its partial file is deleted, so the rest of the body is never
+    written. ``commit`` then renames the file into place without copying it;
+    parts never committed are deleted when the request ends.
+    """
+
+    def __init__(self, upload_folder, max_bytes, allowed_types):
+        os.makedirs(upload_folder, exist_ok=True)
+        self.path = os.path.join(upload_folder, f'.{uuid.uuid4().hex}.part')
+        self.max_bytes = max_bytes
+        self.allowed_types = allowed_types
+        self.size = 0
+        self.mime = None
+        self.committed = False
+        self._digest = hashlib.sha256()
+        self._head = b''
+        self._file = open(self.path, 'w+b')
+
+    @property
+    def sha256(self):
+        return self._digest.hexdigest()
+
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            self.discard()
+            raise UploadRejected(
+                f'File exceeds the {self.max_bytes / (1024 * 1024):.1f}MB upload limit', 413
+            )
+        if self.mime is None:
+            self._head += data[:SNIFF_BYTES - len(self._head)]
+            if len(self._head) >= SNIFF_BYTES:
+                self._check_type()
+        self._digest.update(data)
+        return self._file.write(data)
+
+    def _check_type(self):
+        self.mime = sniff_mime(self._head) or 'application/octet-stream'
+        if self.mime not in self.allowed_types:
+            self.discard()
+            raise UploadRejected(f'File type {self.mime} is not allowed', 415)
+
+    def seek(self, offset, whence=0):
+        # The parser seeks back to the start once the part is complete;
+        # files smaller than SNIFF_BYTES are type-checked here
+        if self.mime is None:
+            self._check_type()
+        return self._file.seek(offset, whence)
+
+    def commit(self, final_path):
+        """Close the file and move it to its final name (a rename, not a copy)"""
+        self._file.close()
+        os.replace(self.path, final_path)
+        self.path = final_path
+        self.committed = True
+        return final_path
+
+    def discard(self):
+        if self.committed:
+            return
+        if not self._file.closed:
+            self._file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __getattr__(self, name):
+        # read, readline, tell, flush, ... go to the underlying file
+        return getattr(self._file, name)
+
+
+class UploadRequest(Request):
+    """Request whose file parts stream through ``IngestStream``"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if not filename:
+            # Empty file inputs; nothing to ingest
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        stream = IngestStream(
+            current_app.config['UPLOAD_FOLDER'],
+            current_app.config['MAX_UPLOAD_FILE_SIZE'],
+            current_app.config['ALLOWED_UPLOAD_TYPES']
+        )
+        self.__dict__.setdefault('_ingest_streams', []).append(stream)
+        return stream
+
+    def _load_form_data(self):
+        try:
+            super()._load_form_data()
+        except UploadRejected:
+            # Earlier parts of a rejected request are of no use either
+            self.discard_uploads()
+            raise
+
+    def discard_uploads(self):
+        """Delete every file part that was not committed to its final name"""
+        for stream in self.__dict__.get('_ingest_streams', []):
+            stream.discard()
+
+
+def init_app(app):
+    """Stream uploads through IngestStream and enforce the size limits"""
+    app.request_class = UploadRequest
+    app.config.setdefault('UPLOAD_FOLDER', Config.UPLOAD_FOLDER)
+    if app.config.get('MAX_CONTENT_LENGTH') is None:
+        # Flask defines the key with no limit, so setdefault would not apply
+        app.config['MAX_CONTENT_LENGTH'] = Config.MAX_CONTENT_LENGTH
+    app.config.setdefault('MAX_UPLOAD_FILE_SIZE', Config.MAX_UPLOAD_FILE_SIZE)
+    app.config.setdefault('ALLOWED_UPLOAD_TYPES', Config.ALLOWED_UPLOAD_TYPES)
+
+    @app.teardown_request
+    def discard_uncommitted_uploads(exc):
+        # Routes that fail, or never touch a file, leave its part behind
+        if isinstance(request, UploadRequest):
+            request.discard_uploads()
+
+    @app.errorhandler(UploadRejected)
+    def handle_upload_rejected(e):
+        return jsonify({
+            "status": "error",
+            "message": e.description
+        }), e.code
+
+    @app.errorhandler(RequestEntityTooLarge)
+    def handle_request_too_large(e):
+        # The whole request is over MAX_CONTENT_LENGTH, raised by werkzeug itself
+        limit = current_app.config.get('MAX_CONTENT_LENGTH')
+        message = f'Request exceeds the {limit / (1024 * 1024):.1f}MB upload limit' if limit else e.description
+        return jsonify({
+            "status": "error",
+            "message": message
+        }), 413
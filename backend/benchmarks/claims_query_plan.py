@@ -0,0 +1,193 @@
+"""Query plans and timings for the claims/policies access paths, before and after indexing.
+
+Builds a throwaway SQLite database with the application schema, fills it with
+synthetic claims, then runs the queries the API issues (listing with filters
+and keyset paging, per-user history, graph joins) without the model indexes
+and again after ``ensure_indexes``. EXPLAIN QUERY PLAN output and timings for
+both runs are written to a JSON file.
+
+    python -m benchmarks.claims_query_plan --claims 1000000 --output query_plans.json
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+
+from app import db
+from app.models.users import User
+from app.models.policies import Policy
+from app.models.claims import Claim
+from app.utils.migrations import ensure_indexes
+
+STATUSES = ['pending'] * 6 + ['approved'] * 3 + ['rejected', 'processing']
+CLAIM_TYPES = ['auto', 'health', 'property', 'life', 'travel']
+PAGE_SIZE = 100
+CHUNK = 50000
+
+# Mirrors the SQL the routes emit; :params are filled in from the generated data
+QUERIES = {
+    'list_newest': (
+        "SELECT id, claim_type, status, submitted_at FROM claims "
+        "ORDER BY submitted_at DESC, id DESC LIMIT :limit"
+    ),
+    'list_by_status': (
+        "SELECT id, claim_type, status, submitted_at FROM claims WHERE status = :status "
+        "ORDER BY submitted_at DESC, id DESC LIMIT :limit"
+    ),
+    'list_by_type': (
+        "SELECT id, claim_type, status, submitted_at FROM claims WHERE claim_type = :claim_type "
+        "ORDER BY submitted_at DESC, id DESC LIMIT :limit"
+    ),
+    'list_by_status_keyset': (
+        "SELECT id, claim_type, status, submitted_at FROM claims WHERE status = :status "
+        "AND (submitted_at < :cursor_at OR (submitted_at = :cursor_at AND id < :cursor_id)) "
+        "ORDER BY submitted_at DESC, id DESC LIMIT :limit"
+    ),
+    'count_by_status': "SELECT count(*) FROM claims WHERE status = :status",
+    'user_history': (
+        "SELECT id, claim_type, submitted_at FROM claims WHERE user_id = :user_id "
+        "ORDER BY submitted_at DESC"
+    ),
+    'policy_claims': "SELECT id, status FROM claims WHERE policy_id = :policy_id",
+    'reviewer_claims': "SELECT id, status FROM claims WHERE reviewed_by = :reviewer_id",
+    'user_policies': "SELECT id, policy_number FROM policies WHERE user_id = :user_id",
+    'active_policies': "SELECT count(*) FROM policies WHERE status = :policy_status",
+}
+
+
+def populate(engine, n_claims, seed):
+    rng = random.Random(seed)
+    n_users = max(n_claims // 10, 10)
+    n_policies = max(n_claims // 7, 10)
+    n_reviewers = 500
+    start = datetime(2022, 1, 1)
+    span_seconds = 3 * 365 * 24 * 3600
+
+    with engine.begin() as conn:
+        conn.execute(
+            User.__table__.insert(),
+            [{'id': i, 'username': f'user{i}', 'email': f'user{i}@example.com',
+              'password_hash': 'x', 'first_name': 'Bench', 'last_name': f'User{i}',
+              'role': 'employee' if i <= n_reviewers else 'policyholder'}
+             for i in range(1, n_users + 1)]
+        )
+        conn.execute(
+            Policy.__table__.insert(),
+            [{'id': i, 'policy_number': f'POL{i:08d}', 'policy_type': rng.choice(CLAIM_TYPES),
+              'start_date': start.date(), 'end_date': (start + timedelta(days=1095)).date(),
+              'premium_amount': 500.0, 'status': rng.choice(['active', 'active', 'expired', 'cancelled']),
+              'user_id': rng.randint(1, n_users)}
+             for i in range(1, n_policies + 1)]
+        )
+        for offset in range(0, n_claims, CHUNK):
+            rows = []
+            for i in range(offset + 1, min(offset + CHUNK, n_claims) + 1):
+                status = rng.choice(STATUSES)
+                rows.append({
+                    'id': i,
+                    'claim_type': rng.choice(CLAIM_TYPES),
+                    'description': None,
+                    'submitted_at': start + timedelta(seconds=rng.randrange(span_seconds)),
+                    'status': status,
+                    'verification_results': [],
+                    'files': [],
+                    'user_id': rng.randint(n_reviewers + 1, n_users),
+                    'policy_id': rng.randint(1, n_policies),
+                    'reviewed_by': rng.randint(1, n_reviewers) if status in ('approved', 'rejected') else None,
+                })
+            conn.execute(Claim.__table__.insert(), rows)
+    return {'users': n_users, 'policies': n_policies, 'reviewers': n_reviewers}
+
+
+def query_params(conn, counts):
+    cursor_at, cursor_id = conn.execute(text(
+        "SELECT submitted_at, id FROM claims WHERE status = 'pending' "
+        "ORDER BY submitted_at DESC, id DESC LIMIT 1 OFFSET 5000"
+    )).one()
+    return {
+        'limit': PAGE_SIZE + 1,
+        'status': 'rejected',
+        'claim_type': 'travel',
+        'cursor_at': cursor_at,
+        'cursor_id': cursor_id,
+        'user_id': counts['reviewers'] + 42,
+        'policy_id': 4242,
+        'reviewer_id': 42,
+        'policy_status': 'active',
+    }
+
+
+def run_queries(conn, params, repeat):
+    results = {}
+    for name, sql in QUERIES.items():
+        plan = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params)]
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            conn.execute(text(sql), params).fetchall()
+            timings.append((time.perf_counter() - started) * 1000.0)
+        timings.sort()
+        results[name] = {
+            'plan': plan,
+            'median_ms': round(timings[len(timings) // 2], 3),
+            'min_ms': round(timings[0], 3),
+        }
+        print(f"  {name:<24} {results[name]['median_ms']:10.2f} ms   {' | '.join(plan)}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--claims', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', default='query_plans.json')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        # Tables only; the indexes are what is being measured
+        db.metadata.create_all(engine, tables=[User.__table__, Policy.__table__, Claim.__table__])
+        with engine.begin() as conn:
+            for table in (Claim.__table__, Policy.__table__):
+                for index in table.indexes:
+                    conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+        started = time.perf_counter()
+        counts = populate(engine, args.claims, args.seed)
+        print(f"Inserted {args.claims} claims in {time.perf_counter() - started:.1f}s")
+
+        report = {'claims': args.claims, **counts, 'generated_at': datetime.utcnow().isoformat()}
+        with engine.connect() as conn:
+            params = query_params(conn, counts)
+            print("Without indexes:")
+            report['before'] = run_queries(conn, params, args.repeat)
+
+        started = time.perf_counter()
+        report['indexes_created'] = ensure_indexes(engine)
+        with engine.begin() as conn:
+            conn.execute(text('ANALYZE'))
+        report['index_build_seconds'] = round(time.perf_counter() - started, 2)
+        print(f"Built {len(report['indexes_created'])} indexes in {report['index_build_seconds']}s")
+
+        with engine.connect() as conn:
+            print("With indexes:")
+            report['after'] = run_queries(conn, params, args.repeat)
+        engine.dispose()
+
+    report['speedup'] = {
+        name: round(report['before'][name]['median_ms'] / max(report['after'][name]['median_ms'], 1e-6), 1)
+        for name in QUERIES
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""Throughput of the SQLite engine profile under concurrent readers and writers.
+
+Runs the same mixed workload (claim listings, a long aggregate report and
+status updates) against two copies of a synthetic database: one opened the
+way create_app used to (a single engine, rollback journal, pysqlite
+defaults) and one through app.utils.database (WAL, pragmas, separate read and
+write engines). Each is driven by 8, 32 and 128 concurrent client threads.
+
+    python -m benchmarks.db_concurrency --claims 100000 --seconds 10 --output db_concurrency.json
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+from flask import Flask
+from sqlalchemy import create_engine, func
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+
+from app import db
+from app.models.claims import Claim
+from app.models.claim_documents import ClaimDocument  # noqa: F401 (creates its table)
+from app.models.image_hashes import ImageHash  # noqa: F401 (creates its table)
+from app.utils import database
+from benchmarks.claims_query_plan import populate
+
+CLIENTS = (8, 32, 128)
+STATUSES = ['pending', 'approved', 'rejected']
+
+
+def build_database(path, n_claims, seed):
+    engine = create_engine(f"sqlite:///{path}")
+    db.metadata.create_all(engine)
+    populate(engine, n_claims, seed)
+    engine.dispose()
+
+
+def make_app(path, tuned):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{path}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    if tuned:
+        database.init_app(app, db)
+    else:
+        db.init_app(app)
+    return app
+
+
+def list_claims(rng, n_claims):
+    Claim.query.filter(Claim.status == rng.choice(STATUSES)).order_by(
+        Claim.submitted_at.desc(), Claim.id.desc()
+    ).limit(50).all()
+
+
+def report(rng, n_claims):
+    # A reviewer dashboard style full scan
+    db.session.query(Claim.claim_type, Claim.status, func.count(Claim.id)).group_by(
+        Claim.claim_type, Claim.status
+    ).all()
+
+
+def update_status(rng, n_claims):
+    claim = db.session.get(Claim, rng.randint(1, n_claims))
+    claim.status = rng.choice(STATUSES)
+    claim.reviewed_at = datetime.utcnow()
+    db.session.commit()
+
+
+# (operation, weight)
+WORKLOAD = [(list_claims, 75), (report, 5), (update_status, 20)]
+
+
+def run(app, n_clients, seconds, n_claims):
+    operations, weights = zip(*WORKLOAD)
+    latencies = {op.__name__: [] for op in operations}
+    errors = {'locked': 0, 'other': 0}
+    lock = threading.Lock()
+    stop = time.monotonic() + seconds
+
+    def client(seed):
+        rng = random.Random(seed)
+        local = {op.__name__: [] for op in operations}
+        local_errors = {'locked': 0, 'other': 0}
+        while time.monotonic() < stop:
+            op = rng.choices(operations, weights)[0]
+            with app.app_context():
+                started = time.perf_counter()
+                try:
+                    op(rng, n_claims)
+                    local[op.__name__].append(time.perf_counter() - started)
+                except OperationalError as e:
+                    db.session.rollback()
+                    local_errors['locked' if 'locked' in str(e) else 'other'] += 1
+                except SQLAlchemyError:
+                    # Pool checkout timeouts and the like
+                    db.session.rollback()
+                    local_errors['other'] += 1
+        with lock:
+            for name, values in local.items():
+                latencies[name].extend(values)
+            for name, count in local_errors.items():
+                errors[name] += count
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(n_clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    result = {'clients': n_clients, 'errors': errors, 'operations': {}}
+    total = 0
+    for name, values in latencies.items():
+        values_ms = np.array(values) * 1000.0
+        total += len(values)
+        result['operations'][name] = {
+            'count': len(values),
+            'p50_ms': round(float(np.percentile(values_ms, 50)), 2) if values else None,
+            'p95_ms': round(float(np.percentile(values_ms, 95)), 2) if values else None,
+            'p99_ms': round(float(np.percentile(values_ms, 99)), 2) if values else None
+        }
+    result['throughput'] = round(total / seconds, 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--claims', type=int, default=100000)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', default='db_concurrency.json')
+    args = parser.parse_args()
+
+    results = {'claims': args.claims, 'seconds': args.seconds, 'profiles': {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile, tuned in (('default', False), ('tuned', True)):
+            path = os.path.join(tmp, f'{profile}.db')
+            build_database(path, args.claims, args.seed)
+            app = make_app(path, tuned)
+            results['profiles'][profile] = []
+            for n_clients in CLIENTS:
+                result = run(app, n_clients, args.seconds, args.claims)
+                results['profiles'][profile].append(result)
+                ops = result['operations']
+                print(
+                    f"{profile:<8} {n_clients:>4} clients  {result['throughput']:8.1f} ops/s  "
+                    f"list p95 {ops['list_claims']['p95_ms']} ms  "
+                    f"update p95 {ops['update_status']['p95_ms']} ms  "
+                    f"locked {result['errors']['locked']}"
+                )
+            with app.app_context():
+                for engine in db.engines.values():
+                    engine.dispose()
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Throughput and peak-memory benchmark for Error Level Analysis.
+
+Compares the previous temp-file implementation against the in-memory
+calculate_ela / calculate_ela_batch on synthetic 12 MP photos.
+
+    python -m benchmarks.ela_benchmark --images 8
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from app.ml_models.decoded_document import DecodedDocument
+from app.ml_models.utils import calculate_ela, calculate_ela_batch
+
+WIDTH, HEIGHT = 4000, 3000  # 12 MP
+
+
+def legacy_calculate_ela(image_path, temp_path, quality=90):
+    """The original implementation: round-trip through a temp JPEG on disk"""
+    original = cv2.imread(image_path)
+    cv2.imwrite(temp_path, original, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    temp_image = cv2.imread(temp_path)
+    os.remove(temp_path)
+    ela = np.abs(original.astype(np.float32) - temp_image.astype(np.float32))
+    return {'ela_mean': float(np.mean(ela)), 'ela_std': float(np.std(ela))}
+
+
+def make_photo(seed):
+    """Smooth gradients plus sensor-like noise, saved as a phone-quality JPEG"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:HEIGHT, 0:WIDTH].astype(np.float32)
+    base = np.stack([
+        127 + 100 * np.sin(x / (300 + 50 * c) + y / (400 + 30 * c) + seed)
+        for c in range(3)
+    ], axis=-1)
+    base += rng.normal(0, 6, base.shape).astype(np.float32)
+    image = np.clip(base, 0, 255).astype(np.uint8)
+    ok, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 95])
+    return encoded.tobytes()
+
+
+def measure(label, fn, n_images):
+    tracemalloc.start()
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {n_images / elapsed:8.2f} img/s   peak {peak / 2 ** 20:8.1f} MiB")
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--images', type=int, default=8)
+    parser.add_argument('--quality', type=int, default=90)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = []
+        for i in range(args.images):
+            path = os.path.join(workdir, f'photo_{i}.jpg')
+            with open(path, 'wb') as f:
+                f.write(make_photo(i))
+            paths.append(path)
+
+        legacy = legacy_calculate_ela(paths[0], os.path.join(workdir, 'temp.jpg'), args.quality)
+        current = calculate_ela(paths[0], args.quality)
+        assert abs(legacy['ela_mean'] - current['ela_mean']) < 1e-3
+        assert abs(legacy['ela_std'] - current['ela_std']) < 1e-3
+
+        # Every variant reads and decodes its source image, as in production
+
+        print(f"{args.images} images at {WIDTH}x{HEIGHT}, JPEG quality {args.quality}")
+        measure('legacy (temp file, float32)', lambda: [
+            legacy_calculate_ela(path, os.path.join(workdir, 'temp.jpg'), args.quality) for path in paths
+        ], args.images)
+        measure('in-memory, sequential', lambda: [
+            calculate_ela(DecodedDocument.from_path(path), args.quality) for path in paths
+        ], args.images)
+        measure('in-memory, batch', lambda: calculate_ela_batch(paths, args.quality), args.images)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""Single-claim inference latency, pandas feature path vs compiled FeatureSchema rows.
+
+First checks that FeatureSchema rows are identical to the DataFrame feature
+extraction the models are trained on, for AnomalyDetector and PatternDetector,
+over generated claims with every supported date representation, missing
+fields and repeated users; any difference fails the run. Then trains both
+models on synthetic claims in a temporary directory, checks that the
+compiled IsolationForest scores exactly like sklearn's decision_function,
+and times scoring one claim at a time both ways, reporting p50/p99 per stage.
+
+    python -m benchmarks.inference_latency --iterations 2000 --output inference_latency.json
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from app.ml_models import anomaly_detection, pattern_detection
+from app.ml_models.anomaly_detection import AnomalyDetector
+from app.ml_models.iforest import CompiledForest
+from app.ml_models.pattern_detection import PatternDetector
+
+DATE_STYLES = ('datetime', 'date', 'iso')
+
+
+def _date(value, style):
+    if style == 'date':
+        return value.date()
+    if style == 'iso':
+        return value.isoformat()
+    return value
+
+
+def make_claims(rng, n, style, sparse=True):
+    """Claims as the services build them, in one date representation"""
+    base = datetime(2024, 1, 1)
+    claims = []
+    for _ in range(n):
+        claim_date = base + timedelta(seconds=rng.randrange(365 * 24 * 3600))
+        policy_start = claim_date - timedelta(seconds=rng.randrange(-5 * 24 * 3600, 900 * 24 * 3600))
+        claim = {
+            'claim_date': _date(claim_date, style),
+            'policy_start_date': _date(policy_start, style),
+            'user_id': rng.randint(1, max(2, n // 4)),
+            'amount': round(rng.lognormvariate(9, 1), 2),
+            'claim_count_past_year': rng.randint(0, 8),
+            'avg_claim_amount': rng.uniform(500, 50000),
+            'document_count': rng.randint(0, 5),
+            'text_score': rng.random(),
+            'image_score': rng.random(),
+            'amount_past_year': round(rng.lognormvariate(10, 1), 2),
+            'first_policy_start': _date(policy_start - timedelta(seconds=rng.randrange(2000 * 24 * 3600)), style),
+        }
+        if rng.random() < 0.5:
+            # As read from user_claim_stats; the rest fall back to the batch
+            claim['previous_claim_date'] = _date(claim_date - timedelta(seconds=rng.randrange(400 * 24 * 3600)), style)
+        if sparse:
+            for key in ('claim_date', 'policy_start_date', 'previous_claim_date', 'first_policy_start',
+                        'user_id', 'amount', 'text_score'):
+                if key in claim and rng.random() < 0.05:
+                    claim[key] = None
+            if rng.random() < 0.05:
+                del claim['image_score']
+        claims.append(claim)
+    return claims
+
+
+def pandas_rows(detector, claims):
+    return detector._extract_features(pd.DataFrame(claims)).to_numpy(dtype=float)
+
+
+def check_parity(rng, detectors, n_claims):
+    """Number of mismatching rows, per model and date style"""
+    mismatches = {}
+    for kind, (detector, schema) in detectors.items():
+        for style in DATE_STYLES:
+            claims = make_claims(rng, n_claims, style)
+            expected = pandas_rows(detector, claims)
+            batch = schema.matrix(claims)
+            bad = int((~np.all(batch == expected, axis=1)).sum())
+            # Single-claim rows (what the analyze endpoints build)
+            for claim in claims[:200]:
+                if not np.array_equal(schema.row(claim), pandas_rows(detector, [claim])[0]):
+                    bad += 1
+            mismatches[f'{kind}/{style}'] = bad
+    return mismatches
+
+
+def check_forest_parity(rng, detector, n_claims):
+    """Rows scored differently by the compiled forest than by sklearn"""
+    rows = detector._scale(anomaly_detection.SCHEMA.matrix(make_claims(rng, n_claims, 'datetime')))
+    compiled = CompiledForest(detector.model)
+    bad = int((compiled.decision_function(rows) != detector.model.decision_function(rows)).sum())
+    for row in rows[:200]:
+        if compiled.decision_function(row[None]) != detector.model.decision_function(row[None]):
+            bad += 1
+    return bad
+
+
+def percentiles(samples):
+    values = np.array(samples) * 1000.0
+    return {'p50_ms': round(float(np.percentile(values, 50)), 4), 'p99_ms': round(float(np.percentile(values, 99)), 4)}
+
+
+def time_calls(fn, claims, iterations):
+    for claim in claims[:50]:
+        fn(claim)
+    samples = []
+    for i in range(iterations):
+        claim = claims[i % len(claims)]
+        started = time.perf_counter()
+        fn(claim)
+        samples.append(time.perf_counter() - started)
+    return percentiles(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--parity-claims', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', default='inference_latency.json')
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        anomaly = AnomalyDetector(model_dir=model_dir)
+        pattern = PatternDetector()
+        mismatches = check_parity(rng, {
+            'anomaly': (anomaly, anomaly_detection.SCHEMA),
+            'pattern': (pattern, pattern_detection.SCHEMA),
+        }, args.parity_claims)
+        for name, bad in mismatches.items():
+            print(f"parity {name:<18} {'ok' if not bad else f'{bad} mismatching rows'}")
+        if any(mismatches.values()):
+            sys.exit(1)
+
+        claims = make_claims(rng, 1000, 'iso', sparse=False)
+        anomaly.train(make_claims(rng, 5000, 'iso', sparse=False))
+        mismatches['anomaly/forest'] = bad = check_forest_parity(rng, anomaly, args.parity_claims)
+        print(f"parity {'anomaly/forest':<18} {'ok' if not bad else f'{bad} mismatching scores'}")
+        if bad:
+            sys.exit(1)
+        # Fitted in place; PatternDetector.train would also write its model file
+        training = make_claims(rng, 5000, 'iso', sparse=False)
+        labels = [int(claim['amount'] > 20000 and claim['claim_count_past_year'] > 4) for claim in training]
+        pattern.model.fit(pandas_rows(pattern, training), labels)
+
+        def anomaly_pandas(claim):
+            features = anomaly._extract_features(pd.DataFrame([claim]))
+            return anomaly.calibrate(-anomaly.model.decision_function(anomaly.scaler.transform(features)))
+
+        def pattern_pandas(claim):
+            features = pattern._extract_features(pd.DataFrame([claim])).to_numpy(dtype=float)
+            return pattern.model.predict_proba(features)[:, 1]
+
+        stages = {
+            'anomaly_features': {
+                'pandas': time_calls(lambda claim: anomaly._extract_features(pd.DataFrame([claim])), claims, args.iterations),
+                'schema': time_calls(anomaly_detection.SCHEMA.row, claims, args.iterations),
+            },
+            'anomaly_score': {
+                'pandas': time_calls(anomaly_pandas, claims, args.iterations),
+                'schema': time_calls(lambda claim: anomaly.score_batch([claim]), claims, args.iterations),
+            },
+            'pattern_features': {
+                'pandas': time_calls(lambda claim: pattern._extract_features(pd.DataFrame([claim])), claims, args.iterations),
+                'schema': time_calls(pattern_detection.SCHEMA.row, claims, args.iterations),
+            },
+            'pattern_predict': {
+                'pandas': time_calls(pattern_pandas, claims, args.iterations),
+                'schema': time_calls(lambda claim: pattern.predict([claim]), claims, args.iterations),
+            },
+        }
+
+    for stage, paths in stages.items():
+        print(
+            f"{stage:<17} pandas p50 {paths['pandas']['p50_ms']:>8} ms  p99 {paths['pandas']['p99_ms']:>8} ms   "
+            f"schema p50 {paths['schema']['p50_ms']:>8} ms  p99 {paths['schema']['p99_ms']:>8} ms"
+        )
+    with open(args.output, 'w') as f:
+        json.dump({'iterations': args.iterations, 'parity': mismatches, 'stages': stages}, f, indent=2)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,457 @@
+"""Deterministic high-volume users, policies and claims for benchmark databases.
+
+Everything is drawn from one seeded NumPy generator, so the same arguments
+always produce the same database. Claimants follow a heavy-tailed claim
+rate with a small group of repeat claimants, households share phone numbers
+and addresses, and fraud rings are injected: a few recently joined users
+sharing one phone number who file bursts of similar, same-type claims that
+the same employee approves. Ids follow time order in every table.
+
+Rows are written with Core executemany in chunks, with the secondary indexes
+dropped during the load and rebuilt (and ANALYZEd) once at the end.
+
+    python -m benchmarks.seed_data --claims 1000000 --database-url sqlite:///benchmark.db --labels rings.json
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+from itertools import repeat
+
+import numpy as np
+from sqlalchemy import create_engine, event, func, select, text
+from werkzeug.security import generate_password_hash
+
+from app import db
+from app.models.users import User
+from app.models.policies import Policy
+from app.models.claims import Claim
+from app.models.claim_documents import ClaimDocument  # noqa: F401 (creates its table)
+from app.models.image_hashes import ImageHash  # noqa: F401 (creates its table)
+from app.models.user_claim_stats import rebuild_user_stats
+from app.utils.migrations import run_migrations
+from seed_sample_data import FIRST_NAMES, LAST_NAMES
+
+# Fixed reference time so output does not depend on when it is run
+AS_OF = np.datetime64('2025-01-01T00:00:00', 's')
+DAY = 24 * 3600
+YEAR = 365 * DAY
+CHUNK = 50000
+
+CITIES = ['Mumbai', 'Delhi', 'Bengaluru', 'Hyderabad', 'Chennai', 'Kolkata', 'Pune', 'Ahmedabad',
+          'Jaipur', 'Lucknow', 'Kochi', 'Indore', 'Bhopal', 'Nagpur', 'Surat', 'Chandigarh']
+STREETS = ['MG Road', 'Station Road', 'Park Street', 'Church Street', 'Nehru Nagar', 'Gandhi Marg',
+           'Lake View Road', 'Temple Street', 'Ring Road', 'Market Road', 'Civil Lines', 'Sector 12']
+
+# policy_type: (weight, term in years, median premium)
+POLICY_TYPES = {
+    'auto': (0.40, 1, 12000.0),
+    'health': (0.30, 1, 15000.0),
+    'property': (0.20, 1, 8000.0),
+    'life': (0.10, 10, 25000.0),
+}
+# claim_type: median amount; amounts are lognormal around it
+CLAIM_TYPES = {
+    'accident': 60000.0,
+    'medical': 40000.0,
+    'theft': 35000.0,
+    'natural_disaster': 200000.0,
+    'fire': 150000.0,
+}
+# Which claim types each policy type produces
+CLAIM_TYPE_MIX = {
+    'auto': {'accident': 0.75, 'theft': 0.20, 'natural_disaster': 0.05},
+    'health': {'medical': 0.95, 'accident': 0.05},
+    'property': {'theft': 0.45, 'fire': 0.30, 'natural_disaster': 0.25},
+    'life': {'medical': 0.80, 'accident': 0.20},
+}
+DESCRIPTIONS = {
+    'accident': ['Collision at a traffic signal', 'Rear-ended while parked', 'Two-wheeler skid on wet road'],
+    'medical': ['Hospitalisation for fever', 'Day-care surgery', 'Fracture treatment and physiotherapy'],
+    'theft': ['Vehicle stolen from parking', 'Burglary at residence', 'Phone and wallet snatched'],
+    'natural_disaster': ['Flood damage to ground floor', 'Storm damage to roof', 'Landslide damage'],
+    'fire': ['Kitchen fire', 'Electrical short circuit fire', 'Fire spread from neighbouring unit'],
+}
+
+EMPLOYEE_RATE = 0.002
+HOUSEHOLD_RATE = 0.03       # share of policyholders living with another policyholder
+REPEAT_CLAIMANT_RATE = 0.03
+REPEAT_CLAIMANT_BOOST = 10.0
+RECENT_DAYS = 30            # claims newer than this are mostly still open
+
+
+def _dates(seconds):
+    return (AS_OF + seconds.astype('timedelta64[s]')).tolist()
+
+
+def _pick(rng, options, size):
+    names = list(options)
+    weights = np.array([options[name] for name in names], dtype=float)
+    return np.array(names, dtype=object)[rng.choice(len(names), size=size, p=weights / weights.sum())]
+
+
+def _rows(columns):
+    # Constant columns are repeat()s; zip stops at the end of the real ones
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+
+def _sort(arrays, key):
+    order = np.argsort(key, kind='stable')
+    return {name: values[order] for name, values in arrays.items()}, order
+
+
+def build_users(rng, n_users, n_rings):
+    """Users sorted by signup time; offsets are seconds relative to AS_OF"""
+    ring_sizes = rng.integers(3, 9, size=n_rings)
+    n_ring_users = int(ring_sizes.sum())
+    n_regular = max(n_users - n_ring_users, 10)
+    n_employees = max(10, int(n_regular * EMPLOYEE_RATE))
+
+    ring_id = np.concatenate([np.full(n_regular, -1), np.repeat(np.arange(n_rings), ring_sizes)])
+    total = len(ring_id)
+    # Tenure is roughly exponential with a three year mean; ring members joined recently
+    created = -np.minimum(rng.exponential(3 * YEAR, size=total), 10 * YEAR).astype(np.int64) - DAY
+    ring = ring_id >= 0
+    created[ring] = -rng.integers(60 * DAY, 400 * DAY, size=int(ring.sum()))
+    role = np.full(total, 'policyholder', dtype=object)
+    role[rng.choice(n_regular, size=n_employees, replace=False)] = 'employee'
+
+    phone = rng.integers(6_000_000_000, 10_000_000_000, size=total)
+    house = rng.integers(1, 500, size=total)
+    street = rng.integers(0, len(STREETS), size=total)
+    city = rng.integers(0, len(CITIES), size=total)
+
+    # Households: small groups of policyholders sharing a phone number and address
+    holders = np.flatnonzero((role == 'policyholder') & ~ring)
+    shared = rng.permutation(holders)[:int(len(holders) * HOUSEHOLD_RATE)]
+    heads = shared[::3]
+    for offset in (1, 2):
+        members = shared[offset::3]
+        for array in (phone, house, street, city):
+            array[members] = array[heads[:len(members)]]
+
+    # Rings share one phone number and live at one or two addresses
+    ring_members = np.flatnonzero(ring)
+    first_member = ring_members[np.searchsorted(ring_id[ring_members], ring_id[ring_members])]
+    for array in (phone, street, city):
+        array[ring_members] = array[first_member]
+    second_address = rng.random(len(ring_members)) < 0.3
+    house[ring_members] = np.where(second_address, house[ring_members], house[first_member])
+
+    arrays = {
+        'created': created, 'ring_id': ring_id, 'role': role, 'phone': phone,
+        'house': house, 'street': street, 'city': city,
+        'first': rng.integers(0, len(FIRST_NAMES), size=total),
+        'last': rng.integers(0, len(LAST_NAMES), size=total),
+        'verified': rng.random(total) < 0.9,
+        # Heavy-tailed claim rate with a small group of repeat claimants
+        'propensity': rng.gamma(0.6, 1.0, size=total) * np.where(
+            rng.random(total) < REPEAT_CLAIMANT_RATE, REPEAT_CLAIMANT_BOOST, 1.0
+        ),
+    }
+    arrays['propensity'][(role != 'policyholder') | ring] = 0.0
+    users, _ = _sort(arrays, created)
+    return users
+
+
+def build_policies(rng, users, n_policies):
+    """Policies sorted by start date; ring members hold one policy each of their ring's type"""
+    holders = np.flatnonzero((users['role'] == 'policyholder') & (users['ring_id'] < 0))
+    ring_members = np.flatnonzero(users['ring_id'] >= 0)
+    n_regular = max(n_policies - len(ring_members), 1)
+    owner = np.concatenate([
+        rng.permutation(holders)[:n_regular],
+        rng.choice(holders, size=max(0, n_regular - len(holders)))
+    ])
+
+    type_names = list(POLICY_TYPES)
+    weights = np.array([POLICY_TYPES[name][0] for name in type_names])
+    policy_type = rng.choice(len(type_names), size=len(owner), p=weights / weights.sum())
+    n_rings = int(users['ring_id'].max()) + 1 if len(ring_members) else 0
+    ring_types = rng.choice([type_names.index('auto'), type_names.index('property')], size=n_rings)
+    policy_type = np.concatenate([policy_type, ring_types[users['ring_id'][ring_members]]])
+    owner = np.concatenate([owner, ring_members])
+    total = len(owner)
+
+    created = users['created'][owner]
+    start = created + (rng.random(total) * -created).astype(np.int64)
+    start[len(owner) - len(ring_members):] = created[len(owner) - len(ring_members):] + rng.integers(
+        0, 30 * DAY, size=len(ring_members)
+    )
+    start -= start % DAY
+    term = np.array([POLICY_TYPES[name][1] for name in type_names])[policy_type] * YEAR
+    median_premium = np.array([POLICY_TYPES[name][2] for name in type_names])[policy_type]
+    status = np.where(start + term < 0, 'expired', 'active').astype(object)
+    status[rng.random(total) < 0.04] = 'cancelled'
+
+    policies, _ = _sort({
+        'owner': owner,
+        'type': np.array(type_names, dtype=object)[policy_type],
+        'start': start,
+        'end': start + term,
+        'premium': np.round(median_premium * np.exp(rng.normal(0.0, 0.35, size=total)), 2),
+        'status': status,
+        'ring_id': users['ring_id'][owner],
+    }, start)
+    return policies
+
+
+def build_claims(rng, users, policies, n_claims, n_employees):
+    """Claims sorted by submission time, ring claims included"""
+    # Ring bursts: each member files a few similar claims within ~45 days
+    ring_policy = np.flatnonzero(policies['ring_id'] >= 0)
+    ring_of_policy = policies['ring_id'][ring_policy]
+    n_rings = int(ring_of_policy.max()) + 1 if len(ring_policy) else 0
+    per_member = rng.integers(2, 7, size=len(ring_policy))
+    ring_claim_policy = np.repeat(ring_policy, per_member)
+    ring_claim_ring = np.repeat(ring_of_policy, per_member)
+    n_ring_claims = min(len(ring_claim_policy), n_claims)
+    ring_claim_policy = ring_claim_policy[:n_ring_claims]
+    ring_claim_ring = ring_claim_ring[:n_ring_claims]
+
+    latest_start = np.full(n_rings, -10 * YEAR, dtype=np.int64)
+    np.maximum.at(latest_start, ring_of_policy, policies['start'][ring_policy])
+    burst_start = latest_start + rng.integers(DAY, 30 * DAY, size=n_rings)
+    ring_amount = rng.choice([49000.0, 95000.0, 99000.0, 190000.0], size=n_rings)
+    ring_reviewer = rng.integers(0, n_employees, size=n_rings)
+
+    # Regular claims: policies weighted by their holder's claim rate
+    n_regular = n_claims - n_ring_claims
+    weight = users['propensity'][policies['owner']].copy()
+    weight[policies['ring_id'] >= 0] = 0.0
+    cdf = np.cumsum(weight)
+    regular_policy = np.minimum(np.searchsorted(cdf, rng.random(n_regular) * cdf[-1], side='right'),
+                                len(cdf) - 1)
+
+    policy = np.concatenate([regular_policy, ring_claim_policy])
+    ring_id = np.concatenate([np.full(n_regular, -1), ring_claim_ring])
+    ring = ring_id >= 0
+    start = policies['start'][policy]
+    end = np.minimum(policies['end'][policy], -DAY)
+    submitted = np.minimum(
+        start + (rng.random(len(policy)) * np.maximum(end - start, DAY)).astype(np.int64), -60
+    )
+    submitted[ring] = np.minimum(
+        burst_start[ring_id[ring]] + rng.integers(0, 45 * DAY, size=int(ring.sum())), -3600
+    )
+
+    claim_type = np.empty(len(policy), dtype=object)
+    policy_type = policies['type'][policy]
+    for name, mix in CLAIM_TYPE_MIX.items():
+        mask = policy_type == name
+        claim_type[mask] = _pick(rng, mix, int(mask.sum()))
+    median_amount = np.array([CLAIM_TYPES[name] for name in claim_type])
+    amount = median_amount * np.exp(rng.normal(0.0, 0.9, size=len(policy)))
+    # Ring members stay just under review thresholds with near-identical amounts
+    amount[ring] = ring_amount[ring_id[ring]] * rng.uniform(0.93, 1.0, size=int(ring.sum()))
+
+    recent = submitted > -RECENT_DAYS * DAY
+    status = np.where(
+        recent,
+        _pick(rng, {'pending': 0.7, 'processing': 0.3}, len(policy)),
+        _pick(rng, {'approved': 0.68, 'rejected': 0.17, 'pending': 0.15}, len(policy))
+    )
+    status[ring & ~recent] = _pick(rng, {'approved': 0.85, 'pending': 0.15}, int((ring & ~recent).sum()))
+    reviewer = rng.integers(0, n_employees, size=len(policy))
+    reviewer[ring] = ring_reviewer[ring_id[ring]]
+    reviewed = np.isin(status, ['approved', 'rejected'])
+    reviewed_at = np.minimum(submitted + rng.exponential(7 * DAY, size=len(policy)).astype(np.int64), 0)
+
+    claims, _ = _sort({
+        'policy': policy,
+        'user': policies['owner'][policy],
+        'type': claim_type,
+        'description': rng.integers(0, 3, size=len(policy)),
+        'amount': np.round(amount, 2),
+        'submitted': submitted,
+        'status': status,
+        'reviewer': reviewer,
+        'reviewed': reviewed,
+        'reviewed_at': reviewed_at,
+        'ring_id': ring_id,
+    }, submitted)
+    return claims
+
+
+def _drop_secondary_indexes(engine):
+    # Rebuilding indexes once after the load is much faster than maintaining them
+    with engine.begin() as conn:
+        for table in (User.__table__, Policy.__table__, Claim.__table__):
+            for index in table.indexes:
+                conn.execute(text(f'DROP INDEX IF EXISTS {index.name}'))
+
+
+def _insert(engine, table, rows_for, total, chunk_size):
+    for offset in range(0, total, chunk_size):
+        rows = rows_for(offset, min(offset + chunk_size, total))
+        with engine.begin() as conn:
+            conn.execute(table.insert(), rows)
+
+
+def generate(engine, n_claims, n_users=None, n_policies=None, n_rings=None, seed=42, chunk_size=CHUNK):
+    """Fill ``engine``'s database; returns counts and the injected fraud rings"""
+    n_users = n_users or max(n_claims // 4, 50)
+    n_policies = n_policies or int(n_users * 1.2)
+    n_rings = n_rings if n_rings is not None else max(1, n_claims // 2000)
+    rng = np.random.default_rng(seed)
+
+    users = build_users(rng, n_users, n_rings)
+    policies = build_policies(rng, users, n_policies)
+    employees = np.flatnonzero(users['role'] == 'employee')
+    claims = build_claims(rng, users, policies, n_claims, len(employees))
+
+    with engine.connect() as conn:
+        user_base = conn.execute(select(func.coalesce(func.max(User.id), 0))).scalar()
+        policy_base = conn.execute(select(func.coalesce(func.max(Policy.id), 0))).scalar()
+        claim_base = conn.execute(select(func.coalesce(func.max(Claim.id), 0))).scalar()
+    user_ids = user_base + 1 + np.arange(len(users['role']))
+    policy_ids = policy_base + 1 + np.arange(len(policies['owner']))
+    password_hash = generate_password_hash('Test@123')
+
+    def user_rows(lo, hi):
+        first_names = [FIRST_NAMES[i] for i in users['first'][lo:hi].tolist()]
+        last_names = [LAST_NAMES[i] for i in users['last'][lo:hi].tolist()]
+        ids = user_ids[lo:hi].tolist()
+        created = _dates(users['created'][lo:hi])
+        return _rows({
+            'id': ids,
+            'username': [f'{first}.{last}.{i}'.lower() for first, last, i in zip(first_names, last_names, ids)],
+            'email': [f'{first}.{last}{i}@example.com'.lower() for first, last, i in zip(first_names, last_names, ids)],
+            'password_hash': repeat(password_hash),
+            'role': users['role'][lo:hi],
+            'is_verified': users['verified'][lo:hi].tolist(),
+            'first_name': first_names,
+            'last_name': last_names,
+            'phone_number': [f'+91{phone}' for phone in users['phone'][lo:hi].tolist()],
+            'address': [
+                f'{house}, {STREETS[street]}, {CITIES[city]}' for house, street, city in zip(
+                    users['house'][lo:hi].tolist(), users['street'][lo:hi].tolist(), users['city'][lo:hi].tolist()
+                )
+            ],
+            'created_at': created,
+            'updated_at': created,
+        })
+
+    def policy_rows(lo, hi):
+        ids = policy_ids[lo:hi].tolist()
+        created = _dates(policies['start'][lo:hi])
+        return _rows({
+            'id': ids,
+            'policy_number': [f'POL{i:09d}' for i in ids],
+            'policy_type': policies['type'][lo:hi],
+            'start_date': [at.date() for at in created],
+            'end_date': [at.date() for at in _dates(policies['end'][lo:hi])],
+            'premium_amount': policies['premium'][lo:hi].tolist(),
+            'status': policies['status'][lo:hi],
+            'user_id': user_ids[policies['owner'][lo:hi]].tolist(),
+            'created_at': created,
+            'updated_at': created,
+        })
+
+    def claim_rows(lo, hi):
+        reviewed = claims['reviewed'][lo:hi]
+        reviewers = np.where(reviewed, user_ids[employees[claims['reviewer'][lo:hi]]], 0).tolist()
+        return _rows({
+            'id': range(claim_base + 1 + lo, claim_base + 1 + hi),
+            'claim_type': claims['type'][lo:hi],
+            'description': [
+                DESCRIPTIONS[claim_type][i]
+                for claim_type, i in zip(claims['type'][lo:hi], claims['description'][lo:hi].tolist())
+            ],
+            'amount': claims['amount'][lo:hi].tolist(),
+            'submitted_at': _dates(claims['submitted'][lo:hi]),
+            'status': claims['status'][lo:hi],
+            'document_count': repeat(0),
+            'documents_completed': repeat(0),
+            'documents_failed': repeat(0),
+            'max_ela_score': repeat(None),
+            'risk_score': repeat(None),
+            'version': repeat(1),
+            'user_id': user_ids[claims['user'][lo:hi]].tolist(),
+            'policy_id': policy_ids[claims['policy'][lo:hi]].tolist(),
+            'reviewed_by': [reviewer or None for reviewer in reviewers],
+            'review_notes': repeat(None),
+            'reviewed_at': [
+                at if done else None
+                for at, done in zip(_dates(claims['reviewed_at'][lo:hi]), reviewed.tolist())
+            ],
+        })
+
+    _drop_secondary_indexes(engine)
+    _insert(engine, User.__table__, user_rows, len(user_ids), chunk_size)
+    _insert(engine, Policy.__table__, policy_rows, len(policy_ids), chunk_size)
+    _insert(engine, Claim.__table__, claim_rows, len(claims['type']), chunk_size)
+    # Core inserts skip the ORM events that keep the per-user aggregates current
+    with engine.begin() as conn:
+        rebuild_user_stats(conn)
+    run_migrations(engine)
+
+    rings = []
+    for ring in range(n_rings):
+        members = np.flatnonzero(users['ring_id'] == ring)
+        ring_claims = np.flatnonzero(claims['ring_id'] == ring)
+        rings.append({
+            'ring': ring,
+            'phone_number': f"+91{users['phone'][members[0]]}",
+            'user_ids': user_ids[members].tolist(),
+            'claim_ids': (claim_base + 1 + ring_claims).tolist(),
+        })
+    return {
+        'users': len(user_ids),
+        'employees': len(employees),
+        'policies': len(policy_ids),
+        'claims': len(claims['type']),
+        'ring_claims': int((claims['ring_id'] >= 0).sum()),
+        'rings': rings,
+    }
+
+
+def bulk_load_engine(url):
+    """Engine tuned for a one-off load: no fsyncs, big page cache"""
+    engine = create_engine(url)
+    if engine.dialect.name == 'sqlite':
+        @event.listens_for(engine, 'connect')
+        def on_connect(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in ('PRAGMA journal_mode = WAL', 'PRAGMA synchronous = OFF',
+                           'PRAGMA cache_size = -262144', 'PRAGMA temp_store = MEMORY'):
+                cursor.execute(pragma)
+            cursor.close()
+    return engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--claims', type=int, default=1000000)
+    parser.add_argument('--users', type=int, help='default: claims / 4')
+    parser.add_argument('--policies', type=int, help='default: users * 1.2')
+    parser.add_argument('--rings', type=int, help='fraud rings to inject (default: claims / 2000)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK)
+    parser.add_argument('--database-url', default='sqlite:///benchmark.db')
+    parser.add_argument('--labels', help='write the injected rings (users, phone, claim ids) to this JSON file')
+    args = parser.parse_args()
+
+    engine = bulk_load_engine(args.database_url)
+    db.metadata.create_all(engine)
+    run_migrations(engine)
+
+    started = time.perf_counter()
+    result = generate(engine, args.claims, args.users, args.policies, args.rings, args.seed, args.chunk_size)
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+
+    print(
+        f"{result['users']} users ({result['employees']} employees), {result['policies']} policies, "
+        f"{result['claims']} claims ({result['ring_claims']} in {len(result['rings'])} fraud rings) "
+        f"in {elapsed:.1f}s at {datetime.now():%H:%M:%S}"
+    )
+    if args.labels:
+        with open(args.labels, 'w') as f:
+            json.dump(result['rings'], f)
+        print(f"Wrote {args.labels}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
 from app import create_app, db
 from app.models.claims import Claim
+from app.models.claim_documents import ClaimDocument
 
 def init_db():
     app = create_app()
@@ -15,15 +16,15 @@ def init_db():
             claim_type="Test Claim",
             description="This is a test claim",
             status="pending",
-            files=["test_file.pdf"],
-            verification_results=[{
+            documents=[ClaimDocument.from_entry({
                 "filename": "test_file.pdf",
                 "verification_result": {
                     "valid": True,
                     "metadata": {"format": "PDF"}
                 }
-            }]
+            }, "test_file.pdf")]
         )
+        test_claim.refresh_summary()
         
         try:
             db.session.add(test_claim)
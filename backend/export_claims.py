@@ -0,0 +1,37 @@
+import argparse
+import contextlib
+import sys
+
+from app import create_app
+from app.routes import filter_claims_query
+from app.services.claims_export import EXPORT_FORMATS, ExportError, export_statement, iter_export
+from app.utils.config import Config
+
+def export_claims():
+    parser = argparse.ArgumentParser(description="Export claims as NDJSON, CSV or Parquet")
+    parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='ndjson')
+    parser.add_argument('--status', help="Only claims with this status")
+    parser.add_argument('--claim-type', help="Only claims of this type")
+    parser.add_argument('--chunk-size', type=int, default=Config.EXPORT_CHUNK_SIZE)
+    parser.add_argument('--output', default='-', help="Output file, or - for stdout")
+    args = parser.parse_args()
+
+    # Startup messages go to stderr so they never end up in an export on stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        app = create_app()
+    with app.app_context():
+        filters = {'status': args.status, 'claim_type': args.claim_type}
+        statement = filter_claims_query(export_statement(), filters)
+        output = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+        try:
+            for chunk in iter_export(statement, args.format, args.chunk_size):
+                output.write(chunk)
+        except ExportError as e:
+            print(f"Export failed: {e}", file=sys.stderr)
+            sys.exit(1)
+        finally:
+            if output is not sys.stdout.buffer:
+                output.close()
+
+if __name__ == "__main__":
+    export_claims()
@@ -1,5 +1,6 @@
 from app import create_app, db
 from app.models.claims import Claim
+from app.models.claim_documents import ClaimDocument
 from datetime import datetime
 
 def init_db():
@@ -18,8 +19,7 @@ def init_db():
             description="This is a test claim",
             status="pending",
             submitted_at=datetime.utcnow(),
-            files=["test_file.pdf"],
-            verification_results=[{
+            documents=[ClaimDocument.from_entry({
                 "filename": "test_file.pdf",
                 "verification_result": {
                     "valid": True,
@@ -35,11 +35,12 @@ def init_db():
                         "line_count": 10
                     }
                 }
-            }],
+            }, "test_file.pdf")],
             review_notes=None,
             reviewed_at=None,
             reviewed_by=None
         )
+        test_claim.refresh_summary()
         
         try:
             db.session.add(test_claim)
@@ -0,0 +1,16 @@
+from app import create_app, db
+from app.utils.migrations import run_migrations
+
+def migrate_db():
+    app = create_app()
+    with app.app_context():
+        # create_app already migrates on startup; running it again is a no-op
+        # but reports the current state
+        result = run_migrations(db.engine)
+        if any(result.values()):
+            print(f"Migrated: {result}")
+        else:
+            print("Database schema is up to date")
+
+if __name__ == "__main__":
+    migrate_db()
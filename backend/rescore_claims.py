@@ -0,0 +1,37 @@
+import argparse
+import sys
+
+from app import create_app
+from app.services.rescoring import RescoreError, rescore_claims
+from app.utils.config import Config
+
+def main():
+    parser = argparse.ArgumentParser(description="Rescore open claims with the current models, resuming an interrupted run")
+    parser.add_argument('--checkpoint', default=Config.RESCORE_CHECKPOINT, help="Progress file of the run")
+    parser.add_argument('--statuses', help="Comma-separated statuses to rescore instead of every open claim")
+    parser.add_argument('--chunk-size', type=int, default=Config.RESCORE_CHUNK_SIZE, help="Claims per worker task")
+    parser.add_argument('--workers', type=int, default=Config.RESCORE_WORKERS)
+    parser.add_argument('--write-batch', type=int, default=Config.RESCORE_WRITE_BATCH,
+                        help="Scores written (and checkpointed) per transaction")
+    parser.add_argument('--restart', action='store_true', help="Discard an unfinished run and start over")
+    parser.add_argument('--no-rl', action='store_true', help="Skip the RL policy decisions")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        try:
+            rescore_claims(
+                checkpoint_path=args.checkpoint,
+                statuses=args.statuses.split(',') if args.statuses else None,
+                chunk_size=args.chunk_size,
+                workers=args.workers,
+                write_batch=args.write_batch,
+                restart=args.restart,
+                use_rl=not args.no_rl
+            )
+        except RescoreError as e:
+            print(f"Rescoring failed: {e}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
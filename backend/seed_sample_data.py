@@ -7,6 +7,7 @@ from app import create_app, db
 from app.models.users import User
 from app.models.policies import Policy
 from app.models.claims import Claim
+from app.models.claim_documents import ClaimDocument
 
 # Initialize Faker with Indian locale
 fake = Faker('en_IN')
@@ -218,14 +219,18 @@ def seed_claims():
                     ['approved', 'pending', 'rejected'],
                     weights=[0.6, 0.2, 0.2]
                 )[0],
-                verification_results={"verified": not is_suspicious, "risk_score": random.uniform(0, 1)},
-                files=[f"documents/claim_{i}.pdf"],
+                documents=[ClaimDocument.from_entry(
+                    {"verification_result": {"valid": not is_suspicious}},
+                    f"documents/claim_{i}.pdf"
+                )],
+                risk_score=random.uniform(0, 1),
                 user_id=policy.user_id,
                 policy_id=policy.id,
                 reviewed_by=random.choice(employees).id,
                 review_notes="Looks legitimate" if not is_suspicious else "Needs investigation",
                 reviewed_at=datetime.combine(claim_date, datetime.min.time()) + timedelta(days=random.randint(1, 30))
             )
+            claim.refresh_summary()
             claims.append(claim)
             
             # Visual indicator for suspicious claims
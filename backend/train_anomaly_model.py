@@ -0,0 +1,55 @@
+import argparse
+import sys
+
+from app import create_app
+from app.ml_models.anomaly_detection import AnomalyDetector
+from app.services.ai_service import AIService
+
+def train_anomaly_model():
+    parser = argparse.ArgumentParser(description="Train the anomaly model and save it as a new artifact version")
+    parser.add_argument('--limit', type=int, help="Train on the newest N claims only")
+    parser.add_argument('--min-claims', type=int, default=50, help="Refuse to train on fewer claims")
+    parser.add_argument('--synthetic', type=int, default=0,
+                        help="Bootstrap on N synthetic claims instead (for empty development databases)")
+    parser.add_argument('--model-dir', help="Artifact root (default: Config.MODEL_DIR)")
+    parser.add_argument('--update', action='store_true',
+                        help="Slide the latest model onto claims submitted since it was saved instead of retraining")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        detector = AnomalyDetector(model_dir=args.model_dir)
+        if args.update:
+            last_claim_id = (detector.metadata or {}).get('last_claim_id')
+            if last_claim_id is None:
+                print("No saved anomaly model that records the claims it saw; train one first")
+                sys.exit(1)
+            claim_data = AIService().claim_features(after_id=last_claim_id)
+            metadata = detector.update(claim_data)
+            if metadata is None:
+                print(f"Only {len(claim_data)} claims since claim {last_claim_id}; not enough for a new tree yet")
+                return
+            print(f"Saved anomaly model {metadata['version']}: replaced {metadata['trees_replaced']} trees "
+                  f"using {metadata['update_size']} new claims")
+            return
+        if args.synthetic:
+            n_anomalous = max(1, args.synthetic // 10)
+            claim_data = (detector._generate_normal_claims(args.synthetic - n_anomalous)
+                          + detector._generate_anomalous_claims(n_anomalous))
+            source = 'synthetic'
+        else:
+            claim_data = AIService().claim_features(limit=args.limit)
+            source = 'claims'
+
+        if len(claim_data) < args.min_claims:
+            print(f"Only {len(claim_data)} claims to train on (--min-claims {args.min_claims}); "
+                  f"use --synthetic N to bootstrap a development model")
+            sys.exit(1)
+
+        metadata = detector.train(claim_data, metadata={'source': source})
+        print(f"Saved anomaly model {metadata['version']} trained on {metadata['training_size']} claims "
+              f"({source}) to {detector.store.root}")
+        print("Workers load it when they next start")
+
+if __name__ == "__main__":
+    train_anomaly_model()
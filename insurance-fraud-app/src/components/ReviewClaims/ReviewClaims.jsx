@@ -5,7 +5,9 @@ import ClaimVisualization from './ClaimVisualization';
 
 const ReviewClaims = () => {
   const [claims, setClaims] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
   const [filters, setFilters] = useState({
     status: '',
@@ -27,15 +29,21 @@ const ReviewClaims = () => {
     fetchClaims();
   }, [filters]);
 
-  const fetchClaims = async () => {
+  // /claims returns one page at a time; a cursor fetches the page after it
+  const fetchClaims = async (cursor = null) => {
     try {
-      setLoading(true);
+      if (cursor) {
+        setLoadingMore(true);
+      } else {
+        setLoading(true);
+      }
       setError(null);
       
       let url = 'http://localhost:5000/claims';
       const params = new URLSearchParams();
       if (filters.status) params.append('status', filters.status);
       if (filters.claimType) params.append('claim_type', filters.claimType);
+      if (cursor) params.append('cursor', cursor);
       if (params.toString()) url += `?${params.toString()}`;
 
       const response = await fetch(url);
@@ -46,7 +54,9 @@ const ReviewClaims = () => {
       }
 
       if (data.status === 'success') {
-        setClaims(data.data.claims || []);
+        const page = data.data.claims || [];
+        setClaims(prev => (cursor ? [...prev, ...page] : page));
+        setNextCursor(data.data.next_cursor || null);
       } else {
         throw new Error(data.message || 'Failed to fetch claims');
       }
@@ -55,6 +65,7 @@ const ReviewClaims = () => {
       setError(err.message);
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
@@ -398,6 +409,18 @@ const ReviewClaims = () => {
         ))}
       </div>
 
+      {nextCursor && (
+        <div className="load-more">
+          <button
+            className="load-more-btn"
+            onClick={() => fetchClaims(nextCursor)}
+            disabled={loadingMore}
+          >
+            {loadingMore ? 'Loading...' : 'Load More Claims'}
+          </button>
+        </div>
+      )}
+
       {showAnalysis && selectedClaim && (
         <div className="analysis-modal">
           <div className="analysis-content">
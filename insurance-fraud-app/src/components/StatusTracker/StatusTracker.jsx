@@ -3,7 +3,9 @@ import './StatusTracker.css';
 
 const StatusTracker = () => {
     const [claims, setClaims] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [error, setError] = useState(null);
     const [selectedClaim, setSelectedClaim] = useState(null);
 
@@ -11,14 +13,24 @@ const StatusTracker = () => {
         fetchUserClaims();
     }, []);
 
-    const fetchUserClaims = async () => {
+    // /claims returns one page at a time; a cursor fetches the page after it
+    const fetchUserClaims = async (cursor = null) => {
         try {
-            setLoading(true);
-            const response = await fetch('http://localhost:5000/claims');
+            if (cursor) {
+                setLoadingMore(true);
+            } else {
+                setLoading(true);
+            }
+            const url = cursor
+                ? `http://localhost:5000/claims?cursor=${encodeURIComponent(cursor)}`
+                : 'http://localhost:5000/claims';
+            const response = await fetch(url);
             const data = await response.json();
 
             if (data.status === 'success') {
-                setClaims(data.data.claims);
+                const page = data.data.claims || [];
+                setClaims(prev => (cursor ? [...prev, ...page] : page));
+                setNextCursor(data.data.next_cursor || null);
             } else {
                 throw new Error(data.message || 'Failed to fetch claims');
             }
@@ -26,6 +38,7 @@ const StatusTracker = () => {
             setError(err.message);
         } finally {
             setLoading(false);
+            setLoadingMore(false);
         }
     };
 
@@ -154,6 +167,18 @@ const StatusTracker = () => {
                     ))
                 )}
             </div>
+
+            {nextCursor && (
+                <div className="load-more">
+                    <button
+                        className="load-more-btn"
+                        onClick={() => fetchUserClaims(nextCursor)}
+                        disabled={loadingMore}
+                    >
+                        {loadingMore ? 'Loading...' : 'Load More Claims'}
+                    </button>
+                </div>
+            )}
         </div>
     );
 };